@@ -1,37 +1,58 @@
 # api.py
 from __future__ import annotations
 
-import re
-from typing import List
+import hashlib
+import json
+import os
+import secrets
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
 
 import httpx
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
+from models.abstract_library import AbstractLibrary
+from models import http_client, isbn as isbns, jsonio, metrics, profiling
+from models.batcher import fetch_editions
 from models.book import Book
-from models.library import Library
+from models.importer import IMPORT_WORKERS, import_isbns
+from models.jobs import JobCancelled, JobQueue, QueueFull
+from models.library import Library, fetch_book_async, get_json
+from models.profiling import Profiler, Trace, span
+from models.refresh import REFRESH_BATCH, REFRESH_CONCURRENCY, REFRESH_RATE, Refresher
+from models.search import fold
+from models.singleflight import SingleFlight
+from models.sqlite_library import SqliteLibrary
+from models.storage import open_storage
 import httpx
 from fastapi import HTTPException
 
 def fetch_by_isbn_or_search(isbn: str) -> dict:
     base = "https://openlibrary.org"
-   
-    r = httpx.get(f"{base}/isbn/{isbn}.json", timeout=10)
-    if r.status_code == 200:
-        return r.json()
-    if r.status_code != 404:
-        r.raise_for_status()
-
-    sr = httpx.get(f"{base}/search.json", params={"isbn": isbn}, timeout=10)
+
+    # Edition lookups go through the shared response cache
+    data = get_json(f"{base}/isbn/{isbn}.json")
+    if data is not None:
+        return data
+
+    sr = http_client.get(f"{base}/search.json", params={"isbn": isbn})
     sr.raise_for_status()
     doc = sr.json()
     if doc.get("num_found", 0) > 0:
         
         cand = doc["docs"][0].get("isbn", []) or doc["docs"][0].get("isbn13", [])
+        # All alternatives in one request instead of one request each
+        found = fetch_editions(cand)
         for alt in cand:
-            rr = httpx.get(f"{base}/isbn/{alt}.json", timeout=10)
-            if rr.status_code == 200:
-                return rr.json()
+            if alt in found:
+                return found[alt]
 
     raise HTTPException(status_code=404, detail="Book not found on Open Library.")
 
@@ -45,15 +66,11 @@ def to_dict(book: Book) -> dict:
 
 
 def normalize_isbn(text: str) -> str:
-    """Remove spaces and symbols, make uppercase."""
-    return "".join(ch for ch in text if ch.isalnum()).upper()
-
-
-# Only numbers or X are allowed in ISBN
-ISBN_ALLOWED = re.compile(r"[0-9Xx]+")
+    """Digits plus a trailing X (same rule as the Library uses)."""
+    return isbns.normalize(text)
 
 
-def safe_load(lib: Library) -> None:
+def safe_load(lib: AbstractLibrary) -> None:
     """Load books from JSON file using Library.load_books()."""
     try:
         lib.load_books()
@@ -62,7 +79,7 @@ def safe_load(lib: Library) -> None:
         pass
 
 
-def safe_save(lib: Library) -> None:
+def safe_save(lib: AbstractLibrary) -> None:
     """Save books to JSON file using Library.save_books()."""
     try:
         lib.save_books()
@@ -70,6 +87,11 @@ def safe_save(lib: Library) -> None:
         raise HTTPException(status_code=500, detail=f"Save error: {e}")
 
 
+def save_error(e: Exception) -> HTTPException:
+    """Turn a storage failure during add/remove into a 500 response."""
+    return HTTPException(status_code=500, detail=f"Save error: {e}")
+
+
 # Request / Response models 
 
 class ISBNRequest(BaseModel):
@@ -77,6 +99,12 @@ class ISBNRequest(BaseModel):
     isbn: str = Field(..., examples=["9780140449266"])
 
 
+class BulkRequest(BaseModel):
+    """Body model for importing many ISBNs at once."""
+    isbns: List[str] = Field(..., examples=[["9780140449266", "9780321765723"]])
+    workers: int = Field(IMPORT_WORKERS, ge=1, le=64)
+
+
 class BookResponse(BaseModel):
     """Response model for a single book."""
     title: str
@@ -92,94 +120,595 @@ class MessageResponse(BaseModel):
 #  Open Library client
 
 async def fetch_openlibrary(isbn: str) -> dict:
-    """Get book data from Open Library by ISBN."""
-    url = f"https://openlibrary.org/isbn/{isbn}.json"
+    """Get book data from Open Library by ISBN (authors are fetched concurrently)."""
     try:
-        async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
-            r = await client.get(url)
-            if r.status_code == 404:
-                raise HTTPException(status_code=404, detail="Book not found on Open Library.")
-            r.raise_for_status()
-            book_json = r.json()
-
-            title = book_json.get("title") or "Unknown"
-
-            # Try to read author name
-            author_name = "Unknown"
-            authors = book_json.get("authors") or []
-            author_key = None
-            if authors and isinstance(authors[0], dict):
-                # Could be {"key": "/authors/OL..."} or {"author": {"key": ...}}
-                author_key = authors[0].get("key") or (
-                    isinstance(authors[0].get("author"), dict) and authors[0]["author"].get("key")
-                )
-
-            if author_key:
-                a = await client.get(f"https://openlibrary.org{author_key}.json")
-                if a.status_code == 200:
-                    author_name = (a.json() or {}).get("name") or "Unknown"
-
-            return {"title": title, "author": author_name, "isbn": isbn}
-
+        book = await fetch_book_async(isbn, strict=True)
+    except http_client.CircuitOpenError as e:
+        # Failing fast: Open Library has been erroring, try again later
+        raise HTTPException(
+            status_code=503,
+            detail=f"Open Library is unavailable: {e}",
+            headers={"Retry-After": str(max(int(e.retry_after), 1))},
+        )
     except httpx.RequestError as e:
         # Network/DNS/timeout problem
         raise HTTPException(status_code=502, detail=f"Open Library request failed: {e}")
     except httpx.HTTPStatusError as e:
         # Non-2xx from the server
         raise HTTPException(status_code=502, detail=f"Open Library returned error: {e.response.status_code}")
+    if book is None:
+        raise HTTPException(status_code=404, detail="Book not found on Open Library.")
+    return to_dict(book)
 
 
 # FastAPI app
 
-app = FastAPI(title="Library API", version="1.0.0")
-
-# Single Library instance kept in memory
-library_store = Library()
-safe_load(library_store)
+# Storage settings: file path and engine ("json" rewrites the file, "wal" appends a log,
+# "sqlite" keeps the books in an SQLite database, library.db unless LIBRARY_FILE says otherwise)
+LIBRARY_STORAGE = os.getenv("LIBRARY_STORAGE", "json")
+LIBRARY_FILE = os.getenv("LIBRARY_FILE", "library.db" if LIBRARY_STORAGE == "sqlite" else "library.json")
+# Debounced saving for the json engine: save at most every N seconds / after N changes
+LIBRARY_FLUSH_INTERVAL = float(os.getenv("LIBRARY_FLUSH_INTERVAL", "0")) or None
+LIBRARY_FLUSH_AFTER = int(os.getenv("LIBRARY_FLUSH_AFTER", "0")) or None
+# Read library.json on the first request instead of at import time
+LIBRARY_LAZY = os.getenv("LIBRARY_LAZY", "0") == "1"
+# Column-wise in-memory storage for big catalogs (several times less RAM)
+LIBRARY_COMPACT = os.getenv("LIBRARY_COMPACT", "0") == "1"
+# Several worker processes share the files (uvicorn --workers N); turns off debounced saving
+LIBRARY_SHARED = os.getenv("LIBRARY_SHARED", "0") == "1"
+# Profiling (off by default): requests slower than LIBRARY_PROFILE_SLOW seconds get a span
+# report, a LIBRARY_PROFILE_SAMPLE share also runs under cProfile; the newest
+# LIBRARY_PROFILE_KEEP reports are kept in LIBRARY_PROFILE_DIR
+LIBRARY_PROFILE = os.getenv("LIBRARY_PROFILE", "0") == "1"
+LIBRARY_PROFILE_DIR = os.getenv("LIBRARY_PROFILE_DIR", "profiles")
+LIBRARY_PROFILE_SAMPLE = float(os.getenv("LIBRARY_PROFILE_SAMPLE", "0.01"))
+LIBRARY_PROFILE_SLOW = float(os.getenv("LIBRARY_PROFILE_SLOW", "1.0"))
+LIBRARY_PROFILE_KEEP = int(os.getenv("LIBRARY_PROFILE_KEEP", "50"))
+# Background enrichment: POST /books stores a placeholder and answers 202 with a job id;
+# LIBRARY_JOB_WORKERS lookups run at a time, a failed one is retried LIBRARY_JOB_RETRIES times
+LIBRARY_ASYNC_ADD = os.getenv("LIBRARY_ASYNC_ADD", "0") == "1"
+LIBRARY_JOBS_FILE = os.getenv("LIBRARY_JOBS_FILE", LIBRARY_FILE + ".jobs.json")
+LIBRARY_JOB_WORKERS = int(os.getenv("LIBRARY_JOB_WORKERS", "4"))
+LIBRARY_JOB_RETRIES = int(os.getenv("LIBRARY_JOB_RETRIES", "3"))
+LIBRARY_JOB_QUEUE = int(os.getenv("LIBRARY_JOB_QUEUE", "10000"))
+# Metadata refresh: every LIBRARY_REFRESH_INTERVAL seconds (0 = off) re-check the LIBRARY_REFRESH_BATCH
+# books checked longest ago with conditional GETs, at most LIBRARY_REFRESH_RATE requests per second
+LIBRARY_REFRESH_INTERVAL = float(os.getenv("LIBRARY_REFRESH_INTERVAL", "0"))
+LIBRARY_REFRESH_BATCH = int(os.getenv("LIBRARY_REFRESH_BATCH", str(REFRESH_BATCH)))
+LIBRARY_REFRESH_RATE = float(os.getenv("LIBRARY_REFRESH_RATE", str(REFRESH_RATE)))
+LIBRARY_REFRESH_CONCURRENCY = int(os.getenv("LIBRARY_REFRESH_CONCURRENCY", str(REFRESH_CONCURRENCY)))
+LIBRARY_REFRESH_STATE = os.getenv("LIBRARY_REFRESH_STATE", LIBRARY_FILE + ".refresh.json")
+# JSON-lines file that gets one report per refresh cycle (optional)
+LIBRARY_REFRESH_REPORT = os.getenv("LIBRARY_REFRESH_REPORT") or None
+
+
+def create_library() -> AbstractLibrary:
+    """Create the Library the API works on, from the settings above."""
+    if LIBRARY_STORAGE == "sqlite":
+        return SqliteLibrary(LIBRARY_FILE)
+    return Library(
+        LIBRARY_FILE,
+        storage=open_storage(LIBRARY_STORAGE, LIBRARY_FILE),
+        flush_interval=LIBRARY_FLUSH_INTERVAL,
+        flush_after=LIBRARY_FLUSH_AFTER,
+        lazy=LIBRARY_LAZY,
+        compact=LIBRARY_COMPACT,
+        shared=LIBRARY_SHARED,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled Open Library client for the whole app lifetime
+    await http_client.start()
+    jobs = enrichment_jobs
+    if jobs is not None:
+        await jobs.start()
+    refresher = create_refresher()
+    if refresher is not None:
+        refresher.start(LIBRARY_REFRESH_INTERVAL)
+    yield
+    if refresher is not None:
+        await refresher.stop()
+    if jobs is not None:
+        await jobs.stop()
+    await http_client.aclose()
+    # Writes out anything the debounced saver still holds
+    library_store.close()
+
+
+app = FastAPI(title="Library API", version="1.0.0", lifespan=lifespan)
+
+REQUEST_SECONDS = metrics.histogram(
+    "library_http_request_duration_seconds", "API requests by method, route and status.", ("method", "route", "status")
+)
+
+
+class MetricsMiddleware:
+    """Times every HTTP request (to the end of its body) into REQUEST_SECONDS.
+
+    Plain ASGI rather than @app.middleware("http"), which would add a task and a
+    stream copy to every request. Routes are labelled by their template
+    ("/books/{isbn}"), so the label stays bounded.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            # the router stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope["method"], route=route, status=status)
+
+
+app.add_middleware(MetricsMiddleware)
+
+profiler: Optional[Profiler] = (
+    Profiler(LIBRARY_PROFILE_DIR, LIBRARY_PROFILE_SAMPLE, LIBRARY_PROFILE_SLOW, LIBRARY_PROFILE_KEEP)
+    if LIBRARY_PROFILE else None
+)
+
+
+class ProfilingMiddleware:
+    """Traces requests while profiling is on (see models/profiling.py).
+
+    Every request collects span times; slow or sampled ones are written out
+    after the response, in a worker thread. Work done in the threadpool shows
+    up in the spans but not in the cProfile output, which only sees the event
+    loop thread.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        prof = profiler
+        if prof is None or scope["type"] != "http" or scope["path"].startswith("/debug/"):
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        trace = Trace()
+        token = profiling.activate(trace)
+        profile = prof.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            seconds = time.perf_counter() - started
+            prof.stop(profile)
+            profiling.deactivate(token)
+            if prof.wanted(profile, seconds):
+                info = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(scope.get("route"), "path", "unmatched"),
+                    "status": status,
+                    "seconds": round(seconds, 6),
+                }
+                await run_in_threadpool(prof.record, info, trace, profile)
+
+
+app.add_middleware(ProfilingMiddleware)
+
+# Single Library instance kept in memory (it loads its own file)
+library_store = create_library()
+
+# In-flight Open Library lookups, keyed by ISBN key (so ISBN-10/13 of a book share one)
+openlib_lookups = SingleFlight("openlibrary")
+
+# Title/author of a book whose details are still being looked up
+PLACEHOLDER_TITLE = "(looking up...)"
+PLACEHOLDER_AUTHOR = "(unknown yet)"
+
+
+def _is_placeholder(book: Optional[Book]) -> bool:
+    return book is not None and book.title == PLACEHOLDER_TITLE and book.author == PLACEHOLDER_AUTHOR
+
+
+async def enrich_book(isbn: str) -> Optional[dict]:
+    """Job handler: fill in a placeholder from Open Library (errors are retried by the queue)."""
+    book = await fetch_book_async(isbn, strict=True)
+    if book is None:
+        return None
+    if not await run_in_threadpool(library_store.update_book, book):
+        raise JobCancelled("The book was deleted while it was looked up.")
+    return to_dict(book)
+
+
+async def drop_placeholder(job) -> None:
+    """Job cleanup: a lookup that found nothing (or gave up) leaves no placeholder behind."""
+    if _is_placeholder(await run_in_threadpool(library_store.find_book, job.isbn)):
+        await run_in_threadpool(library_store.remove_book, job.isbn)
+
+
+def create_jobs() -> Optional[JobQueue]:
+    """The background lookup queue, if LIBRARY_ASYNC_ADD is on."""
+    if not LIBRARY_ASYNC_ADD:
+        return None
+    if LIBRARY_SHARED:
+        # Each worker process would keep its own queue in the same file and overwrite the others' jobs
+        raise ValueError("LIBRARY_ASYNC_ADD=1 cannot be used with LIBRARY_SHARED=1 (one jobs file per process)")
+    return JobQueue(
+        LIBRARY_JOBS_FILE,
+        enrich_book,
+        drop_placeholder,
+        workers=LIBRARY_JOB_WORKERS,
+        retries=LIBRARY_JOB_RETRIES,
+        max_pending=LIBRARY_JOB_QUEUE,
+    )
+
+
+enrichment_jobs = create_jobs()
+
+
+def create_refresher() -> Optional[Refresher]:
+    """The metadata refresh scheduler, if LIBRARY_REFRESH_INTERVAL is set."""
+    if LIBRARY_REFRESH_INTERVAL <= 0:
+        return None
+    return Refresher(
+        library_store,
+        LIBRARY_REFRESH_STATE,
+        batch_size=LIBRARY_REFRESH_BATCH,
+        rate=LIBRARY_REFRESH_RATE,
+        concurrency=LIBRARY_REFRESH_CONCURRENCY,
+        report_path=LIBRARY_REFRESH_REPORT,
+    )
 
 
 #  Endpoints
 
+def _profiler() -> Profiler:
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is off (set LIBRARY_PROFILE=1).")
+    return profiler
+
+
+@app.get("/debug/profiles", include_in_schema=False)
+def list_profiles() -> List[dict]:
+    """Saved request profiles, newest first (method, route, status, seconds, spans)."""
+    return _profiler().reports()
+
+
+@app.get("/debug/profiles/{report_id}", include_in_schema=False)
+def get_profile(report_id: str) -> dict:
+    """One profile, with the slowest functions for cProfile-sampled requests."""
+    report = _profiler().report(report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return report
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics() -> Response:
+    """Counters and histograms in the Prometheus text format."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+# Listing
+
+BOOK_FIELDS = ("title", "author", "isbn")
+SORT_KEYS = ("isbn", "title", "author")
+# Lines per chunk when streaming NDJSON
+NDJSON_CHUNK = 1000
+# Differs per process, so an ETag never survives a restart (the version starts over).
+# Shared libraries use the storage stamp instead, which all workers agree on
+_ETAG_TOKEN = secrets.token_hex(4)
+# sort -> (library, its version, ISBNs in that order, ISBN -> position, sort keys ascending)
+_orders: Dict[str, Tuple[AbstractLibrary, int, List[str], Dict[str, int], list]] = {}
+
+
+def _etag() -> Optional[str]:
+    if getattr(library_store, "shared", False):
+        # Catches up with the other workers first, so a 304 never hides their changes
+        stamp = repr(library_store.synced_stamp()).encode()
+        return f'W/"{hashlib.blake2b(stamp, digest_size=8).hexdigest()}"'
+    version = getattr(library_store, "version", None)
+    return None if version is None else f'W/"{_ETAG_TOKEN}-{version}"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    if not fields:
+        return BOOK_FIELDS
+    chosen = tuple(f.strip() for f in fields.split(",") if f.strip())
+    unknown = [f for f in chosen if f not in BOOK_FIELDS]
+    if unknown or not chosen:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown) or fields}")
+    return chosen
+
+
+def _sort_key(book: Book, field: str):
+    # isbn is unique; title/author ties are broken by it, so every book has its own key
+    return book.isbn if field == "isbn" else (fold(getattr(book, field)), book.isbn)
+
+
+def _ordered(sort: str) -> Tuple[List[str], Dict[str, int], list]:
+    """ISBNs sorted by sort ("title", "-author", ...), computed once per library version."""
+    lib = library_store
+    version = lib.version
+    cached = _orders.get(sort)
+    if cached is not None and cached[0] is lib and cached[1] == version:
+        return cached[2], cached[3], cached[4]
+    field = sort.lstrip("-")
+    keys: list = []
+    if field:
+        pairs = sorted((_sort_key(b, field), b.isbn) for b in lib.iter_books())
+        keys = [k for k, _ in pairs]
+        isbns = [i for _, i in pairs]
+        if sort.startswith("-"):
+            isbns.reverse()
+    else:
+        isbns = [b.isbn for b in lib.iter_books()]
+    pos = {isbn: i for i, isbn in enumerate(isbns)}
+    _orders[sort] = (lib, version, isbns, pos, keys)
+    return isbns, pos, keys
+
+
+def _sequence(isbn: str) -> int:
+    seq = library_store.sequence(isbn)
+    return -1 if seq is None else seq
+
+
+def _resume(sort: str, cursor: str, after_key: Optional[str], isbns: List[str], keys: list) -> int:
+    """Index of the first book after a cursor that is no longer in the library.
+
+    The cursor's sort key comes from the next link (after_key): its title or
+    author, or its insertion number for the unsorted order.
+    """
+    field = sort.lstrip("-")
+    try:
+        if not field:
+            seq = int(after_key)  # type: ignore[arg-type]
+            # Insertion numbers grow along the list (a book removed meanwhile counts as before it)
+            return bisect_right(isbns, seq, key=_sequence)
+        key = cursor if field == "isbn" else (fold(after_key), cursor)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Unknown cursor: 'after' is not in the library.")
+    if sort.startswith("-"):
+        return len(keys) - bisect_left(keys, key)
+    return bisect_right(keys, key)
+
+
+def _page(
+    limit: Optional[int], after: Optional[str], offset: int, sort: str, after_key: Optional[str] = None
+) -> Tuple[Iterable[Book], bool]:
+    """Books of the requested page and whether more follow."""
+    if limit is None and after is None and not offset and not sort:
+        return library_store.iter_books(), False
+    if after is None and not sort:
+        # Insertion order from the start: no need to look at the rest
+        stop = None if limit is None else offset + limit + 1
+        books = list(islice(library_store.iter_books(), offset, stop))
+        more = limit is not None and len(books) > limit
+        return books[:limit], more
+    isbns, pos, keys = _ordered(sort)
+    start = offset
+    if after is not None:
+        cursor = normalize_isbn(after)
+        if cursor in pos:
+            start += pos[cursor] + 1
+        else:
+            # Deleted since the previous page: carry on after where it was
+            start += _resume(sort, cursor, after_key, isbns, keys)
+    end = len(isbns) if limit is None else start + limit
+    found = (library_store.find_book(isbn) for isbn in isbns[start:end])
+    # (a book removed since the order was built is skipped)
+    return [b for b in found if b is not None], end < len(isbns)
+
+
+def _cursor_key(book: Book, sort: str) -> Optional[str]:
+    # What _resume() needs should the book be gone by the time the next page is asked for
+    field = sort.lstrip("-")
+    if field in ("title", "author"):
+        return getattr(book, field)
+    if not field:
+        seq = library_store.sequence(book.isbn)
+        return None if seq is None else str(seq)
+    return None
+
+
+def _ndjson(items: Iterator[dict]) -> Iterator[str]:
+    while True:
+        chunk = list(islice(items, NDJSON_CHUNK))
+        if not chunk:
+            return
+        yield "".join(jsonio.dumps(item) + "\n" for item in chunk)
+
+
 @app.get("/books", response_model=List[BookResponse])
-def list_books() -> List[BookResponse]:
-    """Return all saved books."""
-    return [BookResponse(**to_dict(b)) for b in library_store.books]
+def list_books(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (default: everything)"),
+    after: Optional[str] = Query(None, description="Cursor: ISBN of the last book of the previous page"),
+    after_key: Optional[str] = Query(
+        None, description="Sort key of the cursor book (set by the next link), so the cursor survives its deletion"
+    ),
+    offset: int = Query(0, ge=0, description="Books to skip (after the cursor, if any)"),
+    sort: Optional[str] = Query(None, description="isbn, title or author; prefix with - for descending"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of title,author,isbn"),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$", description="json (default) or ndjson"),
+) -> Response:
+    """Return saved books (all of them without parameters).
+
+    Pages carry a ``Link: <...>; rel="next"`` header while more books follow.
+    The response has an ETag; send it back as If-None-Match to get a 304 while
+    the library is unchanged. NDJSON (format=ndjson or Accept:
+    application/x-ndjson) streams one book per line.
+    """
+    if sort and sort.lstrip("-") not in SORT_KEYS:
+        raise HTTPException(status_code=422, detail=f"sort must be one of {', '.join(SORT_KEYS)} (optionally with -).")
+    chosen = _parse_fields(fields)
+
+    headers: Dict[str, str] = {}
+    etag = _etag()
+    if etag is not None:
+        headers["ETag"] = etag
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+    books, more = _page(limit, after, offset, sort or "", after_key)
+    if more and books:
+        params = {k: v for k, v in request.query_params.items() if k not in ("after", "after_key", "offset")}
+        params["after"] = books[-1].isbn
+        key = _cursor_key(books[-1], sort or "")
+        if key is not None:
+            params["after_key"] = key
+        headers["Link"] = f'<{request.url.path}?{urlencode(params)}>; rel="next"'
+
+    items = ({f: getattr(b, f) for f in chosen} for b in books)
+    if format == "ndjson" or (format is None and "application/x-ndjson" in request.headers.get("accept", "")):
+        return StreamingResponse(_ndjson(items), media_type="application/x-ndjson", headers=headers)
+    return Response(jsonio.dumps(list(items)), media_type="application/json", headers=headers)
+
+
+@app.get("/books/search", response_model=List[BookResponse])
+def search_books(
+    q: str = Query(..., min_length=1, description="Words to look for in titles and authors"),
+    limit: int = Query(20, ge=1, le=100),
+) -> List[BookResponse]:
+    """Books whose title/author contain every word of q, best match first.
+
+    Case and accents are ignored: "gul bahcesi" finds "Sana Gül Bahçesi Vadetmedim".
+    """
+    return [BookResponse(**to_dict(b)) for b in library_store.search_books(q, limit)]
+
+
+@app.get("/books/suggest", response_model=List[BookResponse])
+def suggest_books(
+    prefix: str = Query(..., min_length=1, description="Start of an ISBN or a title"),
+    limit: int = Query(10, ge=1, le=50),
+) -> List[BookResponse]:
+    """Autocomplete: books whose ISBN or title starts with prefix (ISBN matches first)."""
+    return [BookResponse(**to_dict(b)) for b in library_store.suggest_books(prefix, limit)]
 
 
 @app.post("/books", response_model=BookResponse, status_code=201)
 async def add_book(request: ISBNRequest) -> BookResponse:
-    """Add a new book by ISBN (fetch from Open Library)."""
+    """Add a new book by ISBN (fetch from Open Library).
+
+    With LIBRARY_ASYNC_ADD=1: store a placeholder and answer 202 with a job id
+    right away; a background worker fills in the details (see GET /jobs/{id}).
+    """
     raw = request.isbn.strip()
     if not raw:
         raise HTTPException(status_code=400, detail="ISBN cannot be empty.")
 
-    normalized = normalize_isbn(raw)
-    if not ISBN_ALLOWED.fullmatch(normalized):
-        raise HTTPException(status_code=422, detail="Invalid ISBN format.")
+    # Only digits (spaces/dashes allowed) and a final X
+    with span("normalize"):
+        if not isbns.is_well_formed(raw):
+            raise HTTPException(status_code=422, detail="Invalid ISBN format.")
+        normalized = normalize_isbn(raw)
+        key = isbns.canonical(normalized)
+
+    # Already stored: answer without asking Open Library. In a worker thread: a lookup may
+    # wait for the file lock and re-read the file (LIBRARY_SHARED) or load it first (LIBRARY_LAZY)
+    if await run_in_threadpool(library_store.find_book, normalized):
+        raise HTTPException(status_code=409, detail="This ISBN already exists.")
+
+    # Background mode: a placeholder now, the details from a worker later
+    if enrichment_jobs is not None:
+        return await _enqueue_lookup(enrichment_jobs, normalized)
 
-    # Get book info from Open Library
-    data = await fetch_openlibrary(normalized)
+    # Get book info from Open Library; concurrent requests for the same ISBN share one fetch
+    with span("fetch"):
+        data = await openlib_lookups.do(key, lambda: fetch_openlibrary(normalized))
 
     # Add to library (dedupe by ISBN)
+    # (Library persists the change itself; the file write runs in the threadpool,
+    # not on the event loop)
     new_book = Book(title=data["title"], author=data["author"], isbn=data["isbn"])
-    added = library_store.add_book(new_book)
+    try:
+        with span("store"):
+            added = await run_in_threadpool(library_store.add_book, new_book)
+    except OSError as e:
+        raise save_error(e)
     if not added:
         raise HTTPException(status_code=409, detail="This ISBN already exists.")
 
-    # Save to file
-    safe_save(library_store)
     return BookResponse(**data)
 
 
+async def _enqueue_lookup(jobs: JobQueue, isbn: str) -> JSONResponse:
+    if jobs.pending() >= jobs.max_pending:
+        raise HTTPException(status_code=503, detail="Too many lookups waiting.", headers={"Retry-After": "30"})
+    placeholder = Book(title=PLACEHOLDER_TITLE, author=PLACEHOLDER_AUTHOR, isbn=isbn)
+    try:
+        with span("store"):
+            added = await run_in_threadpool(library_store.add_book, placeholder)
+    except OSError as e:
+        raise save_error(e)
+    if not added:
+        raise HTTPException(status_code=409, detail="This ISBN already exists.")
+    try:
+        job = await jobs.submit(isbn)
+    except (QueueFull, OSError) as e:
+        await run_in_threadpool(library_store.remove_book, isbn)
+        raise HTTPException(status_code=503, detail=f"Lookup not queued: {e}", headers={"Retry-After": "30"})
+    return JSONResponse(
+        {"job_id": job.id, "status": job.status, "isbn": isbn},
+        status_code=202,
+        headers={"Location": f"/jobs/{job.id}"},
+    )
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> dict:
+    """State of a background lookup: pending, running, done (with the book), not_found, failed or cancelled."""
+    job = enrichment_jobs.get(job_id) if enrichment_jobs is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job.to_dict()
+
+
+@app.post("/books/bulk")
+async def add_books_bulk(request: BulkRequest) -> StreamingResponse:
+    """Import many ISBNs; streams one JSON line per ISBN, then a summary line."""
+    async def lines():
+        async for item in import_isbns(library_store, request.isbns, request.workers):
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @app.delete("/books/{isbn}", response_model=MessageResponse)
 def delete_book(isbn: str) -> MessageResponse:
     """Delete a book by ISBN."""
     normalized = normalize_isbn(isbn)
 
-    removed = library_store.remove_book(normalized)
+    # (Library persists the change itself)
+    try:
+        removed = library_store.remove_book(normalized)
+    except OSError as e:
+        raise save_error(e)
     if not removed:
         raise HTTPException(status_code=404, detail="Book to delete not found.")
 
-    # Save to file
-    safe_save(library_store)
     return MessageResponse(message=f"{normalized} deleted.")
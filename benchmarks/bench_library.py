@@ -0,0 +1,81 @@
+"""The same cases as run.py for pytest-benchmark:
+
+    pip install pytest-benchmark
+    pytest benchmarks/bench_library.py --benchmark-json=results.json
+    pytest benchmarks/bench_library.py --benchmark-compare --benchmark-compare-fail=median:25%
+
+Catalog sizes come from BENCH_SIZES (default "1000,10000").
+"""
+from __future__ import annotations
+import itertools
+import os
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from models.book import Book  # noqa: E402
+from models.library import Library  # noqa: E402
+from models.storage import open_storage  # noqa: E402
+
+from .common import isbn_for, mocked_openlibrary, write_catalog  # noqa: E402
+
+SIZES = [int(s) for s in os.getenv("BENCH_SIZES", "1000,10000").split(",") if s]
+
+
+@pytest.fixture(params=SIZES, ids=lambda n: f"n={n}")
+def size(request):
+    return request.param
+
+
+@pytest.fixture(params=["json", "wal"])
+def library(request, size, tmp_path):
+    path = write_catalog(tmp_path / "library.json", size)
+    lib = Library(str(path), storage=open_storage(request.param, str(path)))
+    yield lib
+    lib.close()
+
+
+def test_load_books(benchmark, library):
+    benchmark(library.load_books)
+
+
+def test_save_books(benchmark, library):
+    benchmark(library.save_books)
+
+
+def test_find_book(benchmark, library, size):
+    isbns = itertools.cycle(isbn_for(i * 7919 % size) for i in range(1000))
+    benchmark(lambda: library.find_book(next(isbns)))
+
+
+def test_add_remove_book(benchmark, library, size):
+    # One add + one remove per round, so every round sees the same catalog
+    book = Book("Benchmark", "Author", isbn_for(size))
+    benchmark(lambda: (library.add_book(book), library.remove_book(book.isbn)))
+
+
+@pytest.fixture
+def client(library):
+    from fastapi.testclient import TestClient
+
+    import api
+
+    previous, api.library_store = api.library_store, library
+    with TestClient(api.app) as c, mocked_openlibrary(float(os.getenv("BENCH_DELAY", "0"))):
+        yield c
+    api.library_store = previous
+
+
+def test_get_books(benchmark, client):
+    benchmark(lambda: client.get("/books", params={"limit": 100}).raise_for_status())
+
+
+def test_post_delete_book(benchmark, client, size):
+    isbn = isbn_for(size)
+
+    def post_delete():
+        client.post("/books", json={"isbn": isbn}).raise_for_status()
+        client.delete(f"/books/{isbn}").raise_for_status()
+
+    benchmark(post_delete)
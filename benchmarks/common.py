@@ -0,0 +1,55 @@
+"""Shared pieces of the benchmarks: synthetic catalogs and a mocked Open Library."""
+from __future__ import annotations
+import asyncio
+import json
+import random
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List
+
+import httpx
+import respx
+
+from models.book import Book
+from models.library import openlib_cache
+
+WORDS = (
+    "gül bahçe deniz yol kitap gece sabah ışık rüzgar taş ev kuş dağ nehir yıldız "
+    "river night garden stone light bird house mountain star road morning wind sea"
+).split()
+
+
+def isbn_for(i: int) -> str:
+    # 13 digits, unique per i, never a valid ISBN-10 (so keys stay as they are)
+    return f"979{i:010d}"
+
+
+def make_books(n: int, seed: int = 42) -> List[Book]:
+    """n books with reproducible titles/authors (same seed -> same catalog)."""
+    rnd = random.Random(seed)
+    authors = [f"{rnd.choice(WORDS).title()} {rnd.choice(WORDS).title()}" for _ in range(max(n // 20, 1))]
+    return [
+        Book(" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(2, 5))).title(), rnd.choice(authors), isbn_for(i))
+        for i in range(n)
+    ]
+
+
+def write_catalog(path: Path, n: int, seed: int = 42) -> Path:
+    """library.json with n synthetic books."""
+    path.write_text(json.dumps([b.to_dict() for b in make_books(n, seed)], ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+@contextmanager
+def mocked_openlibrary(delay: float = 0.0) -> Iterator[respx.MockRouter]:
+    """Answer every edition lookup after `delay` seconds, without the network."""
+    async def edition(request: httpx.Request) -> httpx.Response:
+        if delay:
+            await asyncio.sleep(delay)
+        isbn = request.url.path.rsplit("/", 1)[-1].removesuffix(".json")
+        return httpx.Response(200, json={"title": f"Mocked {isbn}", "by_statement": "Benchmark Author"})
+
+    openlib_cache.clear()
+    with respx.mock(assert_all_called=False) as router:
+        router.get(url__regex=r"https://openlibrary\.org/isbn/[^/]+\.json").mock(side_effect=edition)
+        yield router
@@ -0,0 +1,194 @@
+"""Standalone benchmark runner: times Library operations and the HTTP endpoints.
+
+    python -m benchmarks.run --sizes 1000,100000 --output results.json
+    python -m benchmarks.run --baseline results.json --threshold 1.25
+
+Every case runs on a fresh synthetic catalog (same seed -> same books), and the
+API cases go through TestClient with Open Library mocked by respx, answering
+after --delay seconds. With --baseline the exit status is 1 when a case got
+slower than threshold x its baseline median.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+# api.py opens LIBRARY_FILE at import time: keep it off the real library.json
+os.environ.setdefault("LIBRARY_FILE", str(Path(tempfile.mkdtemp(prefix="library_bench_")) / "library.json"))
+
+from models.book import Book  # noqa: E402
+from models.library import Library  # noqa: E402
+from models.storage import open_storage  # noqa: E402
+
+from .common import isbn_for, mocked_openlibrary, write_catalog  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_REPEAT = 5
+# Calls averaged per timing for the per-book operations
+OPS_PER_RUN = 200
+# Books written per run of the add/remove cases is about WRITE_BUDGET / catalog size
+WRITE_BUDGET = 200_000
+# Allowed slowdown against the baseline before a case counts as a regression
+DEFAULT_THRESHOLD = 1.25
+
+
+def timed(run: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None, per: int = 1) -> Dict[str, float]:
+    """Seconds per operation over repeat runs (setup is not timed)."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) / per)
+    return {"median": statistics.median(samples), "min": min(samples), "max": max(samples), "runs": repeat}
+
+
+def write_ops(n: int) -> int:
+    # The json engine rewrites the whole file per change: fewer calls on big catalogs
+    return max(1, min(OPS_PER_RUN, WRITE_BUDGET // n))
+
+
+class Batches:
+    """Hands out one batch per timed run (the setup step of timed)."""
+
+    def __init__(self, batches: List[list]) -> None:
+        self._batches = iter(batches)
+        self.items: list = []
+
+    def next(self) -> None:
+        self.items = next(self._batches)
+
+
+def _library(path: Path, storage: str) -> Library:
+    return Library(str(path), storage=open_storage(storage, str(path)))
+
+
+def bench_library(n: int, storage: str, repeat: int, workdir: Path) -> Dict[str, Dict[str, float]]:
+    path = write_catalog(workdir / f"library_{n}_{storage}.json", n)
+    lib = _library(path, storage)
+    results = {}
+    try:
+        results["load_books"] = timed(lib.load_books, repeat)
+        results["save_books"] = timed(lib.save_books, repeat)
+
+        probe = [isbn_for(i * 7919 % n) for i in range(OPS_PER_RUN)]
+        results["find_book"] = timed(lambda: [lib.find_book(i) for i in probe], repeat, per=OPS_PER_RUN)
+
+        # Each run adds its own batch of new ISBNs; the remove runs take them out again
+        per = write_ops(n)
+        template = lib.find_book(isbn_for(0))
+        batches = [[Book(template.title, template.author, isbn_for(n + r * per + i)) for i in range(per)]
+                   for r in range(repeat)]
+        current = Batches(batches)
+        results["add_book"] = timed(lambda: [lib.add_book(b) for b in current.items], repeat, setup=current.next, per=per)
+        current = Batches(batches)
+        results["remove_book"] = timed(lambda: [lib.remove_book(b.isbn) for b in current.items], repeat,
+                                       setup=current.next, per=per)
+    finally:
+        lib.close()
+    return results
+
+
+def bench_api(n: int, storage: str, repeat: int, delay: float, workdir: Path) -> Dict[str, Dict[str, float]]:
+    from fastapi.testclient import TestClient
+
+    import api
+
+    path = write_catalog(workdir / f"api_{n}_{storage}.json", n)
+    lib = _library(path, storage)
+    lib.load_books()
+    previous, api.library_store = api.library_store, lib
+    results = {}
+    try:
+        with TestClient(api.app) as client, mocked_openlibrary(delay):
+            results["GET /books"] = timed(lambda: client.get("/books", params={"limit": 100}).raise_for_status(), repeat)
+
+            per = write_ops(n)
+            batches = [[isbn_for(n + r * per + i) for i in range(per)] for r in range(repeat)]
+            current = Batches(batches)
+            results["POST /books"] = timed(
+                lambda: [client.post("/books", json={"isbn": i}).raise_for_status() for i in current.items],
+                repeat, setup=current.next, per=per)
+            current = Batches(batches)
+            results["DELETE /books/{isbn}"] = timed(
+                lambda: [client.delete(f"/books/{i}").raise_for_status() for i in current.items],
+                repeat, setup=current.next, per=per)
+    finally:
+        api.library_store = previous
+        lib.close()
+    return results
+
+
+def run(sizes: Iterable[int], storages: Iterable[str], repeat: int, delay: float, api_cases: bool = True) -> dict:
+    """All cases as {"meta": ..., "results": {"library.load_books[json,n=1000]": {...}}}."""
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory(prefix="library_bench_") as tmp:
+        workdir = Path(tmp)
+        for n in sizes:
+            for storage in storages:
+                for name, stats in bench_library(n, storage, repeat, workdir).items():
+                    results[f"library.{name}[{storage},n={n}]"] = stats
+                if api_cases:
+                    for name, stats in bench_api(n, storage, repeat, delay, workdir).items():
+                        results[f"api.{name}[{storage},n={n}]"] = stats
+    meta = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "repeat": repeat,
+        "delay": delay,
+    }
+    return {"meta": meta, "results": results}
+
+
+def regressions(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Cases whose median is more than threshold x the baseline median."""
+    out = []
+    for name, stats in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base and base["median"] > 0 and stats["median"] > base["median"] * threshold:
+            out.append(f"{name}: {stats['median'] * 1e3:.3f} ms vs {base['median'] * 1e3:.3f} ms "
+                       f"(x{stats['median'] / base['median']:.2f})")
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Library benchmarks")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="catalog sizes, e.g. 1000,1000000")
+    parser.add_argument("--storage", default="json,wal", help="storage engines to run")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds the mocked Open Library takes to answer")
+    parser.add_argument("--no-api", action="store_true", help="only the Library cases")
+    parser.add_argument("--output", help="write the results as JSON here")
+    parser.add_argument("--baseline", help="earlier results JSON to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown factor")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    storages = [s for s in args.storage.split(",") if s]
+    report = run(sizes, storages, args.repeat, args.delay, api_cases=not args.no_api)
+
+    for name, stats in report["results"].items():
+        print(f"{name:<50} {stats['median'] * 1e3:>12.4f} ms  (min {stats['min'] * 1e3:.4f})")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        slower = regressions(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.threshold)
+        for line in slower:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
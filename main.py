@@ -1,5 +1,12 @@
+import argparse
+import asyncio
+import json
+
 from models.book import Book
+from models.importer import IMPORT_WORKERS, import_isbns, read_isbns
 from models.library import Library
+from models.mirror import Mirror
+from models.refresh import REFRESH_BATCH, REFRESH_CONCURRENCY, REFRESH_RATE, Refresher
 
 
 def menu():
@@ -9,7 +16,8 @@ def menu():
     print(" 3) ListBooks ")
     print(" 4) Find Book ")
     print(" 5) Add Book (Manual) ")
-    print(" 6) Exit ")
+    print(" 6) Search (title / author) ")
+    print(" 7) Exit ")
 
 
 def main():
@@ -44,9 +52,17 @@ def main():
                     print(bookItem)
 
         elif choice == "4":
-            isbn = input(" ISBN to search: ").strip()
-            book = lib.find_book(isbn)
-            print(book if book else "Book not found.")
+            text = input(" ISBN or start of title: ").strip()
+            book = lib.find_book(text) if text else None
+            if book:
+                print(book)
+            else:
+                # Not an exact ISBN: show books starting with what was typed
+                matches = lib.suggest_books(text) if text else []
+                if not matches:
+                    print("Book not found.")
+                for bookItem in matches:
+                    print(bookItem)
 
         elif choice == "5":
             try:
@@ -59,16 +75,87 @@ def main():
                 print(f"Error: {e}")
 
         elif choice == "6":
+            query = input(" Words to search: ").strip()
+            found = lib.search_books(query) if query else []
+            if not found:
+                print("No matching books.")
+            for bookItem in found:
+                print(bookItem)
+
+        elif choice == "7":
             print("GoodBye :)")
             break
 
 
         else:
-            # If the user writes sth not in 1-6
+            # If the user writes sth not in 1-7
             print("Invalid choice, please try again.")
 
 
 
+def run_import(path: str, workers: int, storage_file: str) -> None:
+    # Import ISBNs (one per line) and print one JSON result per line
+    lib = Library(storage_file)
+    with open(path, encoding="utf-8") as f:
+        isbns = list(read_isbns(f))
+
+    async def run():
+        async for item in import_isbns(lib, isbns, workers):
+            print(json.dumps(item, ensure_ascii=False), flush=True)
+
+    asyncio.run(run())
+
+
+def run_mirror(dumps, db: str) -> None:
+    # Stream Open Library dump files into the local mirror database
+    mirror = Mirror(db)
+    for path in dumps:
+        counts = mirror.import_dump(path)
+        print(f"{path}: {counts['editions']} editions, {counts['authors']} authors, {counts['skipped']} skipped")
+    mirror.close()
+    print(f"Mirror ready: {db} (set OPENLIB_MIRROR={db} to use it)")
+
+
+def run_refresh(storage_file: str, batch: int, rate: float, concurrency: int, report: str = None) -> None:
+    # One refresh cycle over the books checked longest ago; prints the run report
+    lib = Library(storage_file)
+    refresher = Refresher(lib, storage_file + ".refresh.json", batch, rate, concurrency, report)
+    print(json.dumps(asyncio.run(refresher.run_once()), ensure_ascii=False, indent=2))
+    lib.close()
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description="library_app")
+    sub = parser.add_subparsers(dest="command")
+
+    imp = sub.add_parser("import", help="add many ISBNs from a file (one per line)")
+    imp.add_argument("file")
+    imp.add_argument("--workers", type=int, default=IMPORT_WORKERS, help="lookups running at the same time")
+    imp.add_argument("--library", default="library.json", help="storage file")
+
+    mir = sub.add_parser("mirror", help="build an offline Open Library mirror from data dumps")
+    mir.add_argument("dumps", nargs="+", help="editions/authors dump files (.txt/.jsonl, optionally .gz)")
+    mir.add_argument("--db", default="openlibrary_mirror.db", help="mirror database file")
+
+    ref = sub.add_parser("refresh", help="re-check stored books against Open Library and update changed ones")
+    ref.add_argument("--library", default="library.json", help="storage file")
+    ref.add_argument("--batch", type=int, default=REFRESH_BATCH, help="books checked in this run")
+    ref.add_argument("--rate", type=float, default=REFRESH_RATE, help="Open Library requests per second")
+    ref.add_argument("--concurrency", type=int, default=REFRESH_CONCURRENCY, help="requests in flight")
+    ref.add_argument("--report", help="append the run report (JSON line) to this file")
+
+    args = parser.parse_args(argv)
+    if args.command == "import":
+        run_import(args.file, args.workers, args.library)
+    elif args.command == "mirror":
+        run_mirror(args.dumps, args.db)
+    elif args.command == "refresh":
+        run_refresh(args.library, args.batch, args.rate, args.concurrency, args.report)
+    else:
+        # No subcommand: the interactive menu
+        main()
+
+
 # This part starts the program only if we run this file directly
 if __name__ == "__main__":
-    main()
+    cli()
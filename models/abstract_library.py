@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
 from models.book import Book
+from models.prefix import scan_suggest
+from models.search import scan_search
 from typing import Optional
 
 class AbstractLibrary(ABC):
@@ -32,3 +35,46 @@ class AbstractLibrary(ABC):
     def add_book_by_isbn(self, isbn: str) -> Optional[Book]:
         """Fetch by ISBN from Open Library, add to storage, return Book or None if not found/error."""
         pass
+
+    def update_book(self, book: Book) -> bool:
+        """Replace title/author of the stored book with the same ISBN; False if there is none."""
+        if self.find_book(book.isbn) is None:
+            return False
+        with self.batch():
+            self.remove_book(book.isbn)
+            return self.add_book(book)
+
+    def sequence(self, isbn: str) -> Optional[int]:
+        """Insertion number of the stored book: later books get larger ones, other changes
+        leave it alone. None if the book is not there (or the storage does not keep one)."""
+        return None
+
+    def iter_books(self) -> Iterator[Book]:
+        """Iterate over stored books; storages that can stream override this."""
+        return iter(self.list_books())
+
+    def search_books(self, query: str, limit: int = 20) -> List[Book]:
+        """Books whose title/author contain every word of the query, best match first."""
+        return scan_search(self.iter_books(), query, limit)
+
+    def suggest_books(self, prefix: str, limit: int = 10) -> List[Book]:
+        """Books whose ISBN or title starts with prefix (ISBN matches first)."""
+        return scan_suggest(self.iter_books(), prefix, limit)
+
+    def close(self) -> None:
+        """Release files/connections held by the storage."""
+        pass
+
+    @contextmanager
+    def batch(self, flush: bool = True) -> Iterator["AbstractLibrary"]:
+        """Group many changes so they are saved once at the end (if the storage can)."""
+        yield self
+
+    def flush(self) -> None:
+        """Write out changes that are held back (see batch)."""
+        pass
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """Add many books with a single save; returns how many were new."""
+        with self.batch():
+            return sum(1 for b in books if self.add_book(b))
@@ -0,0 +1,114 @@
+from __future__ import annotations
+import asyncio
+from typing import Dict, Iterable, List, Optional
+
+from .book import Book
+from .cache import MISSING
+from .library import OPENLIB_BASE, _build_book, fetch_book_async, get_json, get_json_async, openlib_cache
+from .mirror import get_mirror
+from .singleflight import DEDUPE
+
+# How long to wait for more lookups before sending a batch, and its max size
+BATCH_WINDOW = 0.02
+BATCH_MAX = 50
+
+
+def bibkeys_url(isbns: Iterable[str], jscmd: str = "data") -> str:
+    """Open Library Books API URL for several ISBNs in one request."""
+    keys = ",".join(f"ISBN:{i}" for i in isbns)
+    return f"{OPENLIB_BASE}/api/books?bibkeys={keys}&format=json&jscmd={jscmd}"
+
+
+def _book_from_data(isbn: str, data: Optional[dict]) -> Optional[Book]:
+    # jscmd=data already carries author names, so no /authors/ requests are needed
+    if not data:
+        return None
+    names = [str(a.get("name") or "").strip() for a in data.get("authors") or [] if isinstance(a, dict)]
+    return _build_book(isbn, data, names)
+
+
+def fetch_editions(isbns: List[str]) -> Dict[str, dict]:
+    """Edition records (same shape as /isbn/{isbn}.json) for many ISBNs, one request."""
+    if not isbns:
+        return {}
+    found = get_json(bibkeys_url(isbns, jscmd="details")) or {}
+    out: Dict[str, dict] = {}
+    for isbn in isbns:
+        details = (found.get(f"ISBN:{isbn}") or {}).get("details")
+        if details:
+            out[isbn] = details
+    return out
+
+
+class IsbnBatcher:
+    """Collects ISBN lookups for a short window and resolves them with one request.
+
+    Every caller awaits ``fetch(isbn)`` as if it were alone; lookups that arrive
+    within ``window`` seconds (or until ``max_batch`` are waiting) share a single
+    ``/api/books?bibkeys=...`` call. Results are cached per ISBN.
+    """
+
+    def __init__(self, window: float = BATCH_WINDOW, max_batch: int = BATCH_MAX) -> None:
+        self.window = window
+        self.max_batch = max_batch
+        self.requests = 0  # upstream calls made
+        self._pending: Dict[str, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    @staticmethod
+    def _cache_key(isbn: str) -> str:
+        return f"bibkeys:{isbn}"
+
+    async def fetch(self, isbn: str) -> Optional[Book]:
+        """Book for a normalized ISBN, None if Open Library does not know it.
+
+        Network/server errors of the shared request are raised to every waiter.
+        """
+        # Editions in the offline mirror never need the network batch
+        m = get_mirror()
+        if m is not None and m.edition(isbn) is not None:
+            return await fetch_book_async(isbn)
+
+        cached = openlib_cache.get(self._cache_key(isbn))
+        if cached is not MISSING:
+            return _book_from_data(isbn, cached)
+
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        DEDUPE.inc(name="batcher", result="shared" if isbn in self._pending else "started")
+        self._pending.setdefault(isbn, []).append(fut)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._resolve(batch))
+            # keep a reference until it is done
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        self.requests += 1
+        try:
+            found = await get_json_async(bibkeys_url(batch)) or {}
+        except Exception as e:
+            for futures in batch.values():
+                for fut in futures:
+                    if not fut.done():
+                        fut.set_exception(e)
+            return
+        for isbn, futures in batch.items():
+            data = found.get(f"ISBN:{isbn}")
+            openlib_cache.set(self._cache_key(isbn), data)
+            book = _book_from_data(isbn, data)
+            for fut in futures:
+                if not fut.done():
+                    fut.set_result(book)
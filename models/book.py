@@ -1,11 +1,16 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-@dataclass
+from .isbn import key_of
+
+# slots=True: no per-instance __dict__, which matters with many books in memory
+@dataclass(slots=True)
 class Book:
     title: str
     author: str
     isbn: str  # unique id
-    
+    # Lookup key (ISBN-10 and ISBN-13 of the same book share it); computed once here
+    key: str = field(init=False, repr=False, compare=False)
+
     def __post_init__(self):
         if not self.title.strip():
             raise ValueError("Title cannot be empty.")
@@ -13,6 +18,7 @@ class Book:
             raise ValueError("Author cannot be empty.")
         if not self.isbn.strip() or len(self.isbn.strip()) < 4:
             raise ValueError("ISBN must be at least 4 characters long.")
+        self.key = key_of(self.isbn)
 
 
  # _ _str_ _ method tells Python how to show the book as text when we use print()
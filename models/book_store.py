@@ -0,0 +1,282 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_right
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .book import Book
+
+# Rows are compacted away once this many (and over half of all rows) are deleted
+_COMPACT_MIN = 1024
+# ...or once this many title bytes (and over half of the buffer) are no longer used
+_COMPACT_MIN_BYTES = 1 << 16
+
+# Hash table slot markers (packed ISBNs are always >= 10)
+_EMPTY = 0
+_DELETED = 1
+# author id of a deleted row
+_DEAD = 0xFFFFFFFF
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+def _pack(isbn: str) -> Optional[int]:
+    """Normalized ISBN (digits + optional trailing X) as one integer, or None.
+
+    A leading 1/2 marks "no X"/"X" and keeps leading zeros: "0123" -> 10123.
+    """
+    digits, x = (isbn[:-1], "2") if isbn.endswith("X") else (isbn, "1")
+    if not digits.isdigit() or len(digits) > 17:
+        return None
+    return int(x + digits)
+
+
+def _unpack(packed: int) -> str:
+    s = str(packed)
+    return s[1:] + "X" if s[0] == "2" else s[1:]
+
+
+def _view(title: str, author: str, isbn: str, key: str) -> Book:
+    # Stored values were validated when they came in; skip __post_init__
+    book = Book.__new__(Book)
+    book.title = title
+    book.author = author
+    book.isbn = isbn
+    book.key = key
+    return book
+
+
+class BookStore(MutableMapping):
+    """Column-wise book storage keyed by ISBN key (Book.key), in insertion order.
+
+    Instead of one Book object (plus its strings) per record it keeps:
+
+    - all titles as UTF-8 in one bytearray, with offset/length arrays,
+    - an array of author ids; each distinct author string is stored once,
+    - an array of ISBNs packed into 64-bit integers,
+    - an open-addressing hash table (two arrays) from packed ISBN to row.
+
+    That is a few dozen bytes per book instead of a few hundred. Reading an
+    item returns a fresh Book view, so callers cannot change the stored data
+    by accident.
+    """
+
+    def __init__(self) -> None:
+        self._text = bytearray()
+        self._title_at = array("Q")
+        self._title_len = array("I")
+        self._author_of = array("I")
+        self._isbns = array("Q")
+        # insertion number per row; kept when rows are compacted (see sequence())
+        self._seqs = array("Q")
+        self._next_seq = 0
+        self._authors: List[str] = []
+        self._author_ids: Dict[str, int] = {}
+        # ISBNs that do not pack (rare): isbn -> row and row -> isbn
+        self._odd: Dict[str, int] = {}
+        self._odd_isbns: Dict[int, str] = {}
+        # row -> Book.isbn where it differs from the key (e.g. entered as ISBN-10)
+        self._alt: Dict[int, str] = {}
+        self._dead = 0
+        self._wasted = 0  # title bytes of deleted rows and replaced titles
+        self._table_init(8)
+
+    # Hash table: packed ISBN -> row
+
+    def _table_init(self, size: int) -> None:
+        self._bits = size.bit_length() - 1
+        self._slot_keys = array("Q", bytes(8 * size))
+        self._slot_rows = array("I", bytes(4 * size))
+        self._used = 0  # live + deleted slots
+
+    def _slot(self, packed: int) -> int:
+        # Slot holding packed, or the first empty slot of its probe chain
+        mask = len(self._slot_keys) - 1
+        i = ((packed * _GOLDEN) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+        keys = self._slot_keys
+        while True:
+            k = keys[i]
+            if k == packed or k == _EMPTY:
+                return i
+            i = (i + 1) & mask
+
+    def _table_get(self, packed: int) -> Optional[int]:
+        i = self._slot(packed)
+        return self._slot_rows[i] if self._slot_keys[i] == packed else None
+
+    def _table_put(self, packed: int, row: int) -> None:
+        if (self._used + 1) * 3 > len(self._slot_keys) * 2:
+            self._table_grow()
+        i = self._slot(packed)
+        if self._slot_keys[i] == _EMPTY:
+            self._used += 1
+        self._slot_keys[i] = packed
+        self._slot_rows[i] = row
+
+    def _table_pop(self, packed: int) -> Optional[int]:
+        i = self._slot(packed)
+        if self._slot_keys[i] != packed:
+            return None
+        self._slot_keys[i] = _DELETED
+        return self._slot_rows[i]
+
+    def _table_grow(self) -> None:
+        live = [(k, r) for k, r in zip(self._slot_keys, self._slot_rows) if k > _DELETED]
+        size = 8
+        while size * 2 < (len(live) + 1) * 3:
+            size *= 2
+        self._table_init(size * 2)
+        for k, r in live:
+            self._slot_keys[self._slot(k)] = k
+            self._slot_rows[self._slot(k)] = r
+            self._used += 1
+
+    # Columns
+
+    def _row(self, isbn: str) -> Optional[int]:
+        packed = _pack(isbn)
+        return self._odd.get(isbn) if packed is None else self._table_get(packed)
+
+    def _author_id(self, author: str) -> int:
+        aid = self._author_ids.get(author)
+        if aid is None:
+            aid = self._author_ids[author] = len(self._authors)
+            self._authors.append(author)
+        return aid
+
+    def _set_title(self, row: int, title: str) -> None:
+        data = title.encode("utf-8")
+        self._title_at[row] = len(self._text)
+        self._title_len[row] = len(data)
+        self._text += data
+
+    def _replace_title(self, row: int, title: str) -> None:
+        data = title.encode("utf-8")
+        old = self._title_len[row]
+        if len(data) <= old:
+            # Fits where the old title was; only the tail goes unused
+            start = self._title_at[row]
+            self._text[start:start + len(data)] = data
+            self._title_len[row] = len(data)
+            self._wasted += old - len(data)
+        else:
+            self._set_title(row, title)
+            self._wasted += old
+
+    def _title(self, row: int) -> str:
+        start = self._title_at[row]
+        return self._text[start:start + self._title_len[row]].decode("utf-8")
+
+    def _key_at(self, row: int) -> str:
+        odd = self._odd_isbns.get(row)
+        return odd if odd is not None else _unpack(self._isbns[row])
+
+    def _book(self, row: int, key: str) -> Book:
+        isbn = self._alt.get(row, key)
+        return _view(self._title(row), self._authors[self._author_of[row]], isbn, key)
+
+    # Mapping interface
+
+    def __getitem__(self, isbn: str) -> Book:
+        row = self._row(isbn)
+        if row is None:
+            raise KeyError(isbn)
+        return self._book(row, isbn)
+
+    def __setitem__(self, isbn: str, book: Book) -> None:
+        row = self._row(isbn)
+        if row is not None:
+            # Same key: update in place, the position stays
+            self._replace_title(row, book.title)
+            self._author_of[row] = self._author_id(book.author)
+            self._set_alt(row, isbn, book)
+            self._maybe_compact()
+            return
+        row = len(self._isbns)
+        packed = _pack(isbn)
+        if packed is None:
+            self._odd[isbn] = row
+            self._odd_isbns[row] = isbn
+            packed = 0
+        else:
+            self._table_put(packed, row)
+        self._isbns.append(packed)
+        self._seqs.append(self._next_seq)
+        self._next_seq += 1
+        self._author_of.append(self._author_id(book.author))
+        self._title_at.append(0)
+        self._title_len.append(0)
+        self._set_title(row, book.title)
+        self._set_alt(row, isbn, book)
+
+    def _set_alt(self, row: int, key: str, book: Book) -> None:
+        if book.isbn != key:
+            self._alt[row] = book.isbn
+        else:
+            self._alt.pop(row, None)
+
+    def __delitem__(self, isbn: str) -> None:
+        packed = _pack(isbn)
+        row = self._odd.pop(isbn, None) if packed is None else self._table_pop(packed)
+        if row is None:
+            raise KeyError(isbn)
+        self._odd_isbns.pop(row, None)
+        self._alt.pop(row, None)
+        self._author_of[row] = _DEAD
+        self._dead += 1
+        self._wasted += self._title_len[row]
+        self._maybe_compact()
+
+    def __contains__(self, isbn: object) -> bool:
+        return isinstance(isbn, str) and self._row(isbn) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for row, aid in enumerate(self._author_of):
+            if aid != _DEAD:
+                yield self._key_at(row)
+
+    def __len__(self) -> int:
+        return len(self._isbns) - self._dead
+
+    def sequence(self, isbn: str) -> Optional[int]:
+        """Insertion number of the book stored under isbn, or None."""
+        row = self._row(isbn)
+        return None if row is None else self._seqs[row]
+
+    def chunk_after(self, seq: int, limit: int) -> Tuple[List[Book], int]:
+        """Up to limit books inserted after the one numbered seq, in order, and the
+        number to continue from. Rows may be compacted between two calls."""
+        seqs = self._seqs
+        row = start = bisect_right(seqs, seq)  # numbers only grow along the rows
+        books: List[Book] = []
+        while row < len(seqs) and len(books) < limit:
+            if self._author_of[row] != _DEAD:
+                books.append(self._book(row, self._key_at(row)))
+            row += 1
+        return books, seqs[row - 1] if row > start else seq
+
+    def values(self) -> Iterator[Book]:  # type: ignore[override]
+        """Book views in insertion order (a one-pass iterator)."""
+        for row, aid in enumerate(self._author_of):
+            if aid != _DEAD:
+                yield self._book(row, self._key_at(row))
+
+    def _maybe_compact(self) -> None:
+        if (self._dead >= _COMPACT_MIN and self._dead * 2 > len(self._isbns)) or (
+            self._wasted >= _COMPACT_MIN_BYTES and self._wasted * 2 > len(self._text)
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        # Drop deleted rows and unused title bytes; authors stay interned
+        fresh = BookStore()
+        fresh._authors = self._authors
+        fresh._author_ids = self._author_ids
+        seqs = array("Q")
+        for row, aid in enumerate(self._author_of):
+            if aid != _DEAD:
+                key = self._key_at(row)
+                fresh[key] = self._book(row, key)
+                seqs.append(self._seqs[row])
+        fresh._seqs = seqs
+        fresh._next_seq = self._next_seq
+        self.__dict__.update(fresh.__dict__)
@@ -0,0 +1,137 @@
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from . import metrics
+
+# Returned by get() when a key is not cached (None is a valid cached value)
+MISSING = object()
+
+# The disk tier is pruned once every this many writes (and when it is opened)
+PRUNE_EVERY = 256
+
+CACHE_REQUESTS = metrics.counter(
+    "library_cache_requests_total", "Cache lookups by result (hit, stale, miss).", ("cache", "result")
+)
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a TTL.
+
+    ``None`` values are "negative" entries (e.g. a 404) and use the shorter
+    ``negative_ttl``. With ``persist_path`` set, entries are also written to a
+    small SQLite file so they survive restarts and are shared between workers.
+    The file keeps at most ``disk_maxsize`` rows (those expiring first go) and
+    drops rows ``stale_ttl`` seconds after they expired; until then they can
+    still be served with ``allow_stale``.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: float = 24 * 3600,
+        negative_ttl: float = 600,
+        persist_path: Optional[str | Path] = None,
+        name: str = "cache",
+        disk_maxsize: int = 100_000,
+        stale_ttl: float = 7 * 24 * 3600,
+    ) -> None:
+        self.name = name  # "cache" label of the metrics
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.disk_maxsize = disk_maxsize
+        self.stale_ttl = stale_ttl
+        self._writes = 0  # disk writes since the last prune
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        if persist_path:
+            self._disk = sqlite3.connect(str(persist_path), check_same_thread=False, isolation_level=None)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+            self._prune()
+
+    def _prune(self) -> None:
+        # Long-expired rows first, then the soonest-expiring ones over the limit
+        self._writes = 0
+        self._disk.execute("DELETE FROM cache WHERE expires < ?", (time.time() - self.stale_ttl,))
+        excess = self._disk.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.disk_maxsize
+        if excess > 0:
+            self._disk.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires LIMIT ?)", (excess,)
+            )
+
+    def _disk_get(self, key: str) -> Tuple[float, Any]:
+        row = self._disk.execute("SELECT expires, value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return 0.0, MISSING
+        return row[0], json.loads(row[1])
+
+    def get(self, key: str, allow_stale: bool = False) -> Any:
+        """Cached value for key, or MISSING. allow_stale also returns expired entries."""
+        now = time.time()
+        with self._lock:
+            expires, value = self._data.get(key, (0.0, MISSING))
+            if value is MISSING and self._disk is not None:
+                expires, value = self._disk_get(key)
+                if value is not MISSING:
+                    self._remember(key, expires, value)
+            if value is not MISSING and (expires > now or allow_stale):
+                self._data.move_to_end(key)
+                self.hits += 1
+                CACHE_REQUESTS.inc(cache=self.name, result="hit" if expires > now else "stale")
+                return value
+            self.misses += 1
+        CACHE_REQUESTS.inc(cache=self.name, result="miss")
+        return MISSING
+
+    def _remember(self, key: str, expires: float, value: Any) -> None:
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        expires = time.time() + ttl
+        with self._lock:
+            self._remember(key, expires, value)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                    (key, expires, json.dumps(value)),
+                )
+                self._writes += 1
+                if self._writes >= PRUNE_EVERY:
+                    self._prune()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
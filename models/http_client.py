@@ -0,0 +1,376 @@
+from __future__ import annotations
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from . import metrics
+
+# Shared, connection-pooled HTTP clients for Open Library.
+# One sync client (Library, CLI) and one async client (FastAPI), created on
+# first use or in the API lifespan hook and kept alive between requests.
+#
+# get()/aget() add the upstream safety net on top: retries with jittered
+# exponential backoff, a per-host circuit breaker, a per-host concurrency
+# limit and (async, optional) hedged requests.
+
+HTTP_HEADERS = {
+    "User-Agent": "library_app/1.0",
+    "Accept": "application/json",
+}
+
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("OPENLIB_MAX_CONNECTIONS", "20")),
+    max_keepalive_connections=int(os.getenv("OPENLIB_MAX_KEEPALIVE", "10")),
+    keepalive_expiry=float(os.getenv("OPENLIB_KEEPALIVE_EXPIRY", "30")),
+)
+TIMEOUT = httpx.Timeout(
+    float(os.getenv("OPENLIB_TIMEOUT", "10")),
+    connect=float(os.getenv("OPENLIB_CONNECT_TIMEOUT", "5")),
+)
+
+# Retries for GETs: attempts after the first, backoff base/cap in seconds, and
+# a total time budget per call (all attempts together)
+RETRIES = int(os.getenv("OPENLIB_RETRIES", "2"))
+BACKOFF_BASE = float(os.getenv("OPENLIB_BACKOFF_BASE", "0.1"))
+BACKOFF_MAX = float(os.getenv("OPENLIB_BACKOFF_MAX", "2"))
+DEADLINE = float(os.getenv("OPENLIB_DEADLINE", "8"))
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Circuit breaker: opens when at least BREAKER_MIN_CALLS of the last
+# BREAKER_WINDOW calls were made and BREAKER_ERROR_RATE of them failed;
+# after BREAKER_COOLDOWN seconds one trial call decides whether it closes
+BREAKER_WINDOW = int(os.getenv("OPENLIB_BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS = int(os.getenv("OPENLIB_BREAKER_MIN_CALLS", "10"))
+BREAKER_ERROR_RATE = float(os.getenv("OPENLIB_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_COOLDOWN = float(os.getenv("OPENLIB_BREAKER_COOLDOWN", "30"))
+
+# Requests in flight per host (on top of the pool limits)
+HOST_CONCURRENCY = int(os.getenv("OPENLIB_HOST_CONCURRENCY", "8"))
+
+# Hedging (async only): when a call is slower than the host's p95 latency, send
+# a second copy and take whichever answers first
+HEDGE = os.getenv("OPENLIB_HEDGE", "0") == "1"
+HEDGE_MIN_SAMPLES = 20
+LATENCY_SAMPLES = 200
+
+UPSTREAM_SECONDS = metrics.histogram(
+    "library_upstream_request_duration_seconds",
+    "Open Library calls (each attempt) by endpoint and status.",
+    ("host", "endpoint", "status"),
+)
+
+_sync_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _http2_available() -> bool:
+    # HTTP/2 needs the optional "h2" package (pip install "httpx[http2]")
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _client_options() -> dict:
+    return {
+        "headers": HTTP_HEADERS,
+        "limits": POOL_LIMITS,
+        "timeout": TIMEOUT,
+        "follow_redirects": True,
+        "http2": _http2_available(),
+    }
+
+
+def configure(limits: Optional[httpx.Limits] = None, timeout: Optional[httpx.Timeout] = None) -> None:
+    """Change pool limits/timeouts; applies to clients created afterwards."""
+    global POOL_LIMITS, TIMEOUT
+    if limits is not None:
+        POOL_LIMITS = limits
+    if timeout is not None:
+        TIMEOUT = timeout
+
+
+def get_client() -> httpx.Client:
+    """The shared sync client."""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(**_client_options())
+    return _sync_client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """The shared async client for the running event loop."""
+    global _async_client, _async_loop
+    loop = asyncio.get_running_loop()
+    # Pooled connections belong to one event loop; a new loop gets a new client
+    if _async_client is None or _async_client.is_closed or _async_loop is not loop:
+        _async_client = httpx.AsyncClient(**_client_options())
+        _async_loop = loop
+    return _async_client
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        super().__init__(f"{host} is failing; not calling it for {retry_after:.0f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed -> open (after too many errors) -> half-open (one trial) -> closed."""
+
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.state = "closed"
+        self._results: Deque[bool] = deque(maxlen=BREAKER_WINDOW)
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go out now."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            waited = time.monotonic() - self._opened_at
+            if self.state == "open" and waited >= BREAKER_COOLDOWN:
+                self.state = "half-open"
+            if self.state == "half-open" and not self._trial:
+                self._trial = True
+                return
+            raise CircuitOpenError(self.host, max(BREAKER_COOLDOWN - waited, 0.0))
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if self.state == "open":
+                return  # a call that started before the breaker opened
+            if self.state == "half-open":
+                # the trial call decides
+                self._trial = False
+                if ok:
+                    self.state = "closed"
+                    self._results.clear()
+                else:
+                    self.state = "open"
+                    self._opened_at = time.monotonic()
+                return
+            self._results.append(ok)
+            failures = self._results.count(False)
+            if len(self._results) >= BREAKER_MIN_CALLS and failures >= BREAKER_ERROR_RATE * len(self._results):
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class _Host:
+    """Per-host state: breaker, recent latencies and concurrency limits."""
+
+    def __init__(self, host: str) -> None:
+        self.name = host
+        self.breaker = CircuitBreaker(host)
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.slots = threading.BoundedSemaphore(HOST_CONCURRENCY)
+        self.async_slots: Optional[asyncio.Semaphore] = None
+        self.async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def async_semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one loop, like the async client
+        loop = asyncio.get_running_loop()
+        if self.async_slots is None or self.async_loop is not loop:
+            self.async_slots = asyncio.Semaphore(HOST_CONCURRENCY)
+            self.async_loop = loop
+        return self.async_slots
+
+
+_hosts: Dict[str, _Host] = {}
+_hosts_lock = threading.Lock()
+
+
+def _host(url: str) -> _Host:
+    name = urlsplit(url).netloc
+    with _hosts_lock:
+        state = _hosts.get(name)
+        if state is None:
+            state = _hosts[name] = _Host(name)
+        return state
+
+
+def breaker_state(url: str) -> str:
+    """"closed", "open" or "half-open" for the host of url."""
+    return _host(url).breaker.state
+
+
+def reset() -> None:
+    """Forget breaker states and latency samples (tests, or after an outage)."""
+    with _hosts_lock:
+        _hosts.clear()
+
+
+def _backoff(attempt: int, response: Optional[httpx.Response]) -> float:
+    # Full jitter; a numeric Retry-After from the server wins if it is not too long
+    if response is not None:
+        try:
+            return min(float(response.headers.get("Retry-After", "")), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _attempt_options(kwargs: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+    # A numeric timeout never runs past the overall deadline
+    timeout = kwargs.get("timeout")
+    if isinstance(timeout, (int, float)):
+        return {**kwargs, "timeout": max(min(timeout, deadline - time.monotonic()), 0.01)}
+    return kwargs
+
+
+def _endpoint(url: str) -> str:
+    # First path segment ("isbn", "authors", "search", "api"): bounded, unlike the full path
+    return urlsplit(url).path.strip("/").split("/", 1)[0].removesuffix(".json") or "/"
+
+
+def _observe(url: str, host: _Host, seconds: float, response: Optional[httpx.Response]) -> None:
+    status = str(response.status_code) if response is not None else "error"
+    UPSTREAM_SECONDS.observe(seconds, host=host.name, endpoint=_endpoint(url), status=status)
+
+
+def _failed(response: Optional[httpx.Response]) -> bool:
+    return response is None or response.status_code in RETRY_STATUSES or response.status_code >= 500
+
+
+def get(url: str, **kwargs: Any) -> httpx.Response:
+    """GET through the shared sync client, with retries, breaker and host limit.
+
+    Returns the last response (which may be an error status); raises the last
+    transport error, or CircuitOpenError without calling the host.
+    """
+    host = _host(url)
+    deadline = time.monotonic() + DEADLINE
+    for attempt in range(RETRIES + 1):
+        host.breaker.before_call()
+        response, error, ok = None, None, False
+        started = time.monotonic()
+        try:
+            with host.slots:
+                try:
+                    response = get_client().get(url, **_attempt_options(kwargs, deadline))
+                except httpx.TransportError as e:
+                    error = e
+            elapsed = time.monotonic() - started
+            host.latencies.append(elapsed)
+            _observe(url, host, elapsed, response)
+            ok = not _failed(response)
+        finally:
+            # Also on any other error: a half-open breaker must hear how its trial ended
+            host.breaker.record(ok)
+        if ok:
+            return response
+        pause = _backoff(attempt, response)
+        if attempt == RETRIES or time.monotonic() + pause >= deadline:
+            break
+        time.sleep(pause)
+    if error is not None:
+        raise error
+    return response
+
+
+async def _timed(host: _Host, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+    async with host.async_semaphore():
+        started = time.monotonic()
+        try:
+            return await send()
+        finally:
+            host.latencies.append(time.monotonic() - started)
+
+
+async def _hedged(host: _Host, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+    # Second copy only if the first is slower than p95; first good answer wins
+    p95 = host.p95() if HEDGE else None
+    first = asyncio.ensure_future(_timed(host, send))
+    if p95 is None:
+        return await first
+    done, _ = await asyncio.wait({first}, timeout=p95)
+    if done:
+        return first.result()
+    second = asyncio.ensure_future(_timed(host, send))
+    pending = {first, second}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and not _failed(task.result()):
+                    return task.result()
+        # both failed: report the first one's outcome
+        return first.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def aget(url: str, **kwargs: Any) -> httpx.Response:
+    """Async get(): same retries, breaker and host limit, plus optional hedging."""
+    host = _host(url)
+    deadline = time.monotonic() + DEADLINE
+    client = get_async_client()
+    for attempt in range(RETRIES + 1):
+        host.breaker.before_call()
+        response, error, ok = None, None, False
+        options = _attempt_options(kwargs, deadline)
+        started = time.monotonic()
+        try:
+            try:
+                response = await _hedged(host, lambda: client.get(url, **options))
+            except httpx.TransportError as e:
+                error = e
+            _observe(url, host, time.monotonic() - started, response)
+            ok = not _failed(response)
+        finally:
+            # Cancelled (shutdown, a stopped refresher) or another error counts as a failure
+            host.breaker.record(ok)
+        if ok:
+            return response
+        pause = _backoff(attempt, response)
+        if attempt == RETRIES or time.monotonic() + pause >= deadline:
+            break
+        await asyncio.sleep(pause)
+    if error is not None:
+        raise error
+    return response
+
+
+async def start() -> None:
+    """Create the async client up front (FastAPI lifespan startup)."""
+    get_async_client()
+
+
+def close() -> None:
+    global _sync_client
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+
+
+async def aclose() -> None:
+    """Close both clients (FastAPI lifespan shutdown)."""
+    global _async_client, _async_loop
+    if _async_client is not None and _async_loop is asyncio.get_running_loop():
+        await _async_client.aclose()
+    _async_client = None
+    _async_loop = None
+    close()
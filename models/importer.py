@@ -0,0 +1,132 @@
+from __future__ import annotations
+import asyncio
+from collections import Counter
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
+
+import httpx
+
+from .isbn import canonical, normalize
+from .abstract_library import AbstractLibrary
+from .batcher import IsbnBatcher
+from .book import Book
+from .library import fetch_book_async
+
+# Default number of ISBNs fetched at the same time
+IMPORT_WORKERS = 8
+# Most books stored with one save
+STORE_GROUP = 500
+
+_DONE = object()
+
+
+def read_isbns(lines: Iterable[str]) -> Iterator[str]:
+    """ISBNs from text lines; blank lines and "#" comments are skipped."""
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+async def import_isbns(
+    lib: AbstractLibrary,
+    isbns: Iterable[str],
+    workers: int = IMPORT_WORKERS,
+    batch: bool = True,
+) -> AsyncIterator[dict]:
+    """Fetch and add many ISBNs; yields one result per ISBN as soon as it is done.
+
+    Up to ``workers`` Open Library lookups run at once. With ``batch`` the
+    lookups waiting at the same moment share one multi-ISBN request (see
+    IsbnBatcher). Found books are stored in groups: everything that arrived
+    while the previous group was being saved goes in with one save, and a book
+    is reported as "added" once it is on disk. The last item is a summary:
+    ``{"summary": {"added": .., ...}}``.
+    """
+    batcher = IsbnBatcher() if batch else None
+    counts: Counter = Counter()
+    todo: asyncio.Queue = asyncio.Queue(maxsize=workers * 4)
+    found: asyncio.Queue = asyncio.Queue()
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def fetch(n: str) -> Optional[dict]:
+        if await asyncio.to_thread(lib.find_book, n):
+            return {"isbn": n, "status": "exists"}
+        try:
+            if batcher is not None:
+                book = await batcher.fetch(n)
+            else:
+                book = await fetch_book_async(n, strict=True)
+        except httpx.HTTPError as e:
+            return {"isbn": n, "status": "error", "detail": str(e) or type(e).__name__}
+        if book is None:
+            return {"isbn": n, "status": "not_found"}
+        await found.put((n, book))
+        return None  # reported by store()
+
+    def add_group(books: List[Book]) -> List[bool]:
+        # Only this import's books are held back, and only for this one save
+        with lib.batch():
+            return [lib.add_book(b) for b in books]
+
+    async def store() -> None:
+        while (item := await found.get()) is not _DONE:
+            group = [item]
+            while len(group) < STORE_GROUP and not found.empty():
+                item = found.get_nowait()
+                if item is _DONE:
+                    found.put_nowait(_DONE)
+                    break
+                group.append(item)
+            # Disk work stays off the event loop
+            added = await asyncio.to_thread(add_group, [book for _, book in group])
+            for (n, book), ok in zip(group, added):
+                if ok:
+                    await results.put({"isbn": n, "status": "added", "book": book.to_dict()})
+                else:
+                    await results.put({"isbn": n, "status": "exists"})
+
+    async def worker() -> None:
+        while True:
+            n = await todo.get()
+            if n is _DONE:
+                break
+            item = await fetch(n)
+            if item is not None:
+                await results.put(item)
+
+    async def feed() -> None:
+        # Dedupe inside the request before anything is fetched
+        seen = set()
+        for raw in isbns:
+            n = normalize(raw)
+            if not n or len(n) < 4:
+                await results.put({"isbn": raw, "status": "invalid"})
+            elif canonical(n) in seen:
+                await results.put({"isbn": n, "status": "duplicate"})
+            else:
+                seen.add(canonical(n))
+                await todo.put(n)
+        for _ in range(workers):
+            await todo.put(_DONE)
+
+    async def lookups() -> None:
+        try:
+            await asyncio.gather(feed(), *(worker() for _ in range(workers)))
+        finally:
+            found.put_nowait(_DONE)
+
+    async def run() -> None:
+        try:
+            await asyncio.gather(lookups(), store())
+        finally:
+            await results.put(_DONE)
+
+    runner = asyncio.create_task(run())
+    try:
+        while (item := await results.get()) is not _DONE:
+            counts[item["status"]] += 1
+            yield item
+        await runner  # re-raise unexpected errors
+    finally:
+        runner.cancel()
+    yield {"summary": dict(counts)}
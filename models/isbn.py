@@ -0,0 +1,85 @@
+from __future__ import annotations
+import re
+from functools import lru_cache
+
+# Normalized/canonical forms are cached per input string
+CACHE_SIZE = 1 << 16
+
+# What a user may type: digits, an X check digit at the end, spaces and dashes
+_WELL_FORMED = re.compile(r"[\d\s-]*\d[\d\s-]*[xX]?\s*")
+
+
+def is_well_formed(text: str) -> bool:
+    """True if text only has ISBN characters (digits, spaces, dashes, a final X)."""
+    return bool(_WELL_FORMED.fullmatch(text or ""))
+
+
+def _normalize(text: str) -> str:
+    text = (text or "").strip()
+    digits = "".join(ch for ch in text if ch.isdigit())
+    return digits + "X" if text.upper().endswith("X") else digits
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize(text: str) -> str:
+    """Digits of text plus a trailing X if it ends with one: "0-14-044926-x" -> "014044926X"."""
+    return _normalize(text)
+
+
+def isbn10_check_digit(first9: str) -> str:
+    total = sum((10 - i) * int(d) for i, d in enumerate(first9))
+    check = (11 - total % 11) % 11
+    return "X" if check == 10 else str(check)
+
+
+def isbn13_check_digit(first12: str) -> str:
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(first12))
+    return str((10 - total % 10) % 10)
+
+
+def is_valid_isbn10(n: str) -> bool:
+    return len(n) == 10 and n[:9].isdigit() and isbn10_check_digit(n[:9]) == n[9]
+
+
+def is_valid_isbn13(n: str) -> bool:
+    return len(n) == 13 and n.isdigit() and isbn13_check_digit(n[:12]) == n[12]
+
+
+def is_valid(text: str) -> bool:
+    """True for an ISBN-10 or ISBN-13 with a correct check digit."""
+    n = normalize(text)
+    return is_valid_isbn10(n) or is_valid_isbn13(n)
+
+
+def to_isbn13(isbn10: str) -> str:
+    """ISBN-13 for a valid normalized ISBN-10 ("0140449264" -> "9780140449266")."""
+    first12 = "978" + isbn10[:9]
+    return first12 + isbn13_check_digit(first12)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical(text: str) -> str:
+    """Lookup key for an ISBN: the same book as ISBN-10 or ISBN-13 gets the same key.
+
+    A valid ISBN-10 becomes its ISBN-13. Anything else (a valid ISBN-13, or a
+    number that is not a real ISBN, like an in-house code) is just normalized,
+    so it still works as a key.
+    """
+    return key_of(text)
+
+
+def key_of(text: str) -> str:
+    """canonical() without the cache, for keys computed once per stored book.
+
+    Loading a large catalog sees every ISBN once, so caching those would only
+    evict the query-side entries. A plain 13-digit ISBN is already its own key.
+    """
+    if text.isdigit():
+        if len(text) == 13:
+            return text
+        n = text
+    else:
+        n = _normalize(text)
+    if is_valid_isbn10(n):
+        return to_isbn13(n)
+    return n
@@ -0,0 +1,288 @@
+from __future__ import annotations
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .storage import _atomic_write_text
+
+# The journal is rewritten with just the current jobs once it has this many
+# lines (and over twice as many as there are jobs)
+COMPACT_MIN = 1000
+# Job states; PENDING and RUNNING jobs are picked up again after a restart
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+NOT_FOUND = "not_found"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = frozenset({DONE, NOT_FOUND, FAILED, CANCELLED})
+
+
+class QueueFull(Exception):
+    """Too many jobs are waiting; try again later."""
+
+
+class JobCancelled(Exception):
+    """Raised by a handler when its job no longer makes sense (e.g. the book was deleted)."""
+
+
+@dataclass
+class Job:
+    """One ISBN to look up in the background."""
+
+    isbn: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = PENDING
+    attempts: int = 0
+    error: Optional[str] = None
+    result: Optional[dict] = None
+    created: float = field(default_factory=time.time)
+    updated: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        return cls(**{k: data[k] for k in cls.__dataclass_fields__ if k in data})
+
+
+# handler(isbn) -> result dict, or None if there is nothing to find; raising retries the job
+Handler = Callable[[str], Awaitable[Optional[dict]]]
+# called once for a job that ends without a result (not found, failed, cancelled)
+Cleanup = Callable[[Job], Awaitable[None]]
+
+
+class JobQueue:
+    """Background jobs run by a fixed number of asyncio workers, kept in a journal file.
+
+    ``submit`` stores the job and returns at once; ``start`` (in the app's
+    lifespan) launches ``workers`` tasks and re-queues jobs that were still
+    waiting or running when the process stopped. A handler error is retried
+    ``retries`` times with jittered exponential backoff (or the error's
+    ``retry_after``).
+
+    Every state change appends one JSON line to the file (a job's last line
+    wins), and changes made while a write is in progress share the next write
+    and fsync, so a submit costs the same however many jobs there are. Now and
+    then the file is rewritten with every unfinished job plus the newest
+    ``keep`` finished ones.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        handler: Handler,
+        cleanup: Optional[Cleanup] = None,
+        workers: int = 4,
+        retries: int = 3,
+        backoff: float = 1.0,
+        backoff_max: float = 60.0,
+        max_pending: int = 10_000,
+        keep: int = 1000,
+    ) -> None:
+        self.path = Path(path)
+        self.handler = handler
+        self.cleanup = cleanup
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.max_pending = max_pending
+        self.keep = keep
+        self._jobs: Dict[str, Job] = {}
+        self._pending = 0  # jobs not finished yet
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._save_lock: Optional[asyncio.Lock] = None
+        self._unsaved: List[str] = []  # journal lines waiting for the next write
+        self._lines = 0  # lines in the journal file
+        self._rewrite = False  # the file is in the old format: rewrite before appending
+        self._load()
+
+    # Storage
+
+    def _load(self) -> None:
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except OSError:
+            return
+        if text.lstrip().startswith("["):
+            # a JSON array, as written before the journal
+            self._rewrite = True
+            try:
+                items = json.loads(text)
+            except ValueError:
+                items = []
+        else:
+            items = []
+            for line in text.splitlines():
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    continue  # torn last line (crash while writing)
+        for item in items if isinstance(items, list) else []:
+            try:
+                job = Job.from_dict(item)
+            except TypeError:
+                continue
+            self._jobs[job.id] = job
+        self._lines = len(items) if isinstance(items, list) else 0
+        self._pending = sum(1 for j in self._jobs.values() if j.status not in FINISHED)
+
+    def _snapshot(self) -> str:
+        finished = sorted((j for j in self._jobs.values() if j.status in FINISHED), key=lambda j: j.updated)
+        for old in finished[: max(len(finished) - self.keep, 0)]:
+            del self._jobs[old.id]
+        return "".join(json.dumps(j.to_dict(), ensure_ascii=False) + "\n" for j in self._jobs.values())
+
+    def _append(self, lines: List[str]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _save(self, job: Optional[Job] = None) -> None:
+        """Journal job's current state; without a job, rewrite the file with all jobs."""
+        if job is not None:
+            self._unsaved.append(json.dumps(job.to_dict(), ensure_ascii=False))
+        if self._save_lock is None:
+            self._save_lock = asyncio.Lock()
+        # Serialized: a later state never gets overwritten by an earlier one
+        async with self._save_lock:
+            if job is not None and not self._unsaved:
+                return  # written along with other changes while we waited
+            lines, self._unsaved = self._unsaved, []
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if job is None or self._rewrite or self._lines + len(lines) > max(COMPACT_MIN, 2 * len(self._jobs)):
+                    snapshot = self._snapshot()  # also covers the lines just taken
+                    await asyncio.to_thread(_atomic_write_text, self.path, snapshot)
+                    self._lines, self._rewrite = len(self._jobs), False
+                else:
+                    await asyncio.to_thread(self._append, lines)
+                    self._lines += len(lines)
+            except BaseException:
+                # Maybe half a line on disk: the next write rewrites the whole file,
+                # and callers still waiting for these lines make it
+                self._unsaved[:0] = lines
+                self._rewrite = True
+                raise
+
+    # API
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def pending(self) -> int:
+        return self._pending
+
+    async def submit(self, isbn: str) -> Job:
+        """Store a new job for isbn and queue it; raises QueueFull when too many are waiting."""
+        if self.pending() >= self.max_pending:
+            raise QueueFull(f"{self.max_pending} jobs are already waiting.")
+        job = Job(isbn)
+        self._jobs[job.id] = job
+        self._pending += 1
+        try:
+            await self._save(job)
+        except BaseException:
+            # Not stored: forget it (the next write rewrites the file without it)
+            del self._jobs[job.id]
+            self._pending -= 1
+            raise
+        if self._queue is not None:
+            self._queue.put_nowait(job.id)
+        return job
+
+    async def start(self) -> None:
+        """Launch the workers and queue the jobs left over from the last run."""
+        self._queue = asyncio.Queue()
+        for job in self._jobs.values():
+            if job.status not in FINISHED:
+                job.status = PENDING
+                self._queue.put_nowait(job.id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; unfinished jobs stay in the file for the next start."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        await self._save()
+
+    async def join(self) -> None:
+        """Wait until every job has finished (tests, shutdown scripts)."""
+        while self.pending():
+            await asyncio.sleep(0.01)
+
+    # Workers
+
+    async def _worker(self) -> None:
+        while True:
+            job = self._jobs.get(await self._queue.get())
+            if job is None or job.status != PENDING:
+                continue
+            try:
+                await self._run(job)
+            except Exception as e:  # e.g. the journal could not be written: try the job again later
+                if job.status not in FINISHED:
+                    job.status, job.error, job.updated = PENDING, str(e) or type(e).__name__, time.time()
+                    loop = asyncio.get_running_loop()
+                    self._timers[job.id] = loop.call_later(self._delay(job, e), self._requeue, job.id)
+
+    def _delay(self, job: Job, error: Exception) -> float:
+        retry_after = getattr(error, "retry_after", None)
+        if isinstance(retry_after, (int, float)) and retry_after > 0:
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** (job.attempts - 1)))
+
+    def _requeue(self, job_id: str) -> None:
+        self._timers.pop(job_id, None)
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+    async def _finish(self, job: Job, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        # Cleanup first: whoever polls the job sees it finished only once that is done
+        if status != DONE and self.cleanup is not None:
+            try:
+                await self.cleanup(job)
+            except Exception as e:
+                error = f"{error or status}; cleanup failed: {e}"
+        job.status, job.result, job.error, job.updated = status, result, error, time.time()
+        self._pending -= 1
+        await self._save(job)
+
+    async def _run(self, job: Job) -> None:
+        job.status, job.updated = RUNNING, time.time()
+        job.attempts += 1
+        await self._save(job)
+        try:
+            result = await self.handler(job.isbn)
+        except asyncio.CancelledError:
+            job.status = PENDING  # shutting down: run again after the restart
+            raise
+        except JobCancelled as e:
+            await self._finish(job, CANCELLED, error=str(e))
+        except Exception as e:
+            if job.attempts > self.retries:
+                await self._finish(job, FAILED, error=str(e) or type(e).__name__)
+                return
+            job.status, job.error, job.updated = PENDING, str(e) or type(e).__name__, time.time()
+            await self._save(job)
+            loop = asyncio.get_running_loop()
+            self._timers[job.id] = loop.call_later(self._delay(job, e), self._requeue, job.id)
+        else:
+            await self._finish(job, DONE if result is not None else NOT_FOUND, result=result)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import json
+import os
+from typing import Any, Iterator, TextIO
+
+# "json" (standard library, default) or "orjson" (faster, used only if installed)
+JSON_BACKEND = os.getenv("LIBRARY_JSON_BACKEND", "json")
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+CHUNK_SIZE = 1 << 16
+
+
+def use_orjson() -> bool:
+    return JSON_BACKEND == "orjson" and orjson is not None
+
+
+def loads(data: str | bytes) -> Any:
+    if use_orjson():
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize to text; non-ASCII characters are kept as they are."""
+    if use_orjson():
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+
+def iter_array(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array one at a time.
+
+    The file is read in chunks, so memory stays around one chunk plus one item
+    instead of the whole file. Raises ValueError on malformed input (items
+    before the error have already been yielded).
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def more() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_ws() -> bool:
+        # Move pos to the next non-whitespace character, reading as needed
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf):
+                return True
+            if not more():
+                return False
+
+    if not skip_ws():
+        return  # empty file: no items
+    if buf[pos] != "[":
+        raise ValueError("Expected a JSON array.")
+    pos += 1
+
+    first = True
+    while True:
+        if not skip_ws():
+            raise ValueError("Unexpected end of JSON array.")
+        if buf[pos] == "]":
+            return
+        if not first:
+            if buf[pos] != ",":
+                raise ValueError(f"Expected ',' at offset {pos}.")
+            pos += 1
+            if not skip_ws():
+                raise ValueError("Unexpected end of JSON array.")
+        first = False
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof or not more():
+                    raise
+                continue
+            # A number could be cut at the chunk border; make sure it really ended
+            if end == len(buf) and not eof and more():
+                continue
+            break
+        yield item
+        pos = end
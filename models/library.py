@@ -1,140 +1,610 @@
 from __future__ import annotations
-import json
-from pathlib import Path
-from typing import List, Optional
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Hashable, Iterable, Iterator, List, MutableMapping, Optional, Tuple
 import httpx
 
 from .abstract_library import AbstractLibrary
 from .book import Book
+from .book_store import BookStore
+from . import isbn as isbns
+from .cache import MISSING, TTLCache
+from .filelock import FileLock
+from .mirror import get_mirror
+from .prefix import PrefixIndex
+from .profiling import span
+from .search import SearchIndex
+from . import http_client, metrics
+from .storage import Change, JsonFileStorage, Storage, WalStorage
 
 OPENLIB_BASE = "https://openlibrary.org"
 HTTP_TIMEOUT = 5.0
-HTTP_HEADERS = {
-    "User-Agent": "library_app/1.0",
-    "Accept": "application/json",
-}
+# max author lookups in flight for one book
+AUTHOR_CONCURRENCY = 4
 
-def _safe_get_json(url: str) -> Optional[dict]:
+STORAGE_SECONDS = metrics.histogram(
+    "library_storage_duration_seconds", "Reading/writing the catalog storage, by engine and operation.",
+    ("storage", "op"),
+)
+STORAGE_BYTES = metrics.histogram(
+    "library_storage_bytes", "Size of the catalog on disk after a load or save.", ("storage", "op"),
+    buckets=metrics.BYTES_BUCKETS,
+)
+
+# Open Library responses (editions and authors), keyed by URL; 404s are cached too
+openlib_cache = TTLCache(
+    maxsize=int(os.getenv("OPENLIB_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("OPENLIB_CACHE_TTL", str(24 * 3600))),
+    negative_ttl=float(os.getenv("OPENLIB_CACHE_NEGATIVE_TTL", "600")),
+    persist_path=os.getenv("OPENLIB_CACHE_FILE") or None,
+    disk_maxsize=int(os.getenv("OPENLIB_CACHE_FILE_SIZE", "100000")),
+    name="openlibrary",
+)
+
+def _cache_response(url: str, r: httpx.Response) -> Optional[dict]:
+    if r.status_code == 404:
+        openlib_cache.set(url, None)
+        return None
+    r.raise_for_status()
     try:
-        r = httpx.get(url, headers=HTTP_HEADERS, timeout=HTTP_TIMEOUT, follow_redirects=True)
-    except httpx.RequestError:
+        data = r.json()
+    except ValueError:
         return None
-    if r.status_code == 404:
+    openlib_cache.set(url, data)
+    return data
+
+def _stale_or_raise(url: str, error: http_client.CircuitOpenError) -> Optional[dict]:
+    # Open Library is failing: an expired cache entry beats no answer
+    stale = openlib_cache.get(url, allow_stale=True)
+    if stale is MISSING:
+        raise error
+    return stale
+
+def get_json(url: str) -> Optional[dict]:
+    """Cached GET; None on 404, raises httpx errors for network/server problems.
+
+    Goes through http_client.get (retries, circuit breaker); while the breaker
+    is open an expired cached answer is returned if there is one.
+    """
+    cached = openlib_cache.get(url)
+    if cached is not MISSING:
+        return cached
+    try:
+        return _cache_response(url, http_client.get(url, timeout=HTTP_TIMEOUT))
+    except http_client.CircuitOpenError as e:
+        return _stale_or_raise(url, e)
+
+async def get_json_async(url: str) -> Optional[dict]:
+    """Async version of get_json."""
+    cached = openlib_cache.get(url)
+    if cached is not MISSING:
+        return cached
+    try:
+        return _cache_response(url, await http_client.aget(url, timeout=HTTP_TIMEOUT))
+    except http_client.CircuitOpenError as e:
+        return _stale_or_raise(url, e)
+
+def _safe_get_json(url: str) -> Optional[dict]:
+    try:
+        return get_json(url)
+    except httpx.HTTPError:
         return None
+
+async def _safe_get_json_async(url: str) -> Optional[dict]:
     try:
-        r.raise_for_status()
-        return r.json()
-    except (httpx.HTTPStatusError, ValueError):
+        return await get_json_async(url)
+    except httpx.HTTPError:
         return None
 
+# Offline mirror first (see models/mirror.py), then Open Library
+
+def _edition_json(isbn: str) -> Optional[dict]:
+    m = get_mirror()
+    return (m.edition(isbn) if m else None) or _safe_get_json(f"{OPENLIB_BASE}/isbn/{isbn}.json")
+
+def _author_json(key: str) -> Optional[dict]:
+    m = get_mirror()
+    return (m.author(key) if m else None) or _safe_get_json(f"{OPENLIB_BASE}{key}.json")
+
+async def _author_json_async(key: str) -> Optional[dict]:
+    m = get_mirror()
+    return (m.author(key) if m else None) or await _safe_get_json_async(f"{OPENLIB_BASE}{key}.json")
+
 def _join_authors(names: List[str]) -> str:
     return ", ".join(n for n in names if n) if names else ""
 
+def _author_keys(book_json: dict) -> List[str]:
+    keys: List[str] = []
+    alist = book_json.get("authors")
+    if isinstance(alist, list):
+        for a in alist:
+            # Could be {"key": "/authors/OL..."} or {"author": {"key": ...}}
+            key = (a or {}).get("key") or (a.get("author") or {}).get("key")
+            if key:
+                keys.append(key)
+    return keys
+
+def _author_name(ajson: Optional[dict]) -> str:
+    return str(ajson["name"]).strip() if ajson and ajson.get("name") else ""
+
+def _build_book(isbn: str, book_json: dict, names: List[str]) -> Optional[Book]:
+    title = (book_json.get("title") or "").strip()
+    if not title:
+        return None
+    names = [n for n in names if n]
+    if not names:
+        by_stmt = (book_json.get("by_statement") or "").strip()
+        if by_stmt:
+            names = [by_stmt.split(";")[0]]
+    author = _join_authors(names) or "Unknown Author"
+    return Book(title=title, author=author, isbn=isbn)
+
+def fetch_book(isbn: str) -> Optional[Book]:
+    """Build a Book from Open Library data for a normalized ISBN (None if not found/error)."""
+    with span("fetch_edition"):
+        book_json = _edition_json(isbn)
+    if not book_json or not (book_json.get("title") or "").strip():
+        return None
+    keys = _author_keys(book_json)
+    with span("fetch_authors"):
+        if len(keys) > 1:
+            # Authors are independent, fetch them side by side (map keeps the order)
+            with ThreadPoolExecutor(max_workers=min(AUTHOR_CONCURRENCY, len(keys))) as pool:
+                results = list(pool.map(_author_json, keys))
+        else:
+            results = [_author_json(k) for k in keys]
+    return _build_book(isbn, book_json, [_author_name(a) for a in results])
+
+async def fetch_book_async(isbn: str, strict: bool = False) -> Optional[Book]:
+    """Async fetch_book; authors are resolved concurrently.
+
+    With strict=True, network/server errors on the edition request are raised
+    (so the API can tell them apart from "not found") instead of returning None.
+    """
+    with span("fetch_edition"):
+        m = get_mirror()
+        book_json = m.edition(isbn) if m else None
+        if book_json is None:
+            url = f"{OPENLIB_BASE}/isbn/{isbn}.json"
+            book_json = await (get_json_async(url) if strict else _safe_get_json_async(url))
+    if not book_json or not (book_json.get("title") or "").strip():
+        return None
+    sem = asyncio.Semaphore(AUTHOR_CONCURRENCY)
+
+    async def author(key: str) -> Optional[dict]:
+        async with sem:
+            return await _author_json_async(key)
+
+    with span("fetch_authors"):
+        results = await asyncio.gather(*(author(k) for k in _author_keys(book_json)))
+    return _build_book(isbn, book_json, [_author_name(a) for a in results])
+
 class Library(AbstractLibrary):
-    def __init__(self, storage_file: str = "library.json") -> None:
-        self.storage_path = Path(storage_file)
-        self._books: List[Book] = []
-        self._ensure_file()
-        self.load_books()
+    """Books kept in memory and persisted through a Storage engine.
+
+    Safe to share between threads: reads work on an immutable snapshot that is
+    rebuilt lazily after a change, and writes go through a single writer lock
+    that is held while the change is persisted (so the file sees changes in
+    the same order as memory).
+
+    With shared=True several processes (e.g. uvicorn --workers N) can use the
+    same files: writers take an inter-process file lock, and before reading or
+    writing each process applies the changes the others made (the new part of
+    the WAL, or a diff against a rewritten JSON file). Saves are not held back
+    in this mode, so every change is on disk before the lock is released.
+
+    compact=True keeps no snapshot (that would cost what the column store
+    saves): reads take the short lock and iteration goes a chunk at a time.
+    """
+
+    # books made per chunk when iterating a compact store
+    FETCH_SIZE = 1000
+
+    def __init__(
+        self,
+        storage_file: str = "library.json",
+        storage: Optional[Storage] = None,
+        flush_interval: Optional[float] = None,
+        flush_after: Optional[int] = None,
+        lazy: bool = False,
+        compact: bool = False,
+        shared: bool = False,
+    ) -> None:
+        # storage engine: JSON file by default, or e.g. a WalStorage
+        self.storage = storage or JsonFileStorage(storage_file)
+        self.storage_path = self.storage.path
+        # ISBN key (Book.key) -> Book; dicts keep insertion order, so this is
+        # both the lookup index and the list order. compact=True uses a
+        # column-wise BookStore instead (much less memory for big catalogs)
+        self.compact = compact
+        self._books: MutableMapping[str, Book] = self._new_store()
+        # key -> insertion number, for cursors that outlive their book (a BookStore keeps its own)
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        self._lock = threading.Lock()  # guards _books and _snapshot (short sections only)
+        self._write_lock = threading.RLock()  # one writer at a time, also while saving
+        self._snapshot: Optional[Tuple[Book, ...]] = None
+        self.version = 0  # bumped on every change
+        # title/author search index, built on the first search and then kept up to date
+        self._index: Optional[SearchIndex] = None
+        # ISBN/title prefix index for suggestions, same lifecycle as _index
+        self._prefix: Optional[PrefixIndex] = None
+        # saving held back while inside batch() or until the flusher runs
+        self._batch_depth = 0
+        self._dirty = False
+        self._changes = 0  # changes not saved yet
+        # shared=True: lock file for writers, and the storage stamp we are in sync with
+        self.shared = shared
+        self._file_lock = FileLock(self.storage_path.with_name(self.storage_path.name + ".lock")) if shared else None
+        self._stamp: Hashable = None
+        if shared and isinstance(self.storage, WalStorage):
+            self.storage.background_compaction = False
+        # lazy=True: read the file on first use instead of here
+        self._loaded = False
+        if not lazy:
+            self.load_books()
+
+        # Debounced saving: changes only mark the Library dirty and a background
+        # thread saves at most once per flush_interval seconds, or sooner once
+        # flush_after changes are waiting
+        self.flush_interval = flush_interval
+        self.flush_after = flush_after
+        self._debounced = not shared and (flush_interval is not None or flush_after is not None)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if self._debounced and not self.storage.append_only:
+            self._flusher = threading.Thread(target=self._flush_loop, name="library-flusher", daemon=True)
+            self._flusher.start()
 
     @property
     def books(self) -> List[Book]:
-        return self._books
+        return list(self._view())
 
-    @staticmethod
-    def _norm_isbn(s: str) -> str:
-        s = (s or "").strip()
-        digits = [ch for ch in s if ch.isdigit()]
-        if s.upper().endswith("X"):
-            digits.append("X")
-        return "".join(digits)
+    # digits plus a trailing X; the stored (and shown) form of an ISBN
+    _norm_isbn = staticmethod(isbns.normalize)
+    # lookup key: ISBN-10 and ISBN-13 of the same book share it
+    _key = staticmethod(isbns.canonical)
 
-    def _ensure_file(self) -> None:
-        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.storage_path.exists():
-            self.storage_path.write_text("[]", encoding="utf-8")
+    def _new_store(self) -> MutableMapping[str, Book]:
+        return BookStore() if self.compact else {}
 
-    def load_books(self) -> None:
-        try:
-            raw = json.loads(self.storage_path.read_text(encoding="utf-8") or "[]")
-        except Exception:
-            raw = []
-        out: List[Book] = []
-        for item in raw if isinstance(raw, list) else []:
+    def _view(self) -> Tuple[Book, ...]:
+        # Copy-on-write snapshot: built once per version, shared by all readers
+        self._ensure_current()
+        snap = self._snapshot
+        if snap is None:
+            with self._lock:
+                snap = self._snapshot
+                if snap is None:
+                    snap = tuple(self._books.values())
+                    # A compact store would lose its savings to a cached copy of every Book
+                    if not self.compact:
+                        self._snapshot = snap
+        return snap
+
+    def _changed(self) -> None:
+        # Called with self._lock held
+        self._snapshot = None
+        self.version += 1
+
+    def _persist(self, op: str, record: dict) -> None:
+        # Called with the write lock held.
+        # Append-only storages take the single change; others rewrite everything
+        if self.storage.append_only:
+            with span("persist"), STORAGE_SECONDS.time(storage=self.storage.kind, op="append"):
+                self.storage.append(op, record)
+        elif not self.shared and (self._batch_depth or self._debounced):
+            self._dirty = True
+            self._changes += 1
+            if self.flush_after and self._changes >= self.flush_after:
+                self._wake.set()
+        else:
+            self.save_books()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
             try:
-                if hasattr(Book, "from_dict"):
-                    b = Book.from_dict(item)  # type: ignore[attr-defined]
-                else:
-                    b = Book(
-                        title=item.get("title", ""),
-                        author=item.get("author", ""),
-                        isbn=item.get("isbn", ""),
-                    )
-                b = Book(title=b.title, author=b.author, isbn=self._norm_isbn(b.isbn))
-                out.append(b)
-            except Exception:
+                self.flush()
+            except OSError:
+                pass  # still dirty; the next round (or close) tries again
+
+    @contextmanager
+    def batch(self, flush: bool = True) -> Iterator["Library"]:
+        """Hold back full saves until the outermost batch ends, then save once.
+
+        The write lock is held for the whole block: other threads' changes wait
+        for it rather than being held back with the batch, so nothing they were
+        told is saved sits in memory only. Keep the block short and in one thread.
+        With flush=False the caller is expected to call flush() itself.
+        """
+        with self._write_lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and flush:
+                    self.flush()
+
+    def flush(self) -> None:
+        """Write out anything that is not on disk yet."""
+        with self._write_lock:
+            if self._dirty:
+                self.save_books()
+            else:
+                self.storage.sync()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            with self._write_lock:
+                if not self._loaded:
+                    self.load_books()
+
+    def _ensure_current(self) -> None:
+        # Loaded, and (shared mode) up to date with what other processes wrote
+        self._ensure_loaded()
+        if self._file_lock is not None and self.storage.stamp() != self._stamp:
+            with self._write_lock, self._file_lock:
+                self._catch_up()
+
+    def synced_stamp(self) -> Hashable:
+        """Storage stamp of the data in memory, after applying other processes' changes.
+
+        In shared mode every process with the same files gets the same stamp for
+        the same data, unlike ``version``, which counts per process.
+        """
+        self._ensure_current()
+        return self._stamp
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """The write lock; in shared mode also the file lock, with other processes' changes applied."""
+        with self._write_lock:
+            if self._file_lock is None:
+                yield
+                return
+            with self._file_lock:
+                self._catch_up()
+                yield
+                self._stamp = self.storage.stamp()
+
+    def _catch_up(self) -> None:
+        # Called with the write lock and the file lock held
+        stamp = self.storage.stamp()
+        if stamp == self._stamp:
+            return
+        changes = self.storage.changes_since(self._stamp)
+        if changes is None:
+            updates = self._diff(self._read_books(self.storage.load()))
+        else:
+            updates = self._updates(changes)
+        if updates:
+            self._apply(updates)
+        self._stamp = stamp
+
+    def _read_books(self, records: Iterable[dict]) -> MutableMapping[str, Book]:
+        # Each Book is built (and validated) once, with its normalized ISBN
+        out = self._new_store()
+        for item in records:
+            try:
+                n = self._norm_isbn(str(item.get("isbn") or ""))
+                if not n:
+                    continue
+                book = Book(title=item["title"], author=item["author"], isbn=n)
+                if book.key not in out:
+                    out[book.key] = book
+            except (AttributeError, KeyError, TypeError, ValueError):
                 pass
-        self._books = out
+        return out
 
-    def save_books(self) -> None:
-        data = []
-        for b in self._books:
-            if hasattr(b, "to_dict"):
-                data.append(b.to_dict())  # type: ignore[attr-defined]
+    def _updates(self, changes: List[Change]) -> List[Tuple[str, Optional[Book]]]:
+        # Storage changes as (key, new Book or None for removed)
+        updates: List[Tuple[str, Optional[Book]]] = []
+        for op, record in changes:
+            if op == "remove":
+                n = self._norm_isbn(str(record.get("isbn") or ""))
+                if n:
+                    updates.append((self._key(n), None))
             else:
-                data.append({"title": b.title, "author": b.author, "isbn": b.isbn})
-        self.storage_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+                updates.extend((key, book) for key, book in self._read_books([record]).items())
+        return updates
+
+    def _diff(self, fresh: MutableMapping[str, Book]) -> List[Tuple[str, Optional[Book]]]:
+        # What changed between memory and a full read; unchanged Books are kept as they are
+        updates: List[Tuple[str, Optional[Book]]] = [(key, None) for key in self._books if key not in fresh]
+        updates.extend((key, book) for key, book in fresh.items() if self._books.get(key) != book)
+        return updates
+
+    def _apply(self, updates: List[Tuple[str, Optional[Book]]]) -> None:
+        with self._lock:
+            for key, book in updates:
+                old = self._books.pop(key, None) if book is None else self._books.get(key)
+                if not self.compact:
+                    if book is None:
+                        self._seq.pop(key, None)
+                    elif old is None:
+                        self._seq[key] = self._next_seq
+                        self._next_seq += 1
+                if old is not None:
+                    if self._index is not None:
+                        self._index.remove(old)
+                    if self._prefix is not None:
+                        self._prefix.remove(old)
+                if book is not None:
+                    self._books[key] = book
+                    if self._index is not None:
+                        self._index.add(book)
+                    if self._prefix is not None:
+                        self._prefix.add(book)
+            self._changed()
+
+    def load_books(self) -> None:
+        # Records come one by one from the storage
+        with self._write_lock if self.shared else nullcontext():
+            with self._file_lock or nullcontext():
+                stamp = self.storage.stamp()
+                with STORAGE_SECONDS.time(storage=self.storage.kind, op="load"):
+                    out = self._read_books(self.storage.load())
+                STORAGE_BYTES.observe(self.storage.size(), storage=self.storage.kind, op="load")
+            with self._write_lock, self._lock:
+                self._books = out
+                if not self.compact:
+                    self._seq = {key: i for i, key in enumerate(out)}
+                    self._next_seq = len(out)
+                self._index = None
+                self._prefix = None
+                self._stamp = stamp
+                self._loaded = True
+                self._changed()
+
+    def save_books(self) -> None:
+        self._ensure_loaded()
+        with self._writing():
+            data = []
+            for b in self._view():
+                if hasattr(b, "to_dict"):
+                    data.append(b.to_dict())  # type: ignore[attr-defined]
+                else:
+                    data.append({"title": b.title, "author": b.author, "isbn": b.isbn})
+            with span("persist"), STORAGE_SECONDS.time(storage=self.storage.kind, op="save"):
+                self.storage.save(data)
+            STORAGE_BYTES.observe(self.storage.size(), storage=self.storage.kind, op="save")
+            self._dirty = False
+            self._changes = 0
+
+    def close(self) -> None:
+        if self._flusher is not None:
+            self._stop.set()
+            self._wake.set()
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        self.storage.close()
+        if self._file_lock is not None:
+            self._file_lock.close()
 
     def list_books(self) -> List[Book]:
-        return list(self._books)
+        return list(self._view())
+
+    def iter_books(self) -> Iterator[Book]:
+        if self.compact:
+            self._ensure_current()
+            return self._stream()
+        return iter(self._view())
+
+    def _stream(self) -> Iterator[Book]:
+        # Compact mode keeps no snapshot: Book views are made a chunk at a time under
+        # the lock, so a short page does not pay for the whole catalog. The first
+        # chunks are small (GET /books?limit=10), later ones FETCH_SIZE
+        seq, size = -1, 32
+        while True:
+            with self._lock:
+                books, seq = self._books.chunk_after(seq, size)  # type: ignore[attr-defined]
+            if not books:
+                return
+            yield from books
+            size = min(size * 4, self.FETCH_SIZE)
 
     def find_book(self, isbn: str) -> Optional[Book]:
-        n = self._norm_isbn(isbn)
-        return next((b for b in self._books if self._norm_isbn(b.isbn) == n), None)
+        self._ensure_current()
+        key = self._key(isbn)
+        if self.compact:
+            # A BookStore changes its hash table and columns in place; read it between writes
+            with self._lock:
+                return self._books.get(key)
+        return self._books.get(key)
+
+    def sequence(self, isbn: str) -> Optional[int]:
+        # Numbers start over when the file is read again
+        self._ensure_current()
+        key = self._key(isbn)
+        if self.compact:
+            with self._lock:
+                return self._books.sequence(key)  # type: ignore[attr-defined]
+        return self._seq.get(key)
+
+    def search_books(self, query: str, limit: int = 20) -> List[Book]:
+        self._ensure_current()
+        with self._lock:
+            if self._index is None:
+                index = SearchIndex()
+                for b in self._books.values():
+                    index.add(b)
+                self._index = index
+            hits = self._index.search(query, limit)
+            return [self._books[key] for key, _ in hits]
+
+    def suggest_books(self, prefix: str, limit: int = 10) -> List[Book]:
+        self._ensure_current()
+        with self._lock:
+            if self._prefix is None:
+                self._prefix = PrefixIndex.build(self._books.values())
+            return [self._books[key] for key in self._prefix.suggest(prefix, limit)]
 
     def add_book(self, book: Book) -> bool:
         n = self._norm_isbn(book.isbn)
-        if not n or self.find_book(n):
+        if not n:
             return False
         clean = Book(title=book.title.strip(), author=book.author.strip(), isbn=n)
-        self._books.append(clean)
-        self.save_books()
+        self._ensure_loaded()
+        with self._writing():
+            if clean.key in self._books:
+                return False
+            self._apply([(clean.key, clean)])
+            self._persist("add", clean.to_dict())
         return True
 
     def remove_book(self, isbn: str) -> bool:
         n = self._norm_isbn(isbn)
         if not n:
             return False
-        before = len(self._books)
-        self._books = [b for b in self._books if self._norm_isbn(b.isbn) != n]
-        removed = len(self._books) != before
-        if removed:
-            self.save_books()
-        return removed
+        self._ensure_loaded()
+        with self._writing():
+            old = self._books.get(self._key(n))
+            if old is None:
+                return False
+            self._apply([(old.key, None)])
+            # (the ISBN as stored, which may be the other form of what was asked)
+            self._persist("remove", {"isbn": old.isbn})
+        return True
+
+    def update_book(self, book: Book) -> bool:
+        n = self._norm_isbn(book.isbn)
+        if not n:
+            return False
+        self._ensure_loaded()
+        with self._writing():
+            old = self._books.get(self._key(n))
+            if old is None:
+                return False
+            # The ISBN stays as stored, so the storage replaces that same record
+            new = Book(title=book.title.strip(), author=book.author.strip(), isbn=old.isbn)
+            if new != old:
+                self._apply([(new.key, new)])
+                self._persist("add", new.to_dict())
+        return True
 
-    def add_book_by_isbn(self, isbn: str) -> bool:
+    def add_book_by_isbn(self, isbn: str) -> Optional[Book]:
         n = self._norm_isbn(isbn)
         if not n or self.find_book(n):
-            return False
-        book_json = _safe_get_json(f"{OPENLIB_BASE}/isbn/{n}.json")
-        if not book_json:
-            return False
-        title = (book_json.get("title") or "").strip()
-        if not title:
-            return False
-        names: List[str] = []
-        alist = book_json.get("authors")
-        if isinstance(alist, list):
-            for a in alist:
-                key = (a or {}).get("key") or (a.get("author") or {}).get("key")
-                if not key:
-                    continue
-                ajson = _safe_get_json(f"{OPENLIB_BASE}{key}.json")
-                if ajson and ajson.get("name"):
-                    names.append(str(ajson["name"]).strip())
-        if not names:
-            by_stmt = (book_json.get("by_statement") or "").strip()
-            if by_stmt:
-                names = [by_stmt.split(";")[0]]
-        author = _join_authors(names) or "Unknown Author"
-        return self.add_book(Book(title=title, author=author, isbn=n))
+            return None
+        book = fetch_book(n)
+        if book is None or not self.add_book(book):
+            return None
+        return self.find_book(n)
+
+    async def add_book_by_isbn_async(self, isbn: str) -> Optional[Book]:
+        """Same as add_book_by_isbn, without blocking the event loop on HTTP or disk."""
+        n = self._norm_isbn(isbn)
+        if not n or self.find_book(n):
+            return None
+        book = await fetch_book_async(n)
+        if book is None or not await asyncio.to_thread(self.add_book, book):
+            return None
+        return self.find_book(n)
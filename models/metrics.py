@@ -0,0 +1,185 @@
+from __future__ import annotations
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Counters and histograms in the Prometheus text exposition format.
+# Updating one is a dict lookup and a few additions under a per-metric lock, so
+# the instrumentation stays on all the time; the text is built only when
+# GET /metrics is scraped.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: from a fast cache/disk operation up to a slow upstream call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Bytes: 1 KiB .. 1 GiB in steps of 4
+BYTES_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(11))
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple(str(labels[n]) for n in self.labelnames)
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+
+    def _lines(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        head = [f"# HELP {self.name} {_escape(self.help)}", f"# TYPE {self.name} {self.type}"]
+        return "\n".join(head + self._lines())
+
+
+class Counter(_Metric):
+    """A number that only goes up (requests, cache hits...), one per label set."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _lines(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_format(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Observations counted into buckets, plus their sum and count (latencies, sizes)."""
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        if "le" in labelnames:
+            raise ValueError("'le' is reserved for histogram buckets")
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        # label values -> [count per bucket (not cumulative; the last is +Inf), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][i] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe how long the with-block took, in seconds (also when it raises)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: object) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def sum(self, **labels: object) -> float:
+        entry = self._values.get(self._key(labels))
+        return entry[1][0] if entry else 0.0
+
+    def _lines(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(counts), total[0])) for k, (counts, total) in self._values.items())
+        names = self.labelnames + ("le",)
+        lines = []
+        for key, (counts, total) in items:
+            running = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                running += n
+                lines.append(f"{self.name}_bucket{_labels(names, key + (_format(bound),))} {running}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_format(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {running}")
+        return lines
+
+
+class Registry:
+    """The metrics one /metrics page shows."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name!r} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> _Metric:
+        return self._metrics[name]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(m.render() + "\n" for m in metrics)
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    """A new Counter, registered in REGISTRY."""
+    return REGISTRY.register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    """A new Histogram, registered in REGISTRY."""
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+
+def render() -> str:
+    """All registered metrics in the text exposition format."""
+    return REGISTRY.render()
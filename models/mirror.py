@@ -0,0 +1,156 @@
+from __future__ import annotations
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+from .isbn import canonical
+
+# SQLite file built by "main.py mirror"; lookups check it before Open Library
+MIRROR_PATH = os.getenv("OPENLIB_MIRROR") or None
+# rows written per transaction while importing a dump
+IMPORT_BATCH = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS editions (isbn TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS authors (key TEXT PRIMARY KEY, data TEXT NOT NULL) WITHOUT ROWID;
+"""
+
+
+def _open_dump(path: str | Path) -> TextIO:
+    # .gz dumps are decompressed while reading, never unpacked to disk
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _parse_line(line: str) -> Optional[Tuple[str, str, dict]]:
+    """(type, key, record) from a dump line, or None if it is not usable.
+
+    Open Library dumps are TSV (type, key, revision, last_modified, JSON); a
+    plain JSON-lines file with "type" and "key" inside each record works too.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line.startswith("{"):
+            record = json.loads(line)
+            kind = record.get("type")
+            kind = kind.get("key") if isinstance(kind, dict) else kind
+            key = record.get("key")
+        else:
+            kind, key, _, _, raw = line.split("\t", 4)
+            record = json.loads(raw)
+    except (ValueError, AttributeError):
+        return None
+    if not isinstance(record, dict) or not isinstance(kind, str) or not isinstance(key, str):
+        return None
+    return kind, key, record
+
+
+def _edition_data(record: dict) -> dict:
+    # Only what fetch_book reads, in the shape of /isbn/{isbn}.json
+    data = {"title": record.get("title") or ""}
+    authors = [a for a in record.get("authors") or [] if isinstance(a, dict)]
+    if authors:
+        data["authors"] = authors
+    if record.get("by_statement"):
+        data["by_statement"] = record["by_statement"]
+    return data
+
+
+def _edition_isbns(record: dict) -> List[str]:
+    isbns = []
+    for field in ("isbn_13", "isbn_10"):
+        values = record.get(field) or []
+        isbns.extend(v for v in values if isinstance(v, str))
+    return isbns
+
+
+class Mirror:
+    """Local copy of Open Library edition and author records, in SQLite.
+
+    Editions are stored under their ISBN key (ISBN-10 and ISBN-13 both find
+    them), authors under their "/authors/OL..A" key, each as the small JSON
+    that fetch_book needs.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+
+    def _get(self, sql: str, key: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(sql, (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def edition(self, isbn: str) -> Optional[dict]:
+        """Edition JSON for an ISBN (either form), or None if the dump did not have it."""
+        return self._get("SELECT data FROM editions WHERE isbn = ?", canonical(isbn))
+
+    def author(self, key: str) -> Optional[dict]:
+        """Author JSON for "/authors/OL..A", or None."""
+        return self._get("SELECT data FROM authors WHERE key = ?", key)
+
+    def _write(self, editions: List[tuple], authors: List[tuple]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT OR REPLACE INTO editions (isbn, data) VALUES (?, ?)", editions)
+            self._conn.executemany("INSERT OR REPLACE INTO authors (key, data) VALUES (?, ?)", authors)
+        editions.clear()
+        authors.clear()
+
+    def import_lines(self, lines: Iterable[str]) -> Dict[str, int]:
+        """Add edition/author records from dump lines; returns counts per kind."""
+        counts = {"editions": 0, "authors": 0, "skipped": 0}
+        editions: List[tuple] = []
+        authors: List[tuple] = []
+        for line in lines:
+            parsed = _parse_line(line)
+            kind, key, record = parsed if parsed else ("", "", {})
+            if kind == "/type/edition" and record.get("title") and _edition_isbns(record):
+                data = json.dumps(_edition_data(record), ensure_ascii=False)
+                editions.extend((canonical(i), data) for i in _edition_isbns(record))
+                counts["editions"] += 1
+            elif kind == "/type/author" and record.get("name"):
+                authors.append((key, json.dumps({"name": record["name"]}, ensure_ascii=False)))
+                counts["authors"] += 1
+            else:
+                counts["skipped"] += 1
+            if len(editions) + len(authors) >= IMPORT_BATCH:
+                self._write(editions, authors)
+        self._write(editions, authors)
+        return counts
+
+    def import_dump(self, path: str | Path) -> Dict[str, int]:
+        """Stream one dump file (.gz or plain) into the mirror."""
+        with _open_dump(path) as f:
+            return self.import_lines(f)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_mirror: Optional[Mirror] = None
+_mirror_lock = threading.Lock()
+
+
+def get_mirror() -> Optional[Mirror]:
+    """The mirror at MIRROR_PATH, or None when none is configured/built."""
+    global _mirror
+    if not MIRROR_PATH or not Path(MIRROR_PATH).exists():
+        return None
+    with _mirror_lock:
+        if _mirror is None or _mirror.path != Path(MIRROR_PATH):
+            _mirror = Mirror(MIRROR_PATH)
+        return _mirror
+
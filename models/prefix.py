@@ -0,0 +1,109 @@
+from __future__ import annotations
+from bisect import bisect_left, insort
+from typing import Iterable, Iterator, List
+
+from . import isbn as isbns
+from .book import Book
+from .search import fold
+
+# Separates the folded title / ISBN from the book's key inside one sort key
+_SEP = "\x00"
+
+
+def isbn_prefix(prefix: str) -> str:
+    """Normalized ISBN prefix ("978-0-14" -> "978014"), or "" if prefix is not ISBN-like."""
+    return isbns.normalize(prefix) if isbns.is_well_formed(prefix.strip()) else ""
+
+
+def title_prefix(prefix: str) -> str:
+    """Title prefix the way titles are stored: folded, inner whitespace collapsed."""
+    return " ".join(fold(prefix).split())
+
+
+def _title_key(book: Book) -> str:
+    return title_prefix(book.title) + _SEP + book.key
+
+
+def _isbn_key(book: Book) -> str:
+    # The ISBN as stored is what people type; the book's key follows when it differs
+    return book.isbn if book.isbn == book.key else book.isbn + _SEP + book.key
+
+
+def _book_key(entry: str) -> str:
+    return entry.rpartition(_SEP)[2]
+
+
+class PrefixIndex:
+    """Sorted arrays of ISBNs and folded titles for prefix (autocomplete) lookups.
+
+    A lookup is two binary searches plus ``limit`` steps, so it does not grow
+    with the catalog. Adding or removing a book is a bisect and one list
+    insert/delete. Not thread-safe on its own: the Library guards it with its lock.
+    """
+
+    def __init__(self) -> None:
+        self._isbns: List[str] = []
+        # "isbn[\0key]" and "folded title\0key": sorted by ISBN / title
+        self._titles: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._isbns)
+
+    @classmethod
+    def build(cls, books: Iterable[Book]) -> "PrefixIndex":
+        index = cls()
+        books = list(books)
+        index._isbns = sorted(_isbn_key(b) for b in books)
+        index._titles = sorted(_title_key(b) for b in books)
+        return index
+
+    def add(self, book: Book) -> None:
+        insort(self._isbns, _isbn_key(book))
+        insort(self._titles, _title_key(book))
+
+    @staticmethod
+    def _discard(items: List[str], key: str) -> None:
+        i = bisect_left(items, key)
+        if i < len(items) and items[i] == key:
+            del items[i]
+
+    def remove(self, book: Book) -> None:
+        self._discard(self._isbns, _isbn_key(book))
+        self._discard(self._titles, _title_key(book))
+
+    @staticmethod
+    def _starting_with(items: List[str], prefix: str) -> Iterator[str]:
+        for i in range(bisect_left(items, prefix), len(items)):
+            if not items[i].startswith(prefix):
+                return
+            yield items[i]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Keys of books whose ISBN or title starts with prefix; ISBN matches first."""
+        out: List[str] = []
+        if limit <= 0:
+            return out
+        isbn = isbn_prefix(prefix)
+        if isbn:
+            for entry in self._starting_with(self._isbns, isbn):
+                out.append(_book_key(entry))
+                if len(out) >= limit:
+                    return out
+        title = title_prefix(prefix)
+        if title:
+            seen = set(out)
+            for entry in self._starting_with(self._titles, title):
+                found = _book_key(entry)
+                if found not in seen:
+                    out.append(found)
+                    if len(out) >= limit:
+                        break
+        return out
+
+
+def scan_suggest(books: Iterable[Book], prefix: str, limit: int = 10) -> List[Book]:
+    """The same matches and order as PrefixIndex.suggest, by looking at every book."""
+    books = list(books)
+    index = PrefixIndex.build(books)
+    by_key = {b.key: b for b in books}
+    return [by_key[key] for key in index.suggest(prefix, limit)]
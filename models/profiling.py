@@ -0,0 +1,166 @@
+from __future__ import annotations
+import cProfile
+import json
+import pstats
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Per-request profiling (see ProfilingMiddleware in api.py).
+#
+# span("fetch") blocks add their time to the trace of the request they run in;
+# outside a traced request they cost one ContextVar lookup. A sampled request
+# is also run under cProfile. Reports go to a directory that keeps only the
+# newest ones.
+
+# functions listed in a report, by cumulative time
+TOP_FUNCTIONS = 30
+
+_REPORT_ID = re.compile(r"[\w.-]+")
+
+
+class Trace:
+    """Time per span name for one request (spans may run in worker threads)."""
+
+    def __init__(self) -> None:
+        self.spans: Dict[str, List[float]] = {}  # name -> [seconds, count]
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            entry = self.spans.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def as_dict(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: {"seconds": round(s, 6), "count": n} for name, (s, n) in self.spans.items()}
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("library_trace", default=None)
+
+
+def activate(trace: Trace) -> Token:
+    """Make trace the one span() records into, for this context and tasks started from it."""
+    return _trace.set(trace)
+
+
+def deactivate(token: Token) -> None:
+    _trace.reset(token)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the with-block as part of the current request's trace, if there is one."""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+def _top(profile: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> List[dict]:
+    stats = pstats.Stats(profile).stats  # type: ignore[attr-defined]
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": f"{Path(file).name}:{line}({func})",
+            "calls": nc,
+            "total": round(tt, 6),
+            "cumulative": round(ct, 6),
+        }
+        for (file, line, func), (cc, nc, tt, ct, _) in rows
+    ]
+
+
+class Profiler:
+    """Decides which requests to profile and keeps their reports in a directory.
+
+    A ``sample_rate`` share of requests runs under cProfile, one at a time (a
+    profiler sees everything on the event loop thread, so two would measure each
+    other). Any request slower than ``slow_after`` seconds gets a report with its
+    span times even if it was not sampled. Only the newest ``keep`` reports are
+    kept, so leaving it on for a while cannot fill the disk.
+    """
+
+    def __init__(self, directory: str | Path, sample_rate: float = 0.01, slow_after: float = 1.0, keep: int = 50) -> None:
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.slow_after = slow_after
+        self.keep = keep
+        self._busy = threading.Lock()
+        self._files_lock = threading.Lock()
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """A running cProfile for a sampled request, or None (not sampled or one is running)."""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler (e.g. a debugger) is active
+            self._busy.release()
+            return None
+        return profile
+
+    def stop(self, profile: Optional[cProfile.Profile]) -> None:
+        if profile is not None:
+            profile.disable()
+            self._busy.release()
+
+    def wanted(self, profile: Optional[cProfile.Profile], seconds: float) -> bool:
+        return profile is not None or seconds >= self.slow_after
+
+    def record(self, info: dict, trace: Trace, profile: Optional[cProfile.Profile] = None) -> str:
+        """Write a report (and the raw .prof for sampled requests); returns its id."""
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        route = re.sub(r"[^\w]+", "_", str(info.get("route", ""))).strip("_") or "root"
+        report_id = f"{stamp}-{info.get('method', 'GET')}-{route}"
+        report = {"id": report_id, **info, "profiled": profile is not None, "spans": trace.as_dict()}
+        if profile is not None:
+            report["top"] = _top(profile)
+        with self._files_lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if profile is not None:
+                profile.dump_stats(str(self.directory / f"{report_id}.prof"))
+            (self.directory / f"{report_id}.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
+            self._rotate()
+        return report_id
+
+    def _rotate(self) -> None:
+        reports = sorted(self.directory.glob("*.json"))
+        for old in reports[: max(len(reports) - self.keep, 0)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".prof").unlink(missing_ok=True)
+
+    def reports(self) -> List[dict]:
+        """Newest first, without the function lists."""
+        out = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                report = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue  # rotated away or being written
+            report.pop("top", None)
+            out.append(report)
+        return out
+
+    def report(self, report_id: str) -> Optional[dict]:
+        if not _REPORT_ID.fullmatch(report_id):
+            return None
+        try:
+            return json.loads((self.directory / f"{report_id}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
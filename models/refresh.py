@@ -0,0 +1,224 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from . import http_client
+from .abstract_library import AbstractLibrary
+from .book import Book
+from .library import (
+    HTTP_TIMEOUT,
+    OPENLIB_BASE,
+    _author_json_async,
+    _author_keys,
+    _author_name,
+    _build_book,
+    openlib_cache,
+)
+from .mirror import get_mirror
+from .storage import _atomic_write_text
+
+# Books re-checked per cycle, Open Library requests per second, and requests in flight
+REFRESH_BATCH = 100
+REFRESH_RATE = 2.0
+REFRESH_CONCURRENCY = 4
+
+
+class RateLimiter:
+    """Spaces out calls so at most ``rate`` start per second."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class Refresher:
+    """Re-reads stored books from Open Library and writes back the ones that changed.
+
+    Each cycle takes the ``batch_size`` books checked longest ago (never checked
+    first) and asks for their edition with the ETag / Last-Modified of the last
+    answer, so an unchanged record costs a 304 and no parsing. Those validators
+    live in a small JSON file next to the library (``state_path``). All changed
+    books are written in one ``library.batch()``, so the json engine saves once
+    per cycle. Authors are only looked up again when the edition changed.
+    """
+
+    def __init__(
+        self,
+        library: AbstractLibrary,
+        state_path: str | Path,
+        batch_size: int = REFRESH_BATCH,
+        rate: float = REFRESH_RATE,
+        concurrency: int = REFRESH_CONCURRENCY,
+        report_path: Optional[str | Path] = None,
+    ) -> None:
+        self.library = library
+        self.state_path = Path(state_path)
+        self.batch_size = batch_size
+        self.rate = rate
+        self.concurrency = concurrency
+        self.report_path = Path(report_path) if report_path else None
+        self.last_report: Optional[dict] = None
+        # book key -> {"etag", "last_modified", "checked"}
+        self._state: Dict[str, dict] = self._load_state()
+        self._task: Optional[asyncio.Task] = None
+
+    def _load_state(self) -> Dict[str, dict]:
+        try:
+            raw = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return {k: v for k, v in raw.items() if isinstance(v, dict)} if isinstance(raw, dict) else {}
+
+    def _save_state(self, keys: set) -> None:
+        # Books that were removed from the library are forgotten
+        self._state = {k: v for k, v in self._state.items() if k in keys}
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write_text(self.state_path, json.dumps(self._state))
+
+    def _due(self) -> Tuple[Set[str], List[Book]]:
+        # Runs in a worker thread: the keys of all books, and the batch checked longest ago
+        books = self.library.list_books()
+        due = heapq.nsmallest(
+            self.batch_size, books, key=lambda b: self._state.get(b.key, {}).get("checked", 0.0)
+        )
+        return {b.key for b in books}, due
+
+    async def _author(self, key: str, limiter: RateLimiter) -> Optional[dict]:
+        # Author requests count against the rate too (the local mirror does not)
+        m = get_mirror()
+        found = m.author(key) if m else None
+        if found:
+            return found
+        await limiter.wait()
+        return await _author_json_async(key)
+
+    async def _check(
+        self, book: Book, limiter: RateLimiter, counts: Dict[str, int], changed: Dict[str, dict]
+    ) -> Optional[Book]:
+        """The refreshed Book if Open Library has different details, else None.
+
+        The validators of a changed book go to ``changed``, not the state: they
+        are only kept once the new details are written.
+        """
+        url = f"{OPENLIB_BASE}/isbn/{book.isbn}.json"
+        seen = self._state.get(book.key, {})
+        headers = {}
+        if seen.get("etag"):
+            headers["If-None-Match"] = seen["etag"]
+        if seen.get("last_modified"):
+            headers["If-Modified-Since"] = seen["last_modified"]
+        await limiter.wait()
+        counts["requests"] += 1
+        try:
+            r = await http_client.aget(url, headers=headers, timeout=HTTP_TIMEOUT)
+        except httpx.HTTPError:
+            counts["errors"] += 1
+            return None
+        if r.status_code == 304:
+            counts["unchanged"] += 1
+        elif r.status_code == 404:
+            counts["not_found"] += 1
+        elif r.is_success:
+            try:
+                data = r.json()
+            except ValueError:
+                counts["errors"] += 1
+                return None
+            openlib_cache.set(url, data)
+            names = [_author_name(await self._author(k, limiter)) for k in _author_keys(data)]
+            fresh = _build_book(book.isbn, data, names)
+            seen = {
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+                "checked": time.time(),
+            }
+            if fresh is not None and (fresh.title, fresh.author) != (book.title, book.author):
+                counts["changed"] += 1
+                changed[book.key] = seen
+            else:
+                counts["same"] += 1
+                fresh = None
+                self._state[book.key] = seen
+            return fresh
+        else:
+            counts["errors"] += 1
+            return None
+        # 304 / 404: checked, validators unchanged
+        self._state.setdefault(book.key, {})["checked"] = time.time()
+        return None
+
+    def _write(self, changed: List[Book]) -> int:
+        # One batch: the json engine saves once for the whole cycle
+        with self.library.batch():
+            return sum(1 for b in changed if self.library.update_book(b))
+
+    async def run_once(self) -> dict:
+        """One cycle; returns (and keeps in last_report / report_path) what it did."""
+        started = time.monotonic()
+        keys, due = await asyncio.to_thread(self._due)
+        counts = dict.fromkeys(("requests", "unchanged", "same", "changed", "not_found", "errors"), 0)
+        limiter = RateLimiter(self.rate)
+        sem = asyncio.Semaphore(self.concurrency)
+        validators: Dict[str, dict] = {}
+
+        async def check(book: Book) -> Optional[Book]:
+            async with sem:
+                return await self._check(book, limiter, counts, validators)
+
+        results = await asyncio.gather(*(check(b) for b in due))
+        changed = [b for b in results if b is not None]
+        written = await asyncio.to_thread(self._write, changed) if changed else 0
+        # Written: from now on a 304 for these books means "same as stored"
+        self._state.update(validators)
+        await asyncio.to_thread(self._save_state, keys)
+
+        report = {
+            "finished": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "seconds": round(time.monotonic() - started, 3),
+            "books": len(keys),
+            "checked": len(due),
+            **counts,
+            "written": written,
+            "updated": [b.isbn for b in changed],
+        }
+        self.last_report = report
+        if self.report_path is not None:
+            with open(self.report_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report) + "\n")
+        return report
+
+    async def _loop(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:  # e.g. a failed save: try again next cycle
+                self.last_report = {"error": str(e) or type(e).__name__}
+            await asyncio.sleep(interval)
+
+    def start(self, interval: float) -> None:
+        """Run a cycle every ``interval`` seconds in the background (needs a running loop)."""
+        self._task = asyncio.get_running_loop().create_task(self._loop(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,131 @@
+from __future__ import annotations
+import heapq
+import math
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Tuple
+
+from .book import Book
+
+# A title match counts more than an author match
+TITLE_WEIGHT = 2.0
+AUTHOR_WEIGHT = 1.0
+
+_TITLE = 1
+_AUTHOR = 2
+_WORD = re.compile(r"\w+")
+# Letters NFKD does not split into base letter + mark
+_EXTRA_FOLDS = str.maketrans({"ı": "i", "ø": "o", "đ": "d", "ł": "l", "æ": "ae", "œ": "oe"})
+
+
+def fold(text: str) -> str:
+    """Lowercase text without accents: "Sana Gül Bahçesi" -> "sana gul bahcesi"."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    plain = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return plain.casefold().translate(_EXTRA_FOLDS)
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(fold(text))
+
+
+def _field_weight(mask: int) -> float:
+    return (TITLE_WEIGHT if mask & _TITLE else 0.0) + (AUTHOR_WEIGHT if mask & _AUTHOR else 0.0)
+
+
+class SearchIndex:
+    """Inverted index over book titles and authors.
+
+    Every token maps to the books (by Book.key) containing it (and whether it was in the title,
+    the author or both). A query matches books that contain all of its tokens;
+    results are ranked by field weight times IDF, so rare words and title hits
+    count most. Not thread-safe on its own: the Library guards it with its lock.
+    """
+
+    def __init__(self) -> None:
+        # token -> {isbn: field mask}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._docs = 0
+
+    def __len__(self) -> int:
+        return self._docs
+
+    @staticmethod
+    def _fields(book: Book) -> Dict[str, int]:
+        fields: Dict[str, int] = {}
+        for tok in tokenize(book.title):
+            fields[tok] = fields.get(tok, 0) | _TITLE
+        for tok in tokenize(book.author):
+            fields[tok] = fields.get(tok, 0) | _AUTHOR
+        return fields
+
+    def add(self, book: Book) -> None:
+        for tok, mask in self._fields(book).items():
+            self._postings.setdefault(tok, {})[book.key] = mask
+        self._docs += 1
+
+    def remove(self, book: Book) -> None:
+        for tok in self._fields(book):
+            posting = self._postings.get(tok)
+            if posting is None:
+                continue
+            posting.pop(book.key, None)
+            if not posting:
+                del self._postings[tok]
+        self._docs -= 1
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """(key, score) pairs for books matching every query token, best first."""
+        tokens = set(tokenize(query))
+        if not tokens or limit <= 0:
+            return []
+        postings = []
+        for tok in tokens:
+            posting = self._postings.get(tok)
+            if not posting:
+                return []  # some word appears nowhere
+            postings.append(posting)
+
+        # Walk the rarest token's postings and probe the others
+        postings.sort(key=len)
+        first, rest = postings[0], postings[1:]
+        idf = [math.log(1 + self._docs / len(p)) for p in postings]
+
+        def scored():
+            for isbn, mask in first.items():
+                score = _field_weight(mask) * idf[0]
+                for i, posting in enumerate(rest, 1):
+                    other = posting.get(isbn)
+                    if other is None:
+                        break
+                    score += _field_weight(other) * idf[i]
+                else:
+                    yield score, isbn
+
+        best = heapq.nlargest(limit, scored(), key=lambda item: item[0])
+        return [(isbn, score) for score, isbn in best]
+
+
+def scan_search(books: Iterable[Book], query: str, limit: int = 20) -> List[Book]:
+    """The same matching and ranking as SearchIndex, by looking at every book."""
+    tokens = set(tokenize(query))
+    if not tokens or limit <= 0:
+        return []
+    docs = 0
+    df = dict.fromkeys(tokens, 0)
+    matches: List[Tuple[Book, Dict[str, int]]] = []
+    for book in books:
+        docs += 1
+        fields = SearchIndex._fields(book)
+        hits = tokens & fields.keys()
+        for tok in hits:
+            df[tok] += 1
+        if len(hits) == len(tokens):
+            matches.append((book, fields))
+    idf = {tok: math.log(1 + docs / n) for tok, n in df.items() if n}
+    ranked = heapq.nlargest(
+        limit,
+        matches,
+        key=lambda m: sum(_field_weight(m[1][tok]) * idf[tok] for tok in tokens),
+    )
+    return [book for book, _ in ranked]
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from . import metrics
+
+# Callers that started a call vs. joined one already running
+DEDUPE = metrics.counter("library_dedupe_total", "Deduplicated calls by result (started, shared).", ("name", "result"))
+
+
+class SingleFlight:
+    """Runs at most one call per key; concurrent callers with the same key share it.
+
+    The first caller starts ``fn()``; anyone asking for the same key while it is
+    still running awaits the same future and gets the same result (or error).
+    The key is forgotten as soon as the call finishes, so nothing is cached.
+    """
+
+    def __init__(self, name: str = "singleflight") -> None:
+        self.name = name  # "name" label of the metrics
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.started = 0  # calls actually made
+        self.shared = 0  # callers that joined a running call
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._calls.get(key)
+        if fut is None or fut.done():
+            fut = asyncio.ensure_future(fn())
+            self._calls[key] = fut
+            fut.add_done_callback(lambda f, key=key: self._forget(key, f))
+            self.started += 1
+            DEDUPE.inc(name=self.name, result="started")
+        else:
+            self.shared += 1
+            DEDUPE.inc(name=self.name, result="shared")
+        # shield: one caller going away must not cancel the call for the others
+        return await asyncio.shield(fut)
+
+    def _forget(self, key: str, fut: asyncio.Future) -> None:
+        if self._calls.get(key) is fut:
+            del self._calls[key]
+        if not fut.cancelled():
+            fut.exception()  # mark as retrieved even if every caller left
+
+    def __len__(self) -> int:
+        return len(self._calls)
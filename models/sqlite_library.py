@@ -0,0 +1,208 @@
+from __future__ import annotations
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from .abstract_library import AbstractLibrary
+from .book import Book
+from .library import Library, fetch_book, fetch_book_async
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    isbn   TEXT PRIMARY KEY,
+    title  TEXT NOT NULL,
+    author TEXT NOT NULL,
+    key    TEXT
+);
+CREATE INDEX IF NOT EXISTS books_title ON books(title);
+CREATE INDEX IF NOT EXISTS books_author ON books(author);
+"""
+
+# key = ISBN key (Book.key); unique, so ISBN-10 and ISBN-13 of one book dedupe
+_KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS books_key ON books(key)"
+
+
+class SqliteLibrary(AbstractLibrary):
+    """Library stored in SQLite; books stay on disk and are read with cursors.
+
+    The primary key is the normalized ISBN and the implicit rowid keeps the
+    insertion order, so listing matches the JSON-backed Library.
+    """
+
+    # rows fetched per round trip when streaming
+    FETCH_SIZE = 500
+
+    def __init__(self, db_file: str = "library.db") -> None:
+        self.db_path = Path(db_file)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection for the whole object; the lock keeps threads from interleaving
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.DatabaseError as e:
+                self._conn.close()
+                # e.g. LIBRARY_FILE still points at the JSON catalog
+                raise ValueError(
+                    f"{self.db_path} is not an SQLite database; the sqlite engine does not read "
+                    "JSON catalogs, point it at a new file (e.g. library.db)"
+                ) from e
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._migrate()
+
+    _norm_isbn = staticmethod(Library._norm_isbn)
+    _key = staticmethod(Library._key)
+
+    def _migrate(self) -> None:
+        # Databases from before the key column: add it, fill it in, drop duplicates
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(books)")]
+        if "key" not in columns:
+            self._conn.execute("ALTER TABLE books ADD COLUMN key TEXT")
+        missing = self._conn.execute("SELECT rowid, isbn FROM books WHERE key IS NULL ORDER BY rowid").fetchall()
+        if missing:
+            with self._conn:
+                self._conn.execute("BEGIN")
+                seen = {k for (k,) in self._conn.execute("SELECT key FROM books WHERE key IS NOT NULL")}
+                for rowid, isbn in missing:
+                    key = self._key(isbn)
+                    if key in seen:
+                        # the same book under its other ISBN form; the older row stays
+                        self._conn.execute("DELETE FROM books WHERE rowid = ?", (rowid,))
+                    else:
+                        seen.add(key)
+                        self._conn.execute("UPDATE books SET key = ? WHERE rowid = ?", (key, rowid))
+        self._conn.execute(_KEY_INDEX)
+
+    @property
+    def books(self) -> List[Book]:
+        return self.list_books()
+
+    @staticmethod
+    def _row_to_book(row: tuple) -> Book:
+        return Book(title=row[0], author=row[1], isbn=row[2])
+
+    def _query(self, sql: str, params: tuple = ()) -> Iterator[Book]:
+        cur = self._conn.cursor()
+        with self._lock:
+            cur.execute(sql, params)
+        try:
+            while True:
+                with self._lock:
+                    rows = cur.fetchmany(self.FETCH_SIZE)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_book(row)
+        finally:
+            cur.close()
+
+    def iter_books(self) -> Iterator[Book]:
+        """Stream all books in insertion order without loading them all."""
+        return self._query("SELECT title, author, isbn FROM books ORDER BY rowid")
+
+    def list_books(self) -> List[Book]:
+        return list(self.iter_books())
+
+    @property
+    def version(self) -> int:
+        """Changes whenever the table does (ours via total_changes, other connections via data_version)."""
+        with self._lock:
+            return self._conn.total_changes + self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def find_book(self, isbn: str) -> Optional[Book]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, author, isbn FROM books WHERE key = ?", (self._key(isbn),)
+            ).fetchone()
+        return self._row_to_book(row) if row else None
+
+    def sequence(self, isbn: str) -> Optional[int]:
+        # rowid: new rows always get a larger one than every row still there
+        with self._lock:
+            row = self._conn.execute("SELECT rowid FROM books WHERE key = ?", (self._key(isbn),)).fetchone()
+        return row[0] if row else None
+
+    def find_by_title(self, title: str) -> List[Book]:
+        return list(self._query("SELECT title, author, isbn FROM books WHERE title = ? ORDER BY rowid", (title,)))
+
+    def find_by_author(self, author: str) -> List[Book]:
+        return list(self._query("SELECT title, author, isbn FROM books WHERE author = ? ORDER BY rowid", (author,)))
+
+    def _clean_row(self, book: Book) -> Optional[tuple]:
+        n = self._norm_isbn(book.isbn)
+        if not n:
+            return None
+        return (n, book.title.strip(), book.author.strip(), self._key(n))
+
+    def add_book(self, book: Book) -> bool:
+        row = self._clean_row(book)
+        if row is None:
+            return False
+        with self._lock:
+            cur = self._conn.execute("INSERT OR IGNORE INTO books (isbn, title, author, key) VALUES (?, ?, ?, ?)", row)
+        return cur.rowcount == 1
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """Insert many books in one transaction; returns how many were new."""
+        rows = [r for r in (self._clean_row(b) for b in books) if r is not None]
+        with self._lock:
+            before = self._conn.total_changes
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany("INSERT OR IGNORE INTO books (isbn, title, author, key) VALUES (?, ?, ?, ?)", rows)
+            return self._conn.total_changes - before
+
+    def remove_book(self, isbn: str) -> bool:
+        n = self._norm_isbn(isbn)
+        if not n:
+            return False
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM books WHERE key = ?", (self._key(n),))
+        return cur.rowcount == 1
+
+    def update_book(self, book: Book) -> bool:
+        row = self._clean_row(book)
+        if row is None:
+            return False
+        n, title, author, key = row
+        with self._lock:
+            cur = self._conn.execute("UPDATE books SET title = ?, author = ? WHERE key = ?", (title, author, key))
+        return cur.rowcount == 1
+
+    def save_books(self) -> None:
+        # Every change is committed as it happens; just checkpoint the WAL file
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def load_books(self) -> None:
+        # Nothing to load up front: rows are read from disk when asked for
+        pass
+
+    def add_book_by_isbn(self, isbn: str) -> Optional[Book]:
+        n = self._norm_isbn(isbn)
+        if not n or self.find_book(n):
+            return None
+        book = fetch_book(n)
+        if book is None or not self.add_book(book):
+            return None
+        return self.find_book(n)
+
+    async def add_book_by_isbn_async(self, isbn: str) -> Optional[Book]:
+        n = self._norm_isbn(isbn)
+        if not n or self.find_book(n):
+            return None
+        book = await fetch_book_async(n)
+        if book is None or not self.add_book(book):
+            return None
+        return self.find_book(n)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
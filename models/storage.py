@@ -0,0 +1,381 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from . import jsonio
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    # Write next to the target and rename over it, so readers never see half a file
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# Files up to this size are parsed whole: about twice as fast as streaming, but
+# the parse briefly needs ~4x the file size in memory
+STREAM_MIN_BYTES = 32 << 20
+
+
+def _read_snapshot(path: Path) -> Iterator[dict]:
+    """Records of a JSON array file.
+
+    A missing or broken file gives no records (or those before the damage).
+    Small files (and any file with the orjson backend) are parsed at once;
+    larger ones are parsed one record at a time, so memory stays flat.
+    """
+    try:
+        if jsonio.use_orjson() or os.path.getsize(path) <= STREAM_MIN_BYTES:
+            try:
+                raw = jsonio.loads(path.read_bytes() if jsonio.use_orjson() else path.read_text(encoding="utf-8"))
+            except ValueError:
+                raw = None  # broken: stream it below to keep the records before the damage
+            if raw is not None:
+                records = raw if isinstance(raw, list) else []
+                del raw
+                for i, record in enumerate(records):
+                    records[i] = None  # let it go once the caller is done with it
+                    yield record
+                return
+        with open(path, encoding="utf-8") as f:
+            yield from jsonio.iter_array(f)
+    except (OSError, ValueError):
+        return
+
+
+def _file_stamp(path: Path) -> Optional[Tuple[int, int, int]]:
+    # Changes whenever the file is rewritten (new inode on rename) or grows
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# (op, record) pairs as written by append(): ("add", book dict) / ("remove", {"isbn": ...})
+Change = Tuple[str, dict]
+
+
+class Storage(ABC):
+    """Where a Library keeps its book records between runs."""
+
+    # True when single add/remove records can be appended without a full rewrite
+    append_only = False
+    # engine name, as in STORAGES (also the "storage" label of the metrics)
+    kind = "custom"
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    @abstractmethod
+    def load(self) -> Iterable[dict]:
+        """Return all stored records, in insertion order (may be a lazy iterator)."""
+        pass
+
+    @abstractmethod
+    def save(self, records: Iterable[dict]) -> None:
+        """Replace the stored data with the given records."""
+        pass
+
+    def append(self, op: str, record: dict) -> None:
+        """Record a single "add" or "remove" (only for append-only storages)."""
+        raise NotImplementedError(f"{type(self).__name__} cannot append single records.")
+
+    def sync(self) -> None:
+        """Make sure appended records are on disk."""
+        pass
+
+    def stamp(self) -> Hashable:
+        """Token that changes whenever the data on disk changes (also by other processes)."""
+        return _file_stamp(self.path)
+
+    def changes_since(self, stamp: Hashable) -> Optional[List[Change]]:
+        """Changes made after ``stamp`` was taken, or None if only a full read can tell."""
+        return None
+
+    def size(self) -> int:
+        """Bytes the stored data takes on disk."""
+        stamp = _file_stamp(self.path)
+        return stamp[2] if stamp else 0
+
+    def close(self) -> None:
+        pass
+
+
+class JsonFileStorage(Storage):
+    """The whole catalog as one JSON array (the original library.json format)."""
+
+    kind = "json"
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            self.path.write_text("[]", encoding="utf-8")
+
+    def load(self) -> Iterator[dict]:
+        return _read_snapshot(self.path)
+
+    def save(self, records: Iterable[dict]) -> None:
+        # temp file + rename: a crash mid-write never leaves a truncated file
+        _atomic_write_text(self.path, jsonio.dumps(list(records), indent=True))
+
+
+class WalStorage(Storage):
+    """A JSON snapshot plus an append-only log of changes (write-ahead log).
+
+    Each add/remove is one line appended to ``<file>.wal``, so a write costs the
+    same no matter how big the catalog is. ``fsync`` runs once every
+    ``fsync_every`` records, and a timer syncs the rest at most
+    ``fsync_interval`` seconds after they were written. When the log holds
+    ``compact_after`` records it is rotated and folded into the snapshot by a
+    background thread.
+    """
+
+    append_only = True
+    kind = "wal"
+
+    def __init__(
+        self,
+        path: str | Path,
+        fsync_every: int = 32,
+        fsync_interval: float = 1.0,
+        compact_after: int = 10_000,
+    ) -> None:
+        super().__init__(path)
+        self.log_path = self.path.with_name(self.path.name + ".wal")
+        # log being folded into the snapshot by the compactor
+        self.old_log_path = self.path.with_name(self.path.name + ".wal.old")
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_after = compact_after
+        # False: compact inside append() instead of a thread (needed when several
+        # processes share the files and hold a file lock while writing)
+        self.background_compaction = True
+
+        self._lock = threading.Lock()
+        self._log = None
+        self._pending = 0  # records written but not fsynced yet
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[threading.Timer] = None
+        self._entries = 0  # records in the current log
+        self._compactor: Optional[threading.Thread] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            self.path.write_text("[]", encoding="utf-8")
+
+    # Reading
+
+    @staticmethod
+    def _parse_line(line: str | bytes) -> Optional[Change]:
+        try:
+            entry = jsonio.loads(line)
+            book = entry["book"]
+            str(book["isbn"])
+        except (ValueError, KeyError, TypeError):
+            return None  # torn or broken line (e.g. crash while writing)
+        return ("remove" if entry.get("op") == "remove" else "add", book)
+
+    @classmethod
+    def _read_log(cls, path: Path, records: Dict[str, dict]) -> int:
+        count = 0
+        if not path.exists():
+            return count
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                change = cls._parse_line(line)
+                if change is None:
+                    continue
+                op, book = change
+                if op == "remove":
+                    records.pop(str(book["isbn"]), None)
+                else:
+                    records[str(book["isbn"])] = book
+                count += 1
+        return count
+
+    def stamp(self) -> Hashable:
+        return (_file_stamp(self.path), _file_stamp(self.log_path))
+
+    def size(self) -> int:
+        return sum(s[2] for s in (_file_stamp(p) for p in (self.path, self.log_path, self.old_log_path)) if s)
+
+    def changes_since(self, stamp: Hashable) -> Optional[List[Change]]:
+        """The log lines appended since stamp, if the snapshot and log file are the same ones."""
+        snap, log = self.stamp()
+        if not isinstance(stamp, tuple) or stamp[0] != snap or self.old_log_path.exists():
+            return None
+        old_log = stamp[1]
+        if log is None:
+            return [] if old_log is None else None
+        if old_log is None:
+            offset = 0
+        elif old_log[0] != log[0] or old_log[2] > log[2]:
+            return None  # the log was replaced
+        else:
+            offset = old_log[2]
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            data = f.read(log[2] - offset)
+        # only whole lines; a torn tail is skipped like on load
+        changes = [self._parse_line(line) for line in data.splitlines(keepends=True) if line.endswith(b"\n")]
+        return [c for c in changes if c is not None]
+
+    def _replay(self, *logs: Path) -> Dict[str, dict]:
+        records: Dict[str, dict] = {}
+        for item in _read_snapshot(self.path):
+            if isinstance(item, dict) and "isbn" in item:
+                records.setdefault(str(item["isbn"]), item)
+        for log in logs:
+            self._read_log(log, records)
+        return records
+
+    def load(self) -> List[dict]:
+        self._wait_compaction()
+        with self._lock:
+            records = self._replay(self.old_log_path)
+            if self.old_log_path.exists():
+                # finish a compaction that was interrupted
+                _atomic_write_text(self.path, jsonio.dumps(list(records.values()), indent=True))
+                self.old_log_path.unlink()
+            self._entries = self._read_log(self.log_path, records)
+        return list(records.values())
+
+    # Writing
+
+    def _open_log(self):
+        if self._log is not None and self._log_replaced():
+            # another process saved or compacted: write to the new log file
+            self._log.close()
+            self._log = None
+        if self._log is None:
+            self._log = open(self.log_path, "a+", encoding="utf-8")
+            # A crash can leave a line without its newline; never glue onto it
+            if self._log.tell() > 0:
+                self._log.seek(self._log.tell() - 1)
+                if self._log.read(1) != "\n":
+                    self._log.write("\n")
+        return self._log
+
+    def _log_replaced(self) -> bool:
+        try:
+            return os.stat(self.log_path).st_ino != os.fstat(self._log.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _sync_log(self) -> None:
+        if self._sync_timer is not None:
+            self._sync_timer.cancel()
+            self._sync_timer = None
+        if self._log is not None and self._pending:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _arm_sync_timer(self) -> None:
+        # Called with the lock held: records wait at most fsync_interval for a sync,
+        # even when no further append comes to check the clock
+        if self._sync_timer is None:
+            delay = max(0.0, self.fsync_interval - (time.monotonic() - self._last_sync))
+            self._sync_timer = threading.Timer(delay, self._timed_sync)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def _timed_sync(self) -> None:
+        with self._lock:
+            if self._sync_timer is threading.current_thread():
+                self._sync_timer = None
+                self._sync_log()
+
+    def _close_log(self) -> None:
+        if self._log is not None:
+            self._sync_log()
+            self._log.close()
+            self._log = None
+
+    def append(self, op: str, record: dict) -> None:
+        line = jsonio.dumps({"op": op, "book": record})
+        with self._lock:
+            log = self._open_log()
+            log.write(line + "\n")
+            log.flush()
+            self._pending += 1
+            self._entries += 1
+            if self._pending >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync_log()
+            else:
+                self._arm_sync_timer()
+            if self._entries >= self.compact_after:
+                self._start_compaction()
+
+    def sync(self) -> None:
+        """Force pending log records to disk."""
+        with self._lock:
+            self._sync_log()
+
+    def save(self, records: Iterable[dict]) -> None:
+        data = jsonio.dumps(list(records), indent=True)
+        self._wait_compaction()
+        with self._lock:
+            _atomic_write_text(self.path, data)
+            self._close_log()
+            for log in (self.log_path, self.old_log_path):
+                if log.exists():
+                    log.unlink()
+            self._entries = 0
+
+    def close(self) -> None:
+        self._wait_compaction()
+        with self._lock:
+            self._close_log()
+
+    # Compaction
+
+    def _start_compaction(self) -> None:
+        # Called with the lock held; only the rename happens here
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if self.old_log_path.exists():
+            return  # an earlier compaction did not finish; leave it to load/save
+        self._close_log()
+        os.replace(self.log_path, self.old_log_path)
+        self._entries = 0
+        if not self.background_compaction:
+            self._compact()
+            return
+        self._compactor = threading.Thread(target=self._compact, name="wal-compactor", daemon=True)
+        self._compactor.start()
+
+    def _compact(self) -> None:
+        # Only this thread touches the snapshot and the old log until it finishes
+        records = self._replay(self.old_log_path)
+        _atomic_write_text(self.path, jsonio.dumps(list(records.values()), indent=True))
+        self.old_log_path.unlink()
+
+    def _wait_compaction(self) -> None:
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+
+STORAGES = {
+    "json": JsonFileStorage,
+    "wal": WalStorage,
+}
+
+
+def open_storage(kind: str, path: str | Path) -> Storage:
+    """Create a storage engine by name ("json" or "wal")."""
+    try:
+        return STORAGES[kind](path)
+    except KeyError:
+        raise ValueError(f"Unknown storage engine: {kind!r}") from None
@@ -0,0 +1,20 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Keep the API tests away from the real library.json in the project folder
+os.environ.setdefault("LIBRARY_FILE", str(Path(tempfile.mkdtemp(prefix="library_app_")) / "library.json"))
+
+from models import http_client
+from models.library import openlib_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_openlib_cache():
+    # Tests mock the same Open Library URLs with different answers
+    openlib_cache.clear()
+    # ...and some of them fail on purpose: no breaker state carried over
+    http_client.reset()
+    yield
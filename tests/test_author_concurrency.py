@@ -0,0 +1,65 @@
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+import respx
+
+from models.library import Library
+
+
+def _mock_multi_author_book(isbn, delay, side_effect_async=False):
+    respx.get(f"https://openlibrary.org/isbn/{isbn}.json").mock(
+        return_value=httpx.Response(
+            200,
+            json={
+                "title": "Three Authors",
+                "authors": [{"key": f"/authors/OL{i}A"} for i in (1, 2, 3)],
+            },
+        )
+    )
+    for i in (1, 2, 3):
+        def slow(request, i=i):
+            time.sleep(delay)
+            return httpx.Response(200, json={"name": f"Author {i}"})
+
+        async def slow_async(request, i=i):
+            await asyncio.sleep(delay)
+            return httpx.Response(200, json={"name": f"Author {i}"})
+
+        respx.get(f"https://openlibrary.org/authors/OL{i}A.json").mock(
+            side_effect=slow_async if side_effect_async else slow
+        )
+
+
+@respx.mock
+def test_sync_authors_are_fetched_in_parallel(tmp_path: Path):
+    lib = Library(str(tmp_path / "lib.json"))
+    _mock_multi_author_book("1231231231231", delay=0.2)
+
+    start = time.perf_counter()
+    added = lib.add_book_by_isbn("1231231231231")
+    elapsed = time.perf_counter() - start
+
+    assert added is not None
+    # Order follows the edition record, not the finishing order
+    assert added.author == "Author 1, Author 2, Author 3"
+    assert elapsed < 0.5
+
+
+@respx.mock
+def test_add_book_by_isbn_async(tmp_path: Path):
+    lib = Library(str(tmp_path / "lib.json"))
+    _mock_multi_author_book("3213213213213", delay=0.2, side_effect_async=True)
+
+    start = time.perf_counter()
+    added = asyncio.run(lib.add_book_by_isbn_async("321-3213213213"))
+    elapsed = time.perf_counter() - start
+
+    assert added is not None
+    assert added.author == "Author 1, Author 2, Author 3"
+    assert lib.find_book("3213213213213") is not None
+    assert elapsed < 0.5
+
+    # Already stored: no second add
+    assert asyncio.run(lib.add_book_by_isbn_async("3213213213213")) is None
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+import respx
+
+from models.batcher import IsbnBatcher, fetch_editions
+
+
+@respx.mock
+def test_concurrent_lookups_share_one_request():
+    route = respx.get("https://openlibrary.org/api/books").mock(
+        return_value=httpx.Response(
+            200,
+            json={
+                "ISBN:9000000000001": {"title": "First", "authors": [{"name": "A"}, {"name": "B"}]},
+                "ISBN:9000000000002": {"title": "Second", "by_statement": "C"},
+            },
+        )
+    )
+
+    async def lookups():
+        batcher = IsbnBatcher(window=0.05)
+        return await asyncio.gather(
+            batcher.fetch("9000000000001"),
+            batcher.fetch("9000000000002"),
+            batcher.fetch("9000000000003"),
+            batcher.fetch("9000000000001"),
+        )
+
+    first, second, missing, again = asyncio.run(lookups())
+    assert route.call_count == 1
+    assert route.calls[0].request.url.params["bibkeys"] == (
+        "ISBN:9000000000001,ISBN:9000000000002,ISBN:9000000000003"
+    )
+    assert (first.title, first.author) == ("First", "A, B")
+    assert (second.title, second.author) == ("Second", "C")
+    assert missing is None
+    assert again == first
+
+
+@respx.mock
+def test_batch_errors_reach_every_caller():
+    respx.get("https://openlibrary.org/api/books").mock(side_effect=httpx.ConnectError("boom"))
+
+    async def lookups():
+        batcher = IsbnBatcher(window=0.01)
+        return await asyncio.gather(batcher.fetch("1"), batcher.fetch("2"), return_exceptions=True)
+
+    results = asyncio.run(lookups())
+    assert all(isinstance(r, httpx.ConnectError) for r in results)
+
+
+@respx.mock
+def test_fetch_editions_uses_one_request():
+    route = respx.get("https://openlibrary.org/api/books").mock(
+        return_value=httpx.Response(200, json={"ISBN:222": {"details": {"title": "Found"}}})
+    )
+    assert fetch_editions(["111", "222"]) == {"222": {"title": "Found"}}
+    assert route.call_count == 1
@@ -0,0 +1,24 @@
+import json
+
+from benchmarks import run
+
+
+def test_runner_writes_results_and_flags_regressions(tmp_path):
+    out = tmp_path / "results.json"
+    assert run.main(["--sizes", "50", "--repeat", "1", "--output", str(out)]) == 0
+
+    report = json.loads(out.read_text(encoding="utf-8"))
+    names = set(report["results"])
+    for case in ("load_books", "save_books", "find_book", "add_book", "remove_book"):
+        assert f"library.{case}[json,n=50]" in names
+        assert f"library.{case}[wal,n=50]" in names
+    assert "api.POST /books[wal,n=50]" in names
+    assert "api.DELETE /books/{isbn}[json,n=50]" in names
+
+    # A baseline 10x faster than now: every case is a regression
+    faster = {"results": {k: dict(v, median=v["median"] / 10) for k, v in report["results"].items()}}
+    assert run.regressions(report, faster, 1.25)
+    assert not run.regressions(report, report, 1.25)
+    base = tmp_path / "baseline.json"
+    base.write_text(json.dumps(faster), encoding="utf-8")
+    assert run.main(["--sizes", "50", "--repeat", "1", "--no-api", "--baseline", str(base), "--threshold", "1.25"]) == 1
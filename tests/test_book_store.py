@@ -0,0 +1,126 @@
+import gc
+import json
+import tracemalloc
+
+from models.book import Book
+from models.book_store import BookStore
+from models.library import Library
+
+
+def test_mapping_behaviour_and_order():
+    store = BookStore()
+    store["1111"] = Book("Martin Eden", "Jack London", "1111")
+    store["0123X"] = Book("Çalıkuşu", "Reşat Nuri Güntekin", "0123X")
+    store["ABC-1"] = Book("Odd Key", "Someone", "ABC-1")
+
+    assert list(store) == ["1111", "0123X", "ABC-1"]
+    assert store["0123X"] == Book("Çalıkuşu", "Reşat Nuri Güntekin", "0123X")
+    assert "ABC-1" in store and "2222" not in store and len(store) == 3
+
+    # Same key: updated in place, position kept
+    store["1111"] = Book("Martin Eden (2nd ed.)", "Jack London", "1111")
+    assert [b.title for b in store.values()][0] == "Martin Eden (2nd ed.)"
+
+    del store["0123X"]
+    del store["ABC-1"]
+    assert list(store) == ["1111"] and len(store) == 1
+    assert store.get("0123X") is None
+
+
+def test_views_do_not_change_the_store():
+    store = BookStore()
+    store["1111"] = Book("Martin Eden", "Jack London", "1111")
+    store["1111"].title = "Changed"
+    assert store["1111"].title == "Martin Eden"
+
+
+def test_order_survives_many_deletes_and_compaction():
+    store = BookStore()
+    for i in range(5000):
+        store[str(100000 + i)] = Book(f"Title {i}", f"Author {i % 7}", str(100000 + i))
+    for i in range(0, 5000, 3):
+        del store[str(100000 + i)]
+    for i in range(1, 5000, 3):
+        del store[str(100000 + i)]
+
+    expected = [str(100000 + i) for i in range(2, 5000, 3)]
+    assert list(store) == expected
+    assert [b.title for b in store.values()] == [f"Title {i}" for i in range(2, 5000, 3)]
+    assert store[str(100002)].author == "Author 2"
+
+
+def test_replaced_titles_do_not_grow_the_buffer():
+    store = BookStore()
+    for i in range(10):
+        store[str(100000 + i)] = Book(f"Title {i}", "Author", str(100000 + i))
+    for n in range(20000):
+        store["100003"] = Book(f"Revised edition number {n}", "Author", "100003")
+        store["100005"] = Book("Short" if n % 2 else "A much longer title " * 5, "Author", "100005")
+
+    assert len(store._text) < 4 * (1 << 16)
+    assert store["100003"].title == "Revised edition number 19999"
+    assert store["100005"].title == "Short"
+    assert [b.title for b in store.values()][:3] == ["Title 0", "Title 1", "Title 2"]
+    assert list(store)[3] == "100003" and store.sequence("100003") == 3
+
+
+def test_chunks_continue_across_compaction():
+    store = BookStore()
+    for i in range(3000):
+        store[str(100000 + i)] = Book(f"Title {i}", "Author", str(100000 + i))
+    first, seq = store.chunk_after(-1, 10)
+    assert [b.isbn for b in first] == [str(100000 + i) for i in range(10)]
+
+    # Compacted (rows renumbered) between two chunks; new books go to the end
+    for i in range(5, 2000):
+        del store[str(100000 + i)]
+    store["9999"] = Book("Late", "Author", "9999")
+    rest, seq = store.chunk_after(seq, 5000)
+    assert [b.isbn for b in rest] == [str(100000 + i) for i in range(2000, 3000)] + ["9999"]
+    assert store.chunk_after(seq, 10) == ([], seq)
+
+
+def test_compact_iteration_makes_books_a_chunk_at_a_time(tmp_path, monkeypatch):
+    lib = Library(str(tmp_path / "lib.json"), compact=True)
+    lib.add_books(Book(f"Title {i}", "Author", str(100000 + i)) for i in range(5000))
+    made = []
+    view = BookStore._book
+    monkeypatch.setattr(BookStore, "_book", lambda store, row, key: (made.append(row), view(store, row, key))[1])
+
+    first = [b.isbn for _, b in zip(range(10), lib.iter_books())]
+    assert first == [str(100000 + i) for i in range(10)]
+    assert len(made) < 100  # not one per stored book
+    assert sum(1 for _ in lib.iter_books()) == 5000
+
+
+def test_compact_library_round_trip(tmp_path):
+    storage = tmp_path / "lib.json"
+    lib = Library(str(storage), compact=True)
+    assert lib.add_book(Book("Martin Eden", "Jack London", "1111"))
+    assert lib.add_book(Book("Beyaz Diş", "Jack London", "2222"))
+    assert not lib.add_book(Book("Dup", "Dup", "1111"))
+    assert lib.remove_book("1111")
+
+    again = Library(str(storage), compact=True)
+    assert [b.isbn for b in again.list_books()] == ["2222"]
+    assert again.find_book("2222").title == "Beyaz Diş"
+
+
+def test_uses_several_times_less_memory():
+    rows = [
+        {"title": f"Some Book Title Number {i}", "author": f"Author {i % 500}", "isbn": str(9780000000000 + i)}
+        for i in range(20000)
+    ]
+    data = json.dumps(rows)
+
+    def measure(store):
+        gc.collect()
+        tracemalloc.start()
+        for r in json.loads(data):
+            store[r["isbn"]] = Book(**r)
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return used
+
+    assert measure({}) > 2 * measure(BookStore())
@@ -0,0 +1,127 @@
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import respx
+from fastapi.testclient import TestClient
+
+from api import app
+from main import cli
+from models.book import Book
+from models.importer import import_isbns
+from models.library import Library
+
+
+def _mock_books(*isbns):
+    # Books API: many ISBNs per request, unknown ones are left out of the answer
+    def answer(request):
+        keys = request.url.params["bibkeys"].split(",")
+        return httpx.Response(
+            200,
+            json={
+                key: {"title": "Bulk " + key[5:], "authors": [{"name": "Bulk Author"}]}
+                for key in keys
+                if key[5:] in isbns
+            },
+        )
+
+    return respx.get("https://openlibrary.org/api/books").mock(side_effect=answer)
+
+
+@respx.mock
+def test_cli_import_saves_once(tmp_path: Path, capsys, monkeypatch):
+    storage = tmp_path / "lib.json"
+    Library(str(storage)).add_book(Book("Already Here", "Someone", "5000000000003"))
+
+    books_api = _mock_books("5000000000001", "5000000000002")
+
+    isbn_file = tmp_path / "isbns.txt"
+    isbn_file.write_text(
+        "# new books\n5000000000001\n500-0000000002\n\n5000000000001\n5000000000003\n5000000000009\n12\n",
+        encoding="utf-8",
+    )
+
+    saves = []
+    original_save = Library.save_books
+    monkeypatch.setattr(Library, "save_books", lambda self: (saves.append(1), original_save(self)))
+
+    cli(["import", str(isbn_file), "--workers", "4", "--library", str(storage)])
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    statuses = sorted((item["isbn"], item["status"]) for item in lines[:-1])
+    assert statuses == [
+        ("12", "invalid"),
+        ("5000000000001", "added"),
+        ("5000000000001", "duplicate"),
+        ("5000000000002", "added"),
+        ("5000000000003", "exists"),
+        ("5000000000009", "not_found"),
+    ]
+    assert lines[-1] == {"summary": {"added": 2, "duplicate": 1, "exists": 1, "not_found": 1, "invalid": 1}}
+
+    # One upstream request and one save for the whole import
+    assert books_api.call_count == 1
+    assert len(saves) == 1
+    stored = {b["isbn"] for b in json.loads(storage.read_text(encoding="utf-8"))}
+    assert stored == {"5000000000001", "5000000000002", "5000000000003"}
+
+
+@respx.mock
+def test_bulk_endpoint_streams_ndjson():
+    _mock_books("6000000000001", "6000000000002")
+    client = TestClient(app)
+
+    r = client.post("/books/bulk", json={"isbns": ["6000000000001", "6000000000002"], "workers": 2})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert sorted(item["isbn"] for item in lines[:-1]) == ["6000000000001", "6000000000002"]
+    assert lines[-1] == {"summary": {"added": 2}}
+
+    for isbn in ("6000000000001", "6000000000002"):
+        client.delete(f"/books/{isbn}")
+
+
+@respx.mock
+def test_added_books_are_saved_when_the_client_goes_away(tmp_path: Path):
+    _mock_books("7000000000001", "7000000000002")
+    storage = tmp_path / "lib.json"
+    lib = Library(str(storage))
+
+    async def read_one_then_disconnect():
+        results = import_isbns(lib, ["7000000000001", "7000000000002"], workers=1)
+        first = await results.__anext__()
+        await results.aclose()  # what StreamingResponse does when the client disconnects
+        return first
+
+    first = asyncio.run(read_one_then_disconnect())
+    assert first["status"] == "added"
+    stored = {b["isbn"] for b in json.loads(storage.read_text(encoding="utf-8"))}
+    assert first["isbn"] in stored
+
+
+@respx.mock
+def test_other_writes_are_saved_during_an_import(tmp_path: Path):
+    async def slow_answer(request):
+        await asyncio.sleep(0.3)
+        return httpx.Response(200, json={"ISBN:8000000000001": {"title": "Slow", "authors": [{"name": "A"}]}})
+
+    respx.get("https://openlibrary.org/api/books").mock(side_effect=slow_answer)
+    storage = tmp_path / "lib.json"
+    lib = Library(str(storage))
+
+    async def main():
+        importing = asyncio.create_task(_collect(import_isbns(lib, ["8000000000001"])))
+        await asyncio.sleep(0.05)  # the import is waiting for Open Library now
+        assert await asyncio.to_thread(lib.add_book, Book("Dune", "Frank Herbert", "5555"))
+        on_disk = {b["isbn"] for b in json.loads(storage.read_text(encoding="utf-8"))}
+        return on_disk, await importing
+
+    on_disk, results = asyncio.run(main())
+    assert on_disk == {"5555"}
+    assert results[-1] == {"summary": {"added": 1}}
+
+
+async def _collect(items):
+    return [item async for item in items]
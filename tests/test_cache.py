@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import httpx
+import respx
+
+from models.cache import MISSING, TTLCache
+from models.library import Library, openlib_cache
+
+
+def test_ttl_lru_and_negative_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("models.cache.time.time", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=60, negative_ttl=10)
+
+    cache.set("a", {"name": "A"})
+    cache.set("missing", None)  # e.g. a 404
+    assert cache.get("a") == {"name": "A"}
+    assert cache.get("missing") is None
+
+    # Least recently used entry is dropped when full ("missing" was used after "a")
+    cache.set("b", {"name": "B"})
+    assert cache.get("a") is MISSING
+
+    # Negative entries expire sooner
+    now[0] += 30
+    assert cache.get("missing") is MISSING
+    assert cache.get("b") == {"name": "B"}
+    now[0] += 60
+    assert cache.get("b") is MISSING
+    assert cache.get("b", allow_stale=True) == {"name": "B"}
+
+    assert cache.hits == 4
+    assert cache.misses == 3
+
+
+def test_disk_tier_survives_restart(tmp_path: Path):
+    path = tmp_path / "cache.db"
+    TTLCache(persist_path=path).set("/authors/OL1A.json", {"name": "Author One"})
+
+    fresh = TTLCache(persist_path=path)
+    assert fresh.get("/authors/OL1A.json") == {"name": "Author One"}
+
+
+def test_disk_tier_drops_old_rows_and_stays_bounded(tmp_path: Path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("models.cache.time.time", lambda: now[0])
+    path = tmp_path / "cache.db"
+
+    def cache():
+        return TTLCache(persist_path=path, ttl=60, stale_ttl=100, disk_maxsize=25)
+
+    def rows(c):
+        return [key for (key,) in c._disk.execute("SELECT key FROM cache ORDER BY expires")]
+
+    cache().set("old", {"n": 0})
+    # Expired, but kept to be served stale...
+    now[0] += 120
+    assert cache().get("old", allow_stale=True) == {"n": 0}
+    # ...until stale_ttl has passed too
+    now[0] += 100
+    assert rows(cache()) == []
+
+    monkeypatch.setattr("models.cache.PRUNE_EVERY", 10)
+    c = cache()
+    for i in range(40):
+        c.set(str(i), {"n": i})
+        now[0] += 1
+    assert len(rows(c)) <= 25 + 10 and rows(c)[-1] == "39"
+    # Pruned when opened: only the newest 25 rows remain
+    assert rows(cache()) == [str(i) for i in range(15, 40)]
+
+
+@respx.mock
+def test_author_is_fetched_once_for_many_books(tmp_path: Path):
+    lib = Library(str(tmp_path / "lib.json"))
+    for isbn in ("1000000000001", "1000000000002"):
+        respx.get(f"https://openlibrary.org/isbn/{isbn}.json").mock(
+            return_value=httpx.Response(200, json={"title": "Book " + isbn, "authors": [{"key": "/authors/OL9A"}]})
+        )
+    author = respx.get("https://openlibrary.org/authors/OL9A.json").mock(
+        return_value=httpx.Response(200, json={"name": "Popular Author"})
+    )
+    missing = respx.get("https://openlibrary.org/isbn/0000000000000.json").mock(return_value=httpx.Response(404))
+
+    assert lib.add_book_by_isbn("1000000000001").author == "Popular Author"
+    assert lib.add_book_by_isbn("1000000000002").author == "Popular Author"
+    assert author.call_count == 1
+
+    # 404s are remembered as well
+    assert lib.add_book_by_isbn("0000000000000") is None
+    assert lib.add_book_by_isbn("0000000000000") is None
+    assert missing.call_count == 1
+
+    # Removing and re-adding a book does not fetch again
+    lib.remove_book("1000000000001")
+    assert lib.add_book_by_isbn("1000000000001") is not None
+    assert openlib_cache.stats()["hits"] >= 3
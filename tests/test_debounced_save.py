@@ -0,0 +1,58 @@
+import json
+import time
+
+from models.book import Book
+from models.library import Library
+
+
+def _stored_isbns(path):
+    return [r["isbn"] for r in json.loads(path.read_text(encoding="utf-8"))]
+
+
+def _wait_for(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end and not condition():
+        time.sleep(0.01)
+    return condition()
+
+
+def test_changes_are_saved_by_the_flusher(tmp_path):
+    storage = tmp_path / "debounced.json"
+    lib = Library(str(storage), flush_interval=0.1)
+
+    lib.add_book(Book("Martin Eden", "Jack London", "1111"))
+    lib.add_book(Book("A Room of One's Own", "Virginia Woolf", "2222"))
+    # Not written right away...
+    assert _stored_isbns(storage) == []
+    # ...but within the interval, in one go
+    assert _wait_for(lambda: _stored_isbns(storage) == ["1111", "2222"])
+    lib.close()
+
+
+def test_flush_after_n_changes(tmp_path):
+    storage = tmp_path / "debounced.json"
+    lib = Library(str(storage), flush_interval=60, flush_after=3)
+
+    for isbn in ("1111", "2222"):
+        lib.add_book(Book("Title", "Author", isbn))
+    time.sleep(0.05)
+    assert _stored_isbns(storage) == []
+
+    lib.add_book(Book("Title", "Author", "3333"))
+    assert _wait_for(lambda: _stored_isbns(storage) == ["1111", "2222", "3333"])
+    lib.close()
+
+
+def test_explicit_flush_and_close(tmp_path):
+    storage = tmp_path / "debounced.json"
+    lib = Library(str(storage), flush_interval=60)
+
+    lib.add_book(Book("Martin Eden", "Jack London", "1111"))
+    lib.flush()
+    assert _stored_isbns(storage) == ["1111"]
+
+    lib.remove_book("1111")
+    lib.close()
+    assert _stored_isbns(storage) == []
+    # Written through a temp file that was renamed into place
+    assert not (tmp_path / "debounced.json.tmp").exists()
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+import respx
+from fastapi.testclient import TestClient
+
+from models import http_client
+
+
+def test_sync_client_is_shared():
+    client = http_client.get_client()
+    assert http_client.get_client() is client
+    http_client.close()
+    # A closed client is replaced on next use
+    assert http_client.get_client() is not client
+
+
+def test_async_client_is_shared_within_a_loop():
+    async def two_clients():
+        return http_client.get_async_client(), http_client.get_async_client()
+
+    first, second = asyncio.run(two_clients())
+    assert first is second
+
+
+@respx.mock
+def test_api_lifespan_opens_and_closes_client():
+    from api import app
+
+    isbn = "7777777777777"
+    respx.get(f"https://openlibrary.org/isbn/{isbn}.json").mock(
+        return_value=httpx.Response(200, json={"title": "Pooled", "authors": []})
+    )
+
+    with TestClient(app) as client:
+        shared = http_client._async_client
+        assert shared is not None
+        client.post("/books", json={"isbn": isbn})
+        # The request used the client created at startup
+        assert http_client._async_client is shared
+        client.delete(f"/books/{isbn}")
+
+    # Shutdown closed it
+    assert shared.is_closed
@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+
+from models import isbn
+from models.book import Book
+from models.library import Library
+from models.sqlite_library import SqliteLibrary
+
+ISBN10 = "0-14-044926-4"
+ISBN13 = "9780140449266"
+
+
+def test_normalize_and_validate():
+    assert isbn.normalize(" 0-8044-2957-x ") == "080442957X"
+    assert isbn.is_valid("080442957X") and isbn.is_valid(ISBN13) and isbn.is_valid(ISBN10)
+    assert not isbn.is_valid("9780140449267") and not isbn.is_valid("1111")
+    assert isbn.is_well_formed("978-0 14") and not isbn.is_well_formed("97X8") and not isbn.is_well_formed("abc")
+
+
+def test_canonical_key():
+    assert isbn.canonical(ISBN10) == ISBN13
+    assert isbn.canonical("080442957X") == "9780804429573"
+    assert isbn.canonical(ISBN13) == ISBN13
+    # Not real ISBNs: just normalized, so in-house numbers still work
+    assert isbn.canonical("11-11") == "1111"
+    assert isbn.canonical("0140449265") == "0140449265"
+
+    before = isbn.canonical.cache_info().hits
+    isbn.canonical(ISBN10)
+    assert isbn.canonical.cache_info().hits == before + 1
+
+
+def test_book_carries_its_key():
+    book = Book("The Odyssey", "Homer", ISBN10)
+    assert book.key == ISBN13
+    assert book.to_dict() == {"title": "The Odyssey", "author": "Homer", "isbn": ISBN10}
+    assert book == Book("The Odyssey", "Homer", ISBN10)
+
+
+def test_stored_books_do_not_fill_the_query_cache():
+    isbn.canonical.cache_clear()
+    for text in [ISBN10, ISBN13, "0-8044-2957-x", " 11-11 ", "0140449265"]:
+        assert Book("T", "A", text).key == isbn.key_of(text) == isbn.canonical(text)
+    # Only the canonical() calls above were cached
+    assert isbn.canonical.cache_info().currsize == 5
+    Book("T", "A", "9780804429573")
+    assert isbn.canonical.cache_info().currsize == 5
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_library_dedupes_isbn10_and_isbn13(tmp_path, compact):
+    storage = tmp_path / "lib.json"
+    lib = Library(str(storage), compact=compact)
+    assert lib.add_book(Book("The Odyssey", "Homer", ISBN10))
+    assert not lib.add_book(Book("The Odyssey", "Homer", ISBN13))
+
+    # Stored as entered, found under either form
+    assert lib.find_book(ISBN13).isbn == "0140449264"
+    assert lib.find_book("0140449264").key == ISBN13
+    assert [b.isbn for b in lib.suggest_books("014044")] == ["0140449264"]
+
+    assert lib.remove_book(ISBN13)
+    assert Library(str(storage), compact=compact).list_books() == []
+
+
+def test_load_keeps_the_first_of_both_forms(tmp_path):
+    storage = tmp_path / "lib.json"
+    storage.write_text(
+        '[{"title": "A", "author": "X", "isbn": "0140449264"},'
+        ' {"title": "B", "author": "Y", "isbn": "9780140449266"}]',
+        encoding="utf-8",
+    )
+    assert [b.title for b in Library(str(storage)).list_books()] == ["A"]
+
+
+def test_sqlite_dedupes_and_migrates_old_databases(tmp_path):
+    db = tmp_path / "old.db"
+    conn = sqlite3.connect(str(db))
+    conn.executescript("""
+        CREATE TABLE books (isbn TEXT PRIMARY KEY, title TEXT NOT NULL, author TEXT NOT NULL);
+        INSERT INTO books VALUES ('0140449264', 'The Odyssey', 'Homer');
+        INSERT INTO books VALUES ('9780140449266', 'Odyssey again', 'Homer');
+        INSERT INTO books VALUES ('1111', 'Martin Eden', 'Jack London');
+    """)
+    conn.commit()
+    conn.close()
+
+    lib = SqliteLibrary(str(db))
+    assert [b.isbn for b in lib.list_books()] == ["0140449264", "1111"]
+    assert lib.find_book(ISBN13).title == "The Odyssey"
+    assert not lib.add_book(Book("Dup", "Dup", ISBN13))
+    assert lib.remove_book(ISBN13)
+    assert [b.isbn for b in lib.list_books()] == ["1111"]
+    lib.close()
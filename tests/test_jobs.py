@@ -0,0 +1,239 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import respx
+from fastapi.testclient import TestClient
+
+import api
+from models import jobs as jobs_module
+from models.jobs import DONE, FAILED, NOT_FOUND, PENDING, JobQueue
+from models.library import Library
+
+EDITION = "https://openlibrary.org/isbn/9780140449266.json"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_retries_then_succeeds_and_cleans_up_misses(tmp_path):
+    calls = []
+    cleaned = []
+
+    async def handler(isbn):
+        calls.append(isbn)
+        if isbn == "1111" and calls.count("1111") < 3:
+            raise RuntimeError("upstream down")
+        return {"isbn": isbn} if isbn == "1111" else None
+
+    async def cleanup(job):
+        cleaned.append(job.isbn)
+
+    async def main():
+        queue = JobQueue(tmp_path / "jobs.json", handler, cleanup, workers=2, retries=3, backoff=0.001)
+        await queue.start()
+        ok = await queue.submit("1111")
+        missing = await queue.submit("2222")
+        await asyncio.wait_for(queue.join(), 5)
+        await queue.stop()
+        return queue.get(ok.id), queue.get(missing.id)
+
+    ok, missing = run(main())
+    assert (ok.status, ok.attempts, ok.result) == (DONE, 3, {"isbn": "1111"})
+    assert missing.status == NOT_FOUND
+    assert cleaned == ["2222"]
+
+
+def test_gives_up_after_the_retries(tmp_path):
+    async def handler(isbn):
+        raise RuntimeError("still down")
+
+    async def main():
+        queue = JobQueue(tmp_path / "jobs.json", handler, workers=1, retries=2, backoff=0.001)
+        await queue.start()
+        job = await queue.submit("1111")
+        await asyncio.wait_for(queue.join(), 5)
+        await queue.stop()
+        return job
+
+    job = run(main())
+    assert (job.status, job.attempts, job.error) == (FAILED, 3, "still down")
+
+
+def test_pending_jobs_survive_a_restart(tmp_path):
+    async def handler(isbn):
+        return {"isbn": isbn}
+
+    async def submit_only():
+        queue = JobQueue(tmp_path / "jobs.json", handler)
+        return (await queue.submit("1111")).id
+
+    job_id = run(submit_only())  # never started: the process "stopped" here
+
+    async def restart():
+        queue = JobQueue(tmp_path / "jobs.json", handler)
+        assert queue.get(job_id).status == PENDING
+        await queue.start()
+        await asyncio.wait_for(queue.join(), 5)
+        await queue.stop()
+        return JobQueue(tmp_path / "jobs.json", handler).get(job_id)
+
+    assert run(restart()).status == DONE
+
+
+def test_queue_is_bounded(tmp_path):
+    async def handler(isbn):
+        return None
+
+    async def main():
+        queue = JobQueue(tmp_path / "jobs.json", handler, max_pending=1)
+        await queue.submit("1111")
+        with pytest.raises(jobs_module.QueueFull):
+            await queue.submit("2222")
+
+    run(main())
+
+
+def test_journal_appends_and_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs_module, "COMPACT_MIN", 10)
+    path = tmp_path / "jobs.json"
+
+    async def handler(isbn):
+        return None
+
+    async def main():
+        queue = JobQueue(path, handler)
+        for i in range(4):
+            await queue.submit(f"{i}111")
+        lines = len(path.read_text(encoding="utf-8").splitlines())
+        # concurrent submits share writes, and pending() is a counter
+        await asyncio.gather(*(queue.submit(f"{i}222") for i in range(20)))
+        assert queue.pending() == 24
+        return lines
+
+    assert run(main()) == 4
+    # compacted along the way: one line per job, not one per change
+    assert len(path.read_text(encoding="utf-8").splitlines()) <= 24
+    assert JobQueue(path, handler).pending() == 24
+
+
+def test_reads_the_old_json_array(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text('[{"isbn": "1111", "id": "old", "status": "pending"}]', encoding="utf-8")
+
+    async def handler(isbn):
+        return {"isbn": isbn}
+
+    async def main():
+        queue = JobQueue(path, handler)
+        assert queue.pending() == 1
+        await queue.submit("2222")  # rewrites the file as a journal first
+
+    run(main())
+    queue = JobQueue(path, handler)
+    assert queue.get("old").isbn == "1111" and queue.pending() == 2
+
+
+def test_failed_journal_writes_do_not_stop_the_workers(tmp_path):
+    async def handler(isbn):
+        return {"isbn": isbn}
+
+    async def main():
+        queue = JobQueue(tmp_path / "jobs.json", handler, workers=1, backoff=0.001)
+        append = queue._append
+        failed = []
+
+        def failing(status):
+            def write(lines):
+                if not failed and any(f'"status": "{status}"' in line for line in lines):
+                    failed.append(status)
+                    raise OSError("disk full")
+                append(lines)
+            return write
+
+        # A submit whose write fails leaves nothing behind
+        queue._append = failing("pending")
+        with pytest.raises(OSError):
+            await queue.submit("0000")
+        assert queue.pending() == 0
+
+        # A worker whose "running" write fails keeps going, and the job is retried
+        failed.clear()
+        queue._append = failing("running")
+        await queue.start()
+        first = await queue.submit("1111")
+        second = await queue.submit("2222")
+        await asyncio.wait_for(queue.join(), 5)
+        await queue.stop()
+        assert failed == ["running"]
+        return first.id, second.id
+
+    first, second = run(main())
+    reloaded = JobQueue(tmp_path / "jobs.json", lambda isbn: None)
+    assert reloaded.get(first).status == DONE and reloaded.get(second).status == DONE
+    assert reloaded.pending() == 0 and len(reloaded._jobs) == 2
+
+
+def test_async_add_refuses_shared_mode(monkeypatch):
+    monkeypatch.setattr(api, "LIBRARY_ASYNC_ADD", True)
+    monkeypatch.setattr(api, "LIBRARY_SHARED", True)
+    with pytest.raises(ValueError, match="LIBRARY_SHARED"):
+        api.create_jobs()
+
+
+@pytest.fixture
+def async_api(tmp_path, monkeypatch):
+    lib = Library(str(tmp_path / "lib.json"))
+    monkeypatch.setattr(api, "library_store", lib)
+    queue = JobQueue(tmp_path / "jobs.json", api.enrich_book, api.drop_placeholder, retries=1, backoff=0.001)
+    monkeypatch.setattr(api, "enrichment_jobs", queue)
+    return lib
+
+
+def wait_for_job(client, job_id):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] not in ("pending", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+@respx.mock
+def test_post_answers_202_and_the_worker_fills_in_the_book(async_api):
+    respx.get(EDITION).mock(return_value=httpx.Response(200, json={"title": "The Odyssey", "by_statement": "Homer"}))
+    with TestClient(api.app) as client:
+        r = client.post("/books", json={"isbn": "978-0-14-044926-6"})
+        assert r.status_code == 202
+        body = r.json()
+        assert r.headers["location"] == f"/jobs/{body['job_id']}"
+        assert body["isbn"] == "9780140449266"
+        # the placeholder is stored right away, so a second POST is a conflict
+        assert client.post("/books", json={"isbn": "9780140449266"}).status_code == 409
+
+        job = wait_for_job(client, body["job_id"])
+        assert job["status"] == "done"
+        assert job["result"]["title"] == "The Odyssey"
+
+    book = async_api.find_book("9780140449266")
+    assert (book.title, book.author) == ("The Odyssey", "Homer")
+    # the indexes follow the update
+    assert async_api.search_books("odyssey") == [book]
+    assert async_api.suggest_books("(look") == []
+
+
+@respx.mock
+def test_not_found_removes_the_placeholder(async_api):
+    respx.get(EDITION).mock(return_value=httpx.Response(404))
+    with TestClient(api.app) as client:
+        job_id = client.post("/books", json={"isbn": "9780140449266"}).json()["job_id"]
+        assert wait_for_job(client, job_id)["status"] == "not_found"
+    assert async_api.find_book("9780140449266") is None
+
+
+def test_unknown_job_is_404(async_api):
+    with TestClient(api.app) as client:
+        assert client.get("/jobs/nope").status_code == 404
@@ -19,3 +19,19 @@ def test_add_and_find(tmp_path):
 
     # Not found case
     assert lib.find_book("9999") is None
+
+
+def test_update_book(tmp_path):
+    storage = tmp_path / "update.json"
+    lib = Library(str(storage))
+    lib.add_book(Book("Placeholder", "Nobody", "1111"))
+    lib.add_book(Book("Dune", "Frank Herbert", "2222"))
+
+    # Same ISBN, new details; the book keeps its place in the list
+    assert lib.update_book(Book("Martin Eden", "Jack London", "1111")) is True
+    assert [(b.title, b.isbn) for b in lib.list_books()] == [("Martin Eden", "1111"), ("Dune", "2222")]
+    assert lib.update_book(Book("Nope", "Nobody", "9999")) is False
+
+    reloaded = Library(str(storage))
+    assert reloaded.find_book("1111").author == "Jack London"
+    assert len(reloaded.list_books()) == 2
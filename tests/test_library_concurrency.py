@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+
+from models.book import Book
+from models.book_store import BookStore
+from models.library import Library
+from models.storage import WalStorage
+
+
+def _hammer(lib, start):
+    for i in range(start, start + 50):
+        isbn = str(10_000 + i)
+        lib.add_book(Book(f"Book {i}", "Author", isbn))
+        lib.list_books()
+        if i % 2:
+            lib.remove_book(isbn)
+
+
+def test_parallel_writers_and_readers(tmp_path):
+    storage = tmp_path / "threads.json"
+    lib = Library(str(storage))
+
+    threads = [threading.Thread(target=_hammer, args=(lib, n * 50)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Every even book stayed, and the file matches memory
+    expected = {str(10_000 + i) for i in range(200) if i % 2 == 0}
+    assert {b.isbn for b in lib.list_books()} == expected
+    assert {r["isbn"] for r in json.loads(storage.read_text(encoding="utf-8"))} == expected
+
+
+def test_wal_log_follows_memory_order(tmp_path):
+    storage = tmp_path / "threads.json"
+    lib = Library(storage=WalStorage(storage))
+
+    threads = [threading.Thread(target=_hammer, args=(lib, n * 50)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lib.close()
+
+    reloaded = Library(storage=WalStorage(storage))
+    assert [b.isbn for b in reloaded.list_books()] == [b.isbn for b in lib.list_books()]
+
+
+def test_snapshot_is_not_affected_by_later_writes(tmp_path):
+    lib = Library(str(tmp_path / "snap.json"))
+    lib.add_book(Book("Martin Eden", "Jack London", "1111"))
+
+    before = lib.list_books()
+    version = lib.version
+    lib.add_book(Book("A Room of One's Own", "Virginia Woolf", "2222"))
+
+    assert [b.isbn for b in before] == ["1111"]
+    assert [b.isbn for b in lib.list_books()] == ["1111", "2222"]
+    assert lib.version == version + 1
+
+
+def test_compact_lookup_waits_for_a_table_rebuild(tmp_path, monkeypatch):
+    # A BookStore rebuilds its hash table in place when it grows; a reader
+    # arriving halfway must wait for it instead of missing the book
+    lib = Library(str(tmp_path / "compact.json"), compact=True, flush_interval=60)
+    lib.add_book(Book("Kept", "Author", "5555"))
+    halfway = threading.Event()
+    init = BookStore._table_init
+
+    def slow_init(store, size):
+        init(store, size)
+        if size > 8 and not halfway.is_set():  # emptied, not refilled yet
+            halfway.set()
+            time.sleep(0.2)
+
+    monkeypatch.setattr(BookStore, "_table_init", slow_init)
+    found = []
+    reader = threading.Thread(target=lambda: (halfway.wait(5), found.append(lib.find_book("5555"))))
+    reader.start()
+    for i in range(20):
+        lib.add_book(Book(f"Temp {i}", "Author", str(600_000 + i)))
+    reader.join()
+    lib.close()
+    assert halfway.is_set() and found[0] is not None and found[0].title == "Kept"
+
+
+def test_compact_iteration_during_writes(tmp_path):
+    lib = Library(str(tmp_path / "compact.json"), compact=True, flush_interval=60)
+    kept = [str(500_000 + i) for i in range(200)]
+    lib.add_books(Book(f"Kept {i}", "Author", isbn) for i, isbn in enumerate(kept))
+    stop = threading.Event()
+    misses = []
+
+    def read():
+        while not stop.is_set():
+            listed = [b.isbn for b in lib.iter_books() if b.isbn in kept]
+            if listed != kept:
+                misses.append(listed)
+
+    def write():
+        # enough to grow the table and compact the rows a few times
+        for i in range(3000):
+            isbn = str(600_000 + i)
+            lib.add_book(Book(f"Temp {i}", "Author", isbn))
+            lib.remove_book(isbn)
+        stop.set()
+
+    threads = [threading.Thread(target=read) for _ in range(2)] + [threading.Thread(target=write)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lib.close()
+    assert misses == []
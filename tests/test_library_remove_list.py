@@ -11,3 +11,20 @@ def test_remove(tmp_path):
 
     # Removing again should return False
     assert lib.remove_book("3333") is False
+
+
+def test_list_keeps_insertion_order_after_remove(tmp_path):
+    storage = tmp_path / "order.json"
+    lib = Library(str(storage))
+
+    lib.add_book(Book("Martin Eden", "Jack London", "1111"))
+    lib.add_book(Book("A Room of One's Own", "Virginia Woolf", "2222"))
+    lib.add_book(Book("Thus Spoke Zarathustra", "Friedrich Nietzsche", "3333"))
+    lib.remove_book("2222")
+
+    # Remaining books keep the order they were added in
+    assert [b.isbn for b in lib.list_books()] == ["1111", "3333"]
+    assert lib.find_book("2222") is None
+
+    # Reloading from the file gives the same order
+    assert [b.isbn for b in Library(str(storage)).list_books()] == ["1111", "3333"]
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from models.book import Book
+from models.library import Library
+from models.sqlite_library import SqliteLibrary
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_books([
+        Book("Çalıkuşu", "Reşat Nuri Güntekin", "3333"),
+        Book("Beyaz Diş", "Jack London", "1111"),
+        Book("Martin Eden", "Jack London", "2222"),
+        Book("Anna Karenina", "Lev Tolstoy", "4444"),
+        Book("Dune", "Frank Herbert", "5555"),
+    ])
+    monkeypatch.setattr(api, "library_store", lib)
+    return TestClient(api.app)
+
+
+def isbns(r):
+    return [b["isbn"] for b in r.json()]
+
+
+def test_no_parameters_returns_everything(client):
+    r = client.get("/books")
+    assert r.status_code == 200
+    assert isbns(r) == ["3333", "1111", "2222", "4444", "5555"]
+    assert r.json()[0] == {"title": "Çalıkuşu", "author": "Reşat Nuri Güntekin", "isbn": "3333"}
+    assert "link" not in r.headers
+
+
+def test_limit_offset_and_cursor(client):
+    r = client.get("/books", params={"limit": 2})
+    assert isbns(r) == ["3333", "1111"]
+    assert r.headers["link"] == '</books?limit=2&after=1111&after_key=1>; rel="next"'
+
+    r = client.get("/books", params={"limit": 2, "after": "1111"})
+    assert isbns(r) == ["2222", "4444"]
+    r = client.get("/books", params={"limit": 2, "after": "4444"})
+    assert isbns(r) == ["5555"] and "link" not in r.headers
+
+    assert isbns(client.get("/books", params={"limit": 2, "offset": 3})) == ["4444", "5555"]
+    assert client.get("/books", params={"after": "9999"}).status_code == 400
+
+
+def test_sort_walks_pages_with_link(client):
+    url, seen = "/books?sort=title&limit=2", []
+    while url:
+        r = client.get(url)
+        seen += [b["title"] for b in r.json()]
+        link = r.headers.get("link")
+        url = link[1:link.index(">")] if link else None
+    # Accents do not push Çalıkuşu to the end
+    assert seen == ["Anna Karenina", "Beyaz Diş", "Çalıkuşu", "Dune", "Martin Eden"]
+
+    assert isbns(client.get("/books", params={"sort": "-isbn"})) == ["5555", "4444", "3333", "2222", "1111"]
+    assert client.get("/books", params={"sort": "year"}).status_code == 422
+
+
+def next_url(r):
+    link = r.headers["link"]
+    return link[1:link.index(">")]
+
+
+@pytest.mark.parametrize("kind", ["memory", "compact", "sqlite"])
+@pytest.mark.parametrize("sort", ["", "title", "-author", "isbn"])
+def test_cursor_survives_deleting_its_book(client, tmp_path, monkeypatch, sort, kind):
+    if kind != "memory":
+        lib = SqliteLibrary(str(tmp_path / "lib.db")) if kind == "sqlite" else Library(str(tmp_path / "c.json"), compact=True)
+        lib.add_books(api.library_store.list_books())
+        monkeypatch.setattr(api, "library_store", lib)
+    everything = isbns(client.get("/books", params={"sort": sort} if sort else {}))
+    r = client.get("/books", params={"limit": 2, **({"sort": sort} if sort else {})})
+    assert isbns(r) == everything[:2]
+
+    api.library_store.remove_book(everything[1])
+    r = client.get(next_url(r))
+    assert r.status_code == 200
+    assert isbns(r) == everything[2:4]
+
+
+def test_fields_and_ndjson(client):
+    r = client.get("/books", params={"fields": "isbn,title", "limit": 1})
+    assert r.json() == [{"isbn": "3333", "title": "Çalıkuşu"}]
+    assert client.get("/books", params={"fields": "price"}).status_code == 422
+
+    r = client.get("/books", params={"format": "ndjson", "fields": "isbn"})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line) for line in r.text.splitlines()] == [{"isbn": i} for i in ("3333", "1111", "2222", "4444", "5555")]
+
+    r = client.get("/books", headers={"Accept": "application/x-ndjson"}, params={"limit": 1})
+    assert r.text == json.dumps({"title": "Çalıkuşu", "author": "Reşat Nuri Güntekin", "isbn": "3333"}, ensure_ascii=False) + "\n"
+
+
+def test_etag_gives_304_until_the_library_changes(client):
+    etag = client.get("/books").headers["etag"]
+    r = client.get("/books", headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.headers["etag"] == etag
+
+    api.library_store.remove_book("5555")
+    r = client.get("/books", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["etag"] != etag
+    assert "5555" not in isbns(r)
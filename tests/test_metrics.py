@@ -0,0 +1,96 @@
+import httpx
+import pytest
+import respx
+from fastapi.testclient import TestClient
+
+import api
+from models import http_client, metrics
+from models.book import Book
+from models.cache import CACHE_REQUESTS
+from models.library import STORAGE_BYTES, STORAGE_SECONDS, Library, get_json
+from models.singleflight import DEDUPE
+from models.storage import WalStorage
+
+
+def test_text_format():
+    registry = metrics.Registry()
+    hits = registry.register(metrics.Counter("demo_hits_total", "Hits.", ("kind",)))
+    took = registry.register(metrics.Histogram("demo_seconds", "Time.", ("op",), buckets=(0.1, 1)))
+    hits.inc(kind='say "hi"')
+    hits.inc(2, kind='say "hi"')
+    took.observe(0.05, op="a")
+    took.observe(0.5, op="a")
+    took.observe(5, op="a")
+
+    text = registry.render()
+    assert "# TYPE demo_hits_total counter" in text
+    assert 'demo_hits_total{kind="say \\"hi\\""} 3' in text
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{op="a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{op="a",le="1"} 2' in text
+    assert 'demo_seconds_bucket{op="a",le="+Inf"} 3' in text
+    assert 'demo_seconds_sum{op="a"} 5.55' in text
+    assert 'demo_seconds_count{op="a"} 3' in text
+
+
+def test_labels_must_match_and_names_are_unique():
+    registry = metrics.Registry()
+    hits = registry.register(metrics.Counter("demo_total", "Hits.", ("kind",)))
+    with pytest.raises(ValueError):
+        hits.inc(other="x")
+    with pytest.raises(ValueError):
+        registry.register(metrics.Counter("demo_total", "Again."))
+
+
+@respx.mock
+def test_upstream_and_cache_are_counted(monkeypatch):
+    monkeypatch.setattr(http_client, "RETRIES", 0)
+    url = "https://openlibrary.org/isbn/9780140449266.json"
+    respx.get(url).mock(return_value=httpx.Response(200, json={"title": "Metrics"}))
+    labels = dict(host="openlibrary.org", endpoint="isbn", status="200")
+    calls, hits = metrics_count(labels)
+
+    get_json(url)
+    get_json(url)
+
+    assert metrics_count(labels) == (calls + 1, hits + 1)
+
+
+def metrics_count(labels):
+    return (http_client.UPSTREAM_SECONDS.count(**labels), CACHE_REQUESTS.value(cache="openlibrary", result="hit"))
+
+
+def test_storage_load_save_and_append(tmp_path):
+    json_lib = Library(str(tmp_path / "a.json"))
+    saves = STORAGE_SECONDS.count(storage="json", op="save")
+    json_lib.add_book(Book("Dune", "Frank Herbert", "5555"))
+    assert STORAGE_SECONDS.count(storage="json", op="save") == saves + 1
+    assert STORAGE_BYTES.sum(storage="json", op="save") > 0
+
+    appends = STORAGE_SECONDS.count(storage="wal", op="append")
+    wal_lib = Library(storage=WalStorage(tmp_path / "b.json"))
+    wal_lib.add_book(Book("Dune", "Frank Herbert", "5555"))
+    wal_lib.remove_book("5555")
+    assert STORAGE_SECONDS.count(storage="wal", op="append") == appends + 2
+    wal_lib.close()
+
+
+@respx.mock
+def test_metrics_endpoint_and_route_latency(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "library_store", Library(str(tmp_path / "lib.json")))
+    respx.get("https://openlibrary.org/isbn/9780140449266.json").mock(
+        return_value=httpx.Response(200, json={"title": "The Odyssey", "by_statement": "Homer"})
+    )
+    started = DEDUPE.value(name="openlibrary", result="started")
+    with TestClient(api.app) as client:
+        assert client.post("/books", json={"isbn": "9780140449266"}).status_code == 201
+        assert client.delete("/books/9780140449266").status_code == 200
+        r = client.get("/metrics")
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+    assert 'library_http_request_duration_seconds_count{method="POST",route="/books",status="201"}' in text
+    assert 'route="/books/{isbn}",status="200"' in text
+    assert "library_upstream_request_duration_seconds_bucket" in text
+    assert DEDUPE.value(name="openlibrary", result="started") == started + 1
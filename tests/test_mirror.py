@@ -0,0 +1,90 @@
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+import respx
+from fastapi.testclient import TestClient
+
+import main
+from models import mirror
+from models.importer import import_isbns
+from models.library import Library, fetch_book, fetch_book_async
+
+
+def tsv(kind, key, record):
+    return "\t".join([kind, key, "3", "2024-01-01T00:00:00", json.dumps(record, ensure_ascii=False)]) + "\n"
+
+
+@pytest.fixture
+def mirror_db(tmp_path, monkeypatch, capsys):
+    editions = tmp_path / "ol_dump_editions.txt.gz"
+    with gzip.open(editions, "wt", encoding="utf-8") as f:
+        f.write(tsv("/type/edition", "/books/OL1M", {
+            "title": "Sana Gül Bahçesi Vadetmedim",
+            "authors": [{"key": "/authors/OL1A"}],
+            "isbn_10": ["0140449264"],
+            "isbn_13": ["9780140449266"],
+        }))
+        f.write(tsv("/type/edition", "/books/OL2M", {
+            "title": "Two Authors",
+            "authors": [{"key": "/authors/OL1A"}, {"key": "/authors/OL9A"}],
+            "isbn_13": ["9786000000001"],
+        }))
+        f.write(tsv("/type/edition", "/books/OL3M", {"title": "No ISBN"}))
+        f.write("broken line\n")
+    authors = tmp_path / "ol_dump_authors.jsonl"
+    authors.write_text(
+        json.dumps({"type": {"key": "/type/author"}, "key": "/authors/OL1A", "name": "Joanne Greenberg"}) + "\n",
+        encoding="utf-8",
+    )
+
+    db = tmp_path / "mirror.db"
+    main.cli(["mirror", str(editions), str(authors), "--db", str(db)])
+    out = capsys.readouterr().out
+    assert "2 editions, 0 authors, 2 skipped" in out
+    assert "0 editions, 1 authors, 0 skipped" in out
+
+    monkeypatch.setattr(mirror, "MIRROR_PATH", str(db))
+    return db
+
+
+@respx.mock(assert_all_called=False)
+def test_lookups_are_served_offline(mirror_db):
+    # No routes: any network call would fail the test
+    book = fetch_book("9780140449266")
+    assert (book.title, book.author) == ("Sana Gül Bahçesi Vadetmedim", "Joanne Greenberg")
+    # ISBN-10 of the same edition
+    assert fetch_book("0-14-044926-4").title == "Sana Gül Bahçesi Vadetmedim"
+    assert asyncio.run(fetch_book_async("9780140449266", strict=True)).author == "Joanne Greenberg"
+
+
+@respx.mock
+def test_missing_records_still_go_to_open_library(mirror_db):
+    author = respx.get("https://openlibrary.org/authors/OL9A.json").mock(
+        return_value=httpx.Response(200, json={"name": "Second Author"})
+    )
+    edition = respx.get("https://openlibrary.org/isbn/9786000000002.json").mock(return_value=httpx.Response(404))
+
+    assert fetch_book("9786000000001").author == "Joanne Greenberg, Second Author"
+    assert fetch_book("9786000000002") is None
+    assert author.call_count == 1 and edition.call_count == 1
+
+
+@respx.mock(assert_all_called=False)
+def test_library_api_and_bulk_import_use_the_mirror(mirror_db, tmp_path, monkeypatch):
+    import api
+
+    lib = Library(str(tmp_path / "lib.json"))
+    assert lib.add_book_by_isbn("0140449264").title == "Sana Gül Bahçesi Vadetmedim"
+
+    monkeypatch.setattr(api, "library_store", Library(str(tmp_path / "api.json")))
+    r = TestClient(api.app).post("/books", json={"isbn": "9780140449266"})
+    assert r.status_code == 201 and r.json()["author"] == "Joanne Greenberg"
+
+    async def run():
+        return [item async for item in import_isbns(Library(str(tmp_path / "bulk.json")), ["9780140449266"])]
+
+    results = asyncio.run(run())
+    assert (results[0]["isbn"], results[0]["status"]) == ("9780140449266", "added")
@@ -0,0 +1,68 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import api
+from models.book import Book
+from models.library import Library
+from models.prefix import PrefixIndex, isbn_prefix, scan_suggest
+
+BOOKS = [
+    Book("Martin Eden", "Jack London", "9780140187724"),
+    Book("Martı", "Richard Bach", "9789750719387"),
+    Book("Çalıkuşu", "Reşat Nuri Güntekin", "9789750806803"),
+    Book("Mart Ayı", "Someone", "123456789X"),
+]
+
+
+def test_isbn_prefix():
+    assert isbn_prefix("978-0-14") == "978014"
+    assert isbn_prefix(" 123456789x") == "123456789X"
+    assert isbn_prefix("Mart") == ""
+
+
+def test_isbn_and_title_prefixes(tmp_path):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_books(BOOKS)
+
+    assert [b.isbn for b in lib.suggest_books("978-975")] == ["9789750719387", "9789750806803"]
+    assert [b.isbn for b in lib.suggest_books("12345")] == ["123456789X"]
+    # Folded titles, sorted: "mart ayi" < "marti" < "martin eden"
+    assert [b.title for b in lib.suggest_books("MART")] == ["Mart Ayı", "Martı", "Martin Eden"]
+    assert [b.title for b in lib.suggest_books("mart", limit=2)] == ["Mart Ayı", "Martı"]
+    assert [b.title for b in lib.suggest_books("calik")] == ["Çalıkuşu"]
+    assert lib.suggest_books("zzz") == []
+
+    for prefix in ("978", "mart", "calik", "1"):
+        assert scan_suggest(lib.iter_books(), prefix) == lib.suggest_books(prefix)
+
+
+def test_index_follows_add_and_remove(tmp_path):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_books(BOOKS)
+    assert len(lib.suggest_books("mart")) == 3
+    lib.remove_book("9789750719387")
+    lib.add_book(Book("Martılar", "Someone Else", "5555"))
+    assert [b.title for b in lib.suggest_books("mart")] == ["Mart Ayı", "Martılar", "Martin Eden"]
+    assert [b.isbn for b in lib.suggest_books("5")] == ["5555"]
+
+
+def test_suggest_endpoint(tmp_path, monkeypatch):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_books(BOOKS)
+    monkeypatch.setattr(api, "library_store", lib)
+    client = TestClient(api.app)
+
+    r = client.get("/books/suggest", params={"prefix": "marti", "limit": 1})
+    assert r.status_code == 200
+    assert r.json() == [{"title": "Martı", "author": "Richard Bach", "isbn": "9789750719387"}]
+    assert client.get("/books/suggest", params={"prefix": ""}).status_code == 422
+
+
+def test_lookup_does_not_grow_with_the_catalog():
+    index = PrefixIndex.build(Book(f"Title {i:06d}", "A", str(10_000_000 + i)) for i in range(200_000))
+    start = time.perf_counter()
+    for _ in range(1000):
+        found = index.suggest("title 1234", limit=10)
+    assert (time.perf_counter() - start) / 1000 < 0.001
+    assert len(found) == 10
@@ -0,0 +1,74 @@
+import httpx
+import pytest
+import respx
+from fastapi.testclient import TestClient
+
+import api
+from models import profiling
+from models.library import Library
+from models.profiling import Profiler, Trace, span
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "library_store", Library(str(tmp_path / "lib.json")))
+    return TestClient(api.app)
+
+
+def test_span_records_only_inside_a_trace():
+    with span("outside"):
+        pass
+    trace = Trace()
+    token = profiling.activate(trace)
+    try:
+        with span("store"):
+            pass
+        with span("store"):
+            pass
+    finally:
+        profiling.deactivate(token)
+    assert list(trace.as_dict()) == ["store"]
+    assert trace.as_dict()["store"]["count"] == 2
+
+
+def test_debug_profiles_is_off_by_default(client, monkeypatch):
+    monkeypatch.setattr(api, "profiler", None)
+    assert client.get("/debug/profiles").status_code == 404
+
+
+@respx.mock
+def test_sampled_post_gets_spans_and_functions(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(api, "profiler", Profiler(tmp_path / "profiles", sample_rate=1.0, slow_after=60))
+    respx.get("https://openlibrary.org/isbn/9780140449266.json").mock(
+        return_value=httpx.Response(200, json={"title": "The Odyssey", "authors": [{"key": "/authors/OL1A"}]})
+    )
+    respx.get("https://openlibrary.org/authors/OL1A.json").mock(return_value=httpx.Response(200, json={"name": "Homer"}))
+
+    assert client.post("/books", json={"isbn": "9780140449266"}).status_code == 201
+
+    reports = client.get("/debug/profiles").json()
+    assert len(reports) == 1
+    report = reports[0]
+    assert (report["method"], report["route"], report["status"], report["profiled"]) == ("POST", "/books", 201, True)
+    assert {"normalize", "fetch", "fetch_edition", "fetch_authors", "store", "persist"} <= set(report["spans"])
+    assert "top" not in report
+
+    full = client.get(f"/debug/profiles/{report['id']}").json()
+    assert full["top"] and {"function", "calls", "cumulative"} <= set(full["top"][0])
+    assert (tmp_path / "profiles" / f"{report['id']}.prof").exists()
+    assert client.get("/debug/profiles/nope").status_code == 404
+
+
+def test_only_slow_requests_are_kept_and_old_ones_rotate(client, tmp_path, monkeypatch):
+    prof = Profiler(tmp_path / "profiles", sample_rate=0, slow_after=0, keep=2)
+    monkeypatch.setattr(api, "profiler", prof)
+    for _ in range(4):
+        client.get("/books")
+    reports = prof.reports()
+    assert len(reports) == 2
+    assert all(not r["profiled"] and r["route"] == "/books" for r in reports)
+    assert len(list((tmp_path / "profiles").iterdir())) == 2
+
+    prof.slow_after = 60
+    client.get("/books")
+    assert len(prof.reports()) == 2
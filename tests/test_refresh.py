@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+import respx
+
+from models.book import Book
+from models.library import STORAGE_SECONDS, Library
+from models.refresh import RateLimiter, Refresher
+
+BASE = "https://openlibrary.org/isbn"
+
+
+def edition(request, title, etag):
+    # 304 when the client already has this version
+    if request.headers.get("If-None-Match") == etag:
+        return httpx.Response(304)
+    return httpx.Response(200, json={"title": title, "by_statement": "Homer"}, headers={"ETag": etag})
+
+
+@respx.mock
+def test_changed_books_are_written_once_and_unchanged_ones_cost_a_304(tmp_path):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_books([Book("Old Title", "Homer", "1111"), Book("Iliad", "Homer", "2222"), Book("Gone", "Nobody", "3333")])
+    respx.get(f"{BASE}/1111.json").mock(side_effect=lambda r: edition(r, "New Title", '"v2"'))
+    respx.get(f"{BASE}/2222.json").mock(side_effect=lambda r: edition(r, "Iliad", '"v1"'))
+    respx.get(f"{BASE}/3333.json").mock(return_value=httpx.Response(404))
+    refresher = Refresher(lib, tmp_path / "lib.json.refresh.json", rate=0)
+
+    saves = STORAGE_SECONDS.count(storage="json", op="save")
+    report = asyncio.run(refresher.run_once())
+    assert {k: report[k] for k in ("checked", "changed", "same", "not_found", "written")} == {
+        "checked": 3, "changed": 1, "same": 1, "not_found": 1, "written": 1,
+    }
+    assert report["updated"] == ["1111"]
+    assert STORAGE_SECONDS.count(storage="json", op="save") == saves + 1
+    assert lib.find_book("1111").title == "New Title"
+    assert lib.find_book("3333") is not None  # a 404 never deletes anything
+    state = json.loads((tmp_path / "lib.json.refresh.json").read_text())
+    assert state[lib.find_book("1111").key]["etag"] == '"v2"'
+
+    # Second cycle: the validators are sent back and nothing is written
+    report = asyncio.run(Refresher(lib, tmp_path / "lib.json.refresh.json", rate=0).run_once())
+    assert (report["unchanged"], report["written"]) == (2, 0)
+    assert STORAGE_SECONDS.count(storage="json", op="save") == saves + 1
+
+
+@respx.mock
+def test_batches_take_the_books_checked_longest_ago(tmp_path):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_books([Book("A", "X", "1111"), Book("B", "X", "2222")])
+    route = respx.get(url__regex=rf"{BASE}/\d+\.json").mock(return_value=httpx.Response(404))
+    report_file = tmp_path / "report.jsonl"
+    refresher = Refresher(lib, tmp_path / "state.json", batch_size=1, rate=0, report_path=report_file)
+
+    asyncio.run(refresher.run_once())
+    asyncio.run(refresher.run_once())
+    asyncio.run(refresher.run_once())
+
+    assert [c.request.url.path for c in route.calls] == ["/isbn/1111.json", "/isbn/2222.json", "/isbn/1111.json"]
+    lines = report_file.read_text().splitlines()
+    assert len(lines) == 3 and json.loads(lines[-1])["checked"] == 1
+
+
+@respx.mock
+def test_server_errors_are_counted_and_retried_next_cycle(tmp_path, monkeypatch):
+    from models import http_client
+
+    monkeypatch.setattr(http_client, "RETRIES", 0)
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_book(Book("A", "X", "1111"))
+    respx.get(f"{BASE}/1111.json").mock(return_value=httpx.Response(500))
+    report = asyncio.run(Refresher(lib, tmp_path / "state.json", rate=0).run_once())
+    assert (report["errors"], report["written"]) == (1, 0)
+    assert json.loads((tmp_path / "state.json").read_text()) == {}
+
+
+@respx.mock
+def test_failed_write_is_retried_next_cycle(tmp_path, monkeypatch):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_book(Book("Old", "Homer", "1111"))
+    respx.get(f"{BASE}/1111.json").mock(side_effect=lambda r: edition(r, "New", '"v2"'))
+    refresher = Refresher(lib, tmp_path / "state.json", rate=0)
+    write = refresher._write
+
+    def broken(changed):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(refresher, "_write", broken)
+    with pytest.raises(OSError):
+        asyncio.run(refresher.run_once())
+    assert lib.find_book("1111").title == "Old"
+
+    # The new ETag was not kept, so the next cycle gets the record again
+    monkeypatch.setattr(refresher, "_write", write)
+    report = asyncio.run(refresher.run_once())
+    assert (report["changed"], report["written"]) == (1, 1)
+    assert lib.find_book("1111").title == "New"
+
+
+@respx.mock
+def test_author_lookups_are_rate_limited(tmp_path, monkeypatch):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_book(Book("Old", "Homer", "1111"))
+    respx.get(f"{BASE}/1111.json").mock(
+        return_value=httpx.Response(200, json={"title": "New", "authors": [{"key": "/authors/OL1A"}]})
+    )
+    respx.get("https://openlibrary.org/authors/OL1A.json").mock(return_value=httpx.Response(200, json={"name": "Homer"}))
+    waits = []
+    wait = RateLimiter.wait
+    monkeypatch.setattr(RateLimiter, "wait", lambda self: (waits.append(1), wait(self))[1])
+
+    asyncio.run(Refresher(lib, tmp_path / "state.json", rate=0).run_once())
+    assert len(waits) == 2  # the edition and its author
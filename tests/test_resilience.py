@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import respx
+from fastapi.testclient import TestClient
+
+from models import http_client
+from models.library import get_json, get_json_async, openlib_cache
+
+URL = "https://openlibrary.org/isbn/1234567890123.json"
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(http_client, "BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(http_client, "BREAKER_MIN_CALLS", 4)
+    monkeypatch.setattr(http_client, "BREAKER_WINDOW", 4)
+    http_client.reset()
+
+
+@respx.mock
+def test_retries_server_errors_then_succeeds():
+    route = respx.get(URL).mock(side_effect=[httpx.Response(503), httpx.Response(429, headers={"Retry-After": "0"}),
+                                             httpx.Response(200, json={"title": "Third Time"})])
+    assert get_json(URL) == {"title": "Third Time"}
+    assert route.call_count == 3
+
+
+@respx.mock
+def test_not_found_is_not_retried():
+    route = respx.get(URL).mock(return_value=httpx.Response(404))
+    assert get_json(URL) is None
+    assert route.call_count == 1
+
+
+@respx.mock
+def test_gives_up_after_the_retries():
+    route = respx.get(URL).mock(side_effect=httpx.ConnectError("down"))
+    with pytest.raises(httpx.ConnectError):
+        get_json(URL)
+    assert route.call_count == http_client.RETRIES + 1
+
+
+@respx.mock
+def test_breaker_opens_serves_stale_data_and_recovers(monkeypatch):
+    monkeypatch.setattr(http_client, "RETRIES", 0)
+    route = respx.get(URL).mock(return_value=httpx.Response(500))
+    for _ in range(4):
+        with pytest.raises(httpx.HTTPStatusError):
+            get_json(URL)
+    assert http_client.breaker_state(URL) == "open"
+
+    # Open: no call goes out
+    calls = route.call_count
+    with pytest.raises(http_client.CircuitOpenError):
+        get_json(URL)
+    assert route.call_count == calls
+
+    # ...but an expired cache entry is better than nothing
+    openlib_cache.set(URL, {"title": "Old But Useful"}, ttl=-1)
+    assert get_json(URL) == {"title": "Old But Useful"}
+    openlib_cache.delete(URL)
+
+    # After the cooldown one trial call goes out; success closes the breaker
+    monkeypatch.setattr(http_client, "BREAKER_COOLDOWN", 0)
+    route.mock(return_value=httpx.Response(200, json={"title": "Back"}))
+    assert get_json(URL) == {"title": "Back"}
+    assert http_client.breaker_state(URL) == "closed"
+
+
+@respx.mock
+def test_cancelled_trial_call_reopens_the_breaker(monkeypatch):
+    monkeypatch.setattr(http_client, "RETRIES", 0)
+    route = respx.get(URL).mock(return_value=httpx.Response(500))
+    for _ in range(4):
+        with pytest.raises(httpx.HTTPStatusError):
+            get_json(URL)
+    monkeypatch.setattr(http_client, "BREAKER_COOLDOWN", 0)
+
+    async def slow(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200, json={})
+
+    async def cancel_the_trial():
+        route.mock(side_effect=slow)
+        trial = asyncio.ensure_future(http_client.aget(URL))
+        await asyncio.sleep(0.05)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(cancel_the_trial())
+    assert http_client.breaker_state(URL) == "open"
+
+    # The next trial goes out instead of failing fast forever
+    route.mock(return_value=httpx.Response(200, json={"title": "Back"}))
+    assert get_json(URL) == {"title": "Back"}
+    assert http_client.breaker_state(URL) == "closed"
+
+
+@respx.mock
+def test_api_answers_503_while_the_breaker_is_open(tmp_path, monkeypatch):
+    import api
+    from models.library import Library
+
+    monkeypatch.setattr(api, "library_store", Library(str(tmp_path / "lib.json")))
+    monkeypatch.setattr(http_client, "RETRIES", 0)
+    respx.get(URL).mock(return_value=httpx.Response(502))
+    client = TestClient(api.app)
+    for _ in range(4):
+        assert client.post("/books", json={"isbn": "1234567890123"}).status_code == 502
+
+    r = client.post("/books", json={"isbn": "1234567890123"})
+    assert r.status_code == 503
+    assert int(r.headers["retry-after"]) >= 1
+
+
+@respx.mock
+def test_slow_request_is_hedged(monkeypatch):
+    monkeypatch.setattr(http_client, "HEDGE", True)
+    host = http_client._host(URL)
+    host.latencies.extend([0.01] * http_client.HEDGE_MIN_SAMPLES)
+
+    calls = []
+
+    async def answer(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            await asyncio.sleep(1)  # the first copy hangs
+        return httpx.Response(200, json={"title": "Hedged"})
+
+    respx.get(URL).mock(side_effect=answer)
+
+    async def run():
+        started = time.monotonic()
+        data = await get_json_async(URL)
+        return data, time.monotonic() - started
+
+    data, elapsed = asyncio.run(run())
+    assert data == {"title": "Hedged"}
+    assert len(calls) == 2 and elapsed < 0.5
+
+
+@respx.mock
+def test_per_host_concurrency_limit(monkeypatch):
+    monkeypatch.setattr(http_client, "HOST_CONCURRENCY", 2)
+    http_client.reset()
+    running, peak = 0, 0
+
+    async def answer(request):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return httpx.Response(200, json={})
+
+    respx.get(url__regex=r"https://openlibrary\.org/isbn/\d+\.json").mock(side_effect=answer)
+
+    async def run():
+        await asyncio.gather(*(http_client.aget(f"https://openlibrary.org/isbn/{i}.json") for i in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
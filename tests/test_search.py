@@ -0,0 +1,74 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import api
+from models.book import Book
+from models.library import Library
+from models.search import SearchIndex, fold, scan_search
+
+BOOKS = [
+    Book("Sana Gül Bahçesi Vadetmedim", "Joanne Greenberg", "1111"),
+    Book("Çalıkuşu", "Reşat Nuri Güntekin", "2222"),
+    Book("İnce Memed", "Yaşar Kemal", "3333"),
+    Book("Gül Yetiştirme", "Bahçe Uzmanı", "4444"),
+]
+
+
+def test_fold_ignores_case_and_accents():
+    assert fold("Sana Gül Bahçesi") == "sana gul bahcesi"
+    assert fold("İNCE Çalıkuşu") == "ince calikusu"
+
+
+def test_index_and_scan_rank_the_same(tmp_path):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_books(BOOKS)
+
+    assert [b.isbn for b in lib.search_books("gul bahcesi")] == ["1111"]
+    assert [b.isbn for b in lib.search_books("calikusu")] == ["2222"]
+    assert [b.isbn for b in lib.search_books("ince")] == ["3333"]
+    assert lib.search_books("gul roman") == []
+    # Title hits rank above an author-only hit
+    lib.add_book(Book("Roman", "Gül Yazar", "6666"))
+    ranked = [b.isbn for b in lib.search_books("gul")]
+    assert sorted(ranked[:2]) == ["1111", "4444"] and ranked[2] == "6666"
+    assert [b.isbn for b in lib.search_books("bahce")] == ["4444"]
+
+    for q in ("gul", "gul bahcesi", "yasar kemal", "bahce", "roman"):
+        assert [b.isbn for b in scan_search(lib.iter_books(), q)] == [b.isbn for b in lib.search_books(q)]
+
+
+def test_index_follows_add_and_remove(tmp_path):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_books(BOOKS)
+    assert lib.search_books("kemal")
+    lib.remove_book("3333")
+    assert lib.search_books("kemal") == []
+    lib.add_book(Book("Yer Demir Gök Bakır", "Yaşar Kemal", "5555"))
+    assert [b.isbn for b in lib.search_books("yasar")] == ["5555"]
+
+
+def test_search_endpoint(tmp_path, monkeypatch):
+    lib = Library(str(tmp_path / "lib.json"))
+    lib.add_books(BOOKS)
+    monkeypatch.setattr(api, "library_store", lib)
+    client = TestClient(api.app)
+
+    r = client.get("/books/search", params={"q": "Gul Bahcesi"})
+    assert r.status_code == 200
+    assert r.json() == [{"title": "Sana Gül Bahçesi Vadetmedim", "author": "Joanne Greenberg", "isbn": "1111"}]
+    assert client.get("/books/search", params={"q": ""}).status_code == 422
+    assert client.get("/books/search", params={"q": "gul", "limit": 1}).json()[0]["isbn"] in ("1111", "4444")
+
+
+def test_selective_query_is_fast_on_a_big_index():
+    index = SearchIndex()
+    for i in range(100_000):
+        index.add(Book(f"Common Words Book {i}", f"Author {i % 1000}", str(1_000_000 + i)))
+
+    start = time.perf_counter()
+    for _ in range(100):
+        hits = index.search("book 4242")
+    elapsed = (time.perf_counter() - start) / 100
+    assert [isbn for isbn, _ in hits] == ["1004242"]
+    assert elapsed < 0.01
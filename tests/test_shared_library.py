@@ -0,0 +1,130 @@
+import asyncio
+import multiprocessing
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from models.book import Book
+from models.library import Library
+from models.storage import WalStorage, open_storage
+
+
+def make(path, kind):
+    # "wal-compacting": a tiny log limit, so processes compact while others write
+    storage = WalStorage(path, compact_after=7) if kind == "wal-compacting" else open_storage(kind, path)
+    return Library(str(path), storage=storage, shared=True)
+
+
+def add_many(path, kind, worker, count):
+    lib = make(path, kind)
+    for i in range(count):
+        assert lib.add_book(Book(f"Book {worker}-{i}", "Author", f"{worker}{i:04d}"))
+    lib.close()
+
+
+@pytest.mark.parametrize("kind", ["json", "wal", "wal-compacting"])
+def test_processes_do_not_lose_each_others_writes(tmp_path, kind):
+    path = tmp_path / "lib.json"
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=add_many, args=(path, kind, w + 1, 15)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+
+    books = make(path, kind).list_books()
+    assert len(books) == 60
+    assert {b.isbn for b in books} == {f"{w}{i:04d}" for w in range(1, 5) for i in range(15)}
+
+
+@pytest.mark.parametrize("kind", ["json", "wal"])
+def test_sees_other_writers_incrementally(tmp_path, kind):
+    path = tmp_path / "lib.json"
+    a, b = make(path, kind), make(path, kind)
+    assert a.add_book(Book("Martin Eden", "Jack London", "1111"))
+    assert a.add_book(Book("Beyaz Diş", "Jack London", "2222"))
+
+    # b picks up a's changes without a full reload...
+    kept = b.find_book("2222")
+    assert kept is not None and [x.isbn for x in b.list_books()] == ["1111", "2222"]
+    assert b.search_books("martin")[0].isbn == "1111"
+
+    # ...and a's later changes apply on top, keeping the Books it already had
+    assert a.remove_book("1111")
+    assert a.add_book(Book("Demir Ökçe", "Jack London", "3333"))
+    assert [x.isbn for x in b.list_books()] == ["2222", "3333"]
+    assert b.find_book("2222") is kept
+    assert b.search_books("martin") == []
+
+    # A duplicate is caught even though b never listed the book before adding
+    assert a.add_book(Book("Dune", "Frank Herbert", "4444"))
+    assert not b.add_book(Book("Dune again", "Frank Herbert", "4444"))
+    a.close()
+    b.close()
+
+
+def test_wal_tail_is_read_instead_of_a_full_load(tmp_path, monkeypatch):
+    path = tmp_path / "lib.json"
+    a, b = make(path, "wal"), make(path, "wal")
+    a.add_book(Book("Martin Eden", "Jack London", "1111"))
+
+    monkeypatch.setattr(b.storage, "load", lambda: pytest.fail("full load"))
+    assert [x.isbn for x in b.list_books()] == ["1111"]
+
+
+def test_shared_mode_saves_every_change(tmp_path):
+    path = tmp_path / "lib.json"
+    lib = Library(str(path), flush_interval=60, shared=True)
+    with lib.batch():
+        lib.add_book(Book("Martin Eden", "Jack London", "1111"))
+        assert [x.isbn for x in Library(str(path)).list_books()] == ["1111"]
+    lib.close()
+
+
+@pytest.mark.parametrize("kind", ["json", "wal"])
+def test_etag_follows_other_workers(tmp_path, monkeypatch, kind):
+    path = tmp_path / "lib.json"
+    first, second = make(path, kind), make(path, kind)
+    first.add_book(Book("Dune", "Frank Herbert", "5555"))
+    monkeypatch.setattr(api, "library_store", first)
+    client = TestClient(api.app)
+    etag = client.get("/books").headers["etag"]
+
+    # Another worker with the same files hands out the same tag
+    monkeypatch.setattr(api, "library_store", second)
+    assert client.get("/books", headers={"If-None-Match": etag}).status_code == 304
+
+    second.add_book(Book("Beyaz Diş", "Jack London", "1111"))
+    monkeypatch.setattr(api, "library_store", first)
+    r = client.get("/books", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["etag"] != etag
+    assert sorted(b["isbn"] for b in r.json()) == ["1111", "5555"]
+    assert client.get("/books", headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+    first.close()
+    second.close()
+
+
+def test_add_catches_up_off_the_event_loop(tmp_path, monkeypatch):
+    path = tmp_path / "lib.json"
+    lib, other = make(path, "json"), make(path, "json")
+    other.add_book(Book("Dune", "Frank Herbert", "5555"))
+    on_loop = []
+    ensure_current = lib._ensure_current
+
+    def spy():
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        ensure_current()
+
+    monkeypatch.setattr(lib, "_ensure_current", spy)
+    monkeypatch.setattr(api, "library_store", lib)
+    r = TestClient(api.app).post("/books", json={"isbn": "5555"})
+    assert r.status_code == 409
+    assert on_loop and not any(on_loop)
+    lib.close()
+    other.close()
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+import respx
+
+from api import app, library_store
+from models.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    calls = []
+
+    async def slow(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return value
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.do("a", lambda: slow("a")),
+            flight.do("a", lambda: slow("a")),
+            flight.do("b", lambda: slow("b")),
+        )
+        # Finished calls are forgotten: the next caller starts a new one
+        await flight.do("a", lambda: slow("a"))
+        return results, flight
+
+    results, flight = asyncio.run(run())
+    assert results == ["a", "a", "b"]
+    assert calls == ["a", "b", "a"]
+    assert (flight.started, flight.shared, len(flight)) == (3, 1, 0)
+
+
+@respx.mock
+def test_same_isbn_posted_concurrently_fetches_once():
+    isbn = "4444444444444"
+
+    async def slow_edition(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"title": "Hot Book", "by_statement": "Hot Author"})
+
+    edition = respx.get(f"https://openlibrary.org/isbn/{isbn}.json").mock(side_effect=slow_edition)
+
+    async def post_three():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/books", json={"isbn": isbn}) for _ in range(3)))
+
+    responses = asyncio.run(post_three())
+    assert sorted(r.status_code for r in responses) == [201, 409, 409]
+    assert edition.call_count == 1
+
+    # Once stored, a duplicate is rejected before any network call
+    again = asyncio.run(post_three())
+    assert [r.status_code for r in again] == [409, 409, 409]
+    assert edition.call_count == 1
+
+    library_store.remove_book(isbn)
@@ -0,0 +1,52 @@
+import sys
+
+import pytest
+
+import test_library_add_find
+import test_library_persistence
+import test_library_remove_list
+import test_validation
+from models.book import Book
+from models.sqlite_library import SqliteLibrary
+
+
+# The Library suites, run again with SqliteLibrary swapped in
+@pytest.mark.parametrize(
+    "test",
+    [
+        test_library_add_find.test_add_and_find,
+        test_library_add_find.test_update_book,
+        test_library_persistence.test_persistence,
+        test_library_remove_list.test_remove,
+        test_library_remove_list.test_list_keeps_insertion_order_after_remove,
+        test_validation.test_duplicate_isbn,
+    ],
+    ids=lambda t: t.__name__,
+)
+def test_library_suites_with_sqlite(test, tmp_path, monkeypatch):
+    monkeypatch.setattr(sys.modules[test.__module__], "Library", SqliteLibrary)
+    test(tmp_path)
+
+
+def test_bulk_insert_and_indexed_queries(tmp_path):
+    lib = SqliteLibrary(str(tmp_path / "lib.db"))
+
+    added = lib.add_books([
+        Book("Martin Eden", "Jack London", "1111"),
+        Book("The Call of the Wild", "Jack London", "2222"),
+        Book("Martin Eden", "Jack London", "111-1"),  # same ISBN as the first
+    ])
+    assert added == 2
+    assert lib.count() == 2
+
+    assert [b.isbn for b in lib.find_by_author("Jack London")] == ["1111", "2222"]
+    assert [b.isbn for b in lib.find_by_title("The Call of the Wild")] == ["2222"]
+    assert [b.isbn for b in lib.iter_books()] == ["1111", "2222"]
+    lib.close()
+
+
+def test_json_catalog_is_refused_with_a_clear_error(tmp_path):
+    catalog = tmp_path / "library.json"
+    catalog.write_text('[{"title": "Dune", "author": "Frank Herbert", "isbn": "5555"}]', encoding="utf-8")
+    with pytest.raises(ValueError, match="not an SQLite database"):
+        SqliteLibrary(str(catalog))
@@ -0,0 +1,85 @@
+import json
+import os
+import time
+
+from models.book import Book
+from models.library import Library
+from models.storage import WalStorage
+
+
+def test_wal_appends_instead_of_rewriting(tmp_path):
+    storage = tmp_path / "wal.json"
+    lib = Library(storage=WalStorage(storage))
+
+    lib.add_book(Book("Martin Eden", "Jack London", "1111"))
+    lib.add_book(Book("A Room of One's Own", "Virginia Woolf", "2222"))
+    lib.remove_book("1111")
+    lib.close()
+
+    # The snapshot is untouched, every change is one line in the log
+    assert json.loads(storage.read_text(encoding="utf-8")) == []
+    lines = (tmp_path / "wal.json.wal").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["op"] for line in lines] == ["add", "add", "remove"]
+
+    # A new Library replays the log
+    lib2 = Library(storage=WalStorage(storage))
+    assert [b.isbn for b in lib2.list_books()] == ["2222"]
+
+
+def test_wal_ignores_torn_last_line(tmp_path):
+    storage = tmp_path / "wal.json"
+    lib = Library(storage=WalStorage(storage))
+    lib.add_book(Book("Martin Eden", "Jack London", "1111"))
+    lib.close()
+
+    # Simulate a crash in the middle of writing a record
+    with open(tmp_path / "wal.json.wal", "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "book": {"title": "Half')
+
+    lib2 = Library(storage=WalStorage(storage))
+    assert [b.isbn for b in lib2.list_books()] == ["1111"]
+
+    # New records are not glued to the broken line
+    lib2.add_book(Book("A Room of One's Own", "Virginia Woolf", "2222"))
+    lib2.close()
+    assert [b.isbn for b in Library(storage=WalStorage(storage)).list_books()] == ["1111", "2222"]
+
+
+def test_wal_compacts_into_snapshot(tmp_path):
+    storage = tmp_path / "wal.json"
+    wal = WalStorage(storage, compact_after=3)
+    lib = Library(storage=wal)
+
+    for isbn in ("1111", "2222", "3333", "4444"):
+        lib.add_book(Book("Title " + isbn, "Author", isbn))
+    lib.remove_book("2222")
+    lib.close()
+
+    # The first three records were folded into the snapshot in the background
+    snapshot = json.loads(storage.read_text(encoding="utf-8"))
+    assert [r["isbn"] for r in snapshot] == ["1111", "2222", "3333"]
+    assert not (tmp_path / "wal.json.wal.old").exists()
+
+    lib2 = Library(storage=WalStorage(storage))
+    assert [b.isbn for b in lib2.list_books()] == ["1111", "3333", "4444"]
+
+    # save_books writes a full snapshot and empties the log
+    lib2.save_books()
+    assert not (tmp_path / "wal.json.wal").exists()
+    assert [b.isbn for b in Library(storage=WalStorage(storage)).list_books()] == ["1111", "3333", "4444"]
+
+
+def test_wal_syncs_after_the_interval_without_another_write(tmp_path, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (synced.append(fd), real_fsync(fd)))
+    storage = WalStorage(tmp_path / "wal.json", fsync_every=1000, fsync_interval=0.05)
+    lib = Library(storage=storage)
+
+    lib.add_book(Book("Martin Eden", "Jack London", "1111"))
+    assert storage._pending == 1
+    deadline = time.monotonic() + 5
+    while storage._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert storage._pending == 0 and synced
+    lib.close()
@@ -0,0 +1,79 @@
+import io
+import json
+
+import pytest
+
+from models import jsonio
+from models import storage as storages
+from models.book import Book
+from models.library import Library
+
+
+def test_iter_array_across_chunk_borders():
+    records = [{"title": f"Kitap {i} ğüşıöç", "author": "Yazar", "isbn": str(1000 + i)} for i in range(50)]
+    records.append({"n": 12345678})
+    text = json.dumps(records, ensure_ascii=False, indent=2)
+
+    # Tiny chunks: objects, strings and numbers are all cut somewhere
+    for chunk_size in (1, 3, 7, 64):
+        assert list(jsonio.iter_array(io.StringIO(text), chunk_size=chunk_size)) == records
+
+    assert list(jsonio.iter_array(io.StringIO("  [ ] "))) == []
+    assert list(jsonio.iter_array(io.StringIO(""))) == []
+
+
+def test_broken_file_keeps_records_before_the_damage(tmp_path):
+    storage = tmp_path / "broken.json"
+    storage.write_text(
+        '[{"title": "Martin Eden", "author": "Jack London", "isbn": "1111"}, {"title": "Half',
+        encoding="utf-8",
+    )
+    assert [b.isbn for b in Library(str(storage)).list_books()] == ["1111"]
+
+
+@pytest.mark.parametrize("limit", [0, 1 << 20])
+def test_only_large_files_are_streamed(tmp_path, monkeypatch, limit):
+    path = tmp_path / "lib.json"
+    Library(str(path)).add_books(Book("Title", "Author", f"978-{i:04d}") for i in range(20))
+
+    streamed = []
+    iter_array = jsonio.iter_array
+    monkeypatch.setattr(jsonio, "iter_array", lambda f: (streamed.append(f), iter_array(f))[1])
+    monkeypatch.setattr(storages, "STREAM_MIN_BYTES", limit)
+    assert len(Library(str(path)).list_books()) == 20
+    assert bool(streamed) == (limit == 0)
+
+
+def test_each_book_is_built_once(tmp_path, monkeypatch):
+    storage = tmp_path / "lib.json"
+    Library(str(storage)).add_books(Book("Title", "Author", f"978-{i:04d}") for i in range(20))
+
+    built = []
+    original = Book.__post_init__
+    monkeypatch.setattr(Book, "__post_init__", lambda self: (built.append(self.isbn), original(self)))
+    lib = Library(str(storage))
+    assert len(built) == 20
+    assert lib.find_book("9780007").isbn == "9780007"
+
+
+def test_lazy_library_reads_on_first_use(tmp_path, monkeypatch):
+    storage = tmp_path / "lib.json"
+    Library(str(storage)).add_book(Book("Martin Eden", "Jack London", "1111"))
+
+    lib = Library(str(storage), lazy=True)
+    assert lib._loaded is False
+    assert lib.find_book("1111").title == "Martin Eden"
+    assert lib._loaded is True
+
+
+def test_orjson_backend_round_trip(tmp_path, monkeypatch):
+    pytest.importorskip("orjson")
+    monkeypatch.setattr(jsonio, "JSON_BACKEND", "orjson")
+
+    storage = tmp_path / "lib.json"
+    lib = Library(str(storage))
+    lib.add_book(Book("Sana Gül Bahçesi Vadetmedim", "Joanne Greenberg", "9789753424080"))
+
+    # Same file format as the standard library writer
+    assert json.loads(storage.read_text(encoding="utf-8"))[0]["title"] == "Sana Gül Bahçesi Vadetmedim"
+    assert Library(str(storage)).find_book("9789753424080").author == "Joanne Greenberg"